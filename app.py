@@ -1,33 +1,68 @@
-from flask import Flask, render_template, redirect, jsonify, request, Response, url_for, flash, session, send_file
-from models import db, ContactsOld, ContactsNew, RentalOld, RentalNew, RentalRecordsOld, RentalRecordsNew, RoomsNew, \
-    RoomsOld, RentalInfoOld, RentalInfoNew, ContractsOld, ContractsNew, Admin
+from flask import Flask, render_template, redirect, jsonify, request, Response, url_for, flash, session, send_file, \
+    stream_with_context
+from models import db, FLOOR_MODELS, ContactsOld, ContactsNew, RentalOld, RoomsNew, RoomsOld, ContractsOld, ContractsNew, \
+    Admin, UtilityRate
+from dashboard_stats import get_dashboard_stats, get_room_stats, get_rental_stats, get_rental_info_stats, \
+    get_contract_stats, get_records_stats, get_floor_summary
+from pagination import LIST_CONFIGS, paginate_list, serialize_row, page_url, build_filter_conditions
+from migrations import register_migration_commands, pending_versions
+from periods import in_month, parse_month, month_range
+from contract_pdf import generate_contract_pdf, init_pdf_fonts, contract_fingerprint
+from pdf_cache import pdf_cache
+from contract_export import stream_contracts_zip
+from rent_collection import mark_rentals_paid, get_current_rental, record_room_payment, delete_payment_records, \
+    register_billing_commands, SYNC_RENTAL_INFO_FLOORS
+from billing import sync_rental_bill, settle_open_bills, delete_unpaid_bills, get_room_arrears, get_rental_arrears
+from meter_readings import import_meter_readings, iter_csv_rows, iter_json_rows, get_meter_history
+from rates import rate_resolver, utility_fees
+from records_export import stream_records_csv, stream_records_xlsx, xlsx_available
+from data_generator import register_generator_commands
+from search import search, match_ids, contains_condition, register_search_commands, SEARCH_ENTITIES, \
+    TRIGRAM_MIN_LENGTH
+from request_metrics import request_metrics
+from query_profiler import query_profiler
+from serializers import ROOM_DETAIL, AVAILABLE_ROOMS, RENTED_ROOMS, CONTACT_DETAIL, RENTAL_INFO_LIST, \
+    RENTAL_INFO_DETAIL, RENTAL_OLD_DETAIL, RENTAL_NEW_DETAIL, CONTRACT_DETAIL
+from stats_cache import stats_cache, invalidates_stats
+from db_readiness import schema_readiness
 from datetime import datetime, timedelta
-from io import StringIO, BytesIO
-import zipfile
+from io import BytesIO
+import csv
+import json
 import os
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import inch
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
-from reportlab.pdfbase.cidfonts import UnicodeCIDFont
-from sqlalchemy import extract, and_
+from functools import wraps
+from sqlalchemy import and_, or_
 
 app = Flask(__name__)
 app.config.from_object('config.Config')
+stats_cache.ttl = app.config['STATS_CACHE_TTL']
+pdf_cache.max_entries = app.config['PDF_CACHE_MAX_ENTRIES']
+pdf_cache.max_bytes = app.config['PDF_CACHE_MAX_BYTES']
+rate_resolver.ttl = app.config['RATE_CACHE_TTL']
+rate_resolver.default_rates = (app.config['DEFAULT_WATER_RATE'], app.config['DEFAULT_ELECTRICITY_RATE'])
 
 db.init_app(app)
+app.add_template_global(page_url)
+register_migration_commands(app)
+register_billing_commands(app)
+register_search_commands(app)
+register_generator_commands(app)
+request_metrics.init_app(app)
+query_profiler.init_app(app, db)
+
+# 合同PDF字体在启动时注册一次
+init_pdf_fonts(app)
 
 # 数据库初始化函数
 def init_database():
-    """初始化数据库"""
+    """初始化数据库（仅在启动阶段调用，请求处理过程中不执行建表）"""
     try:
         with app.app_context():
             db.create_all()
+            pending = pending_versions()
+            if pending:
+                print(f"存在未执行的数据库迁移 {pending}，请运行 flask migrate")
+            schema_readiness.mark_ready()
             print("数据库初始化成功")
             return True
     except Exception as e:
@@ -36,18 +71,15 @@ def init_database():
 
 # 确保数据库已初始化的装饰器
 def ensure_db_initialized(f):
-    """确保数据库已初始化的装饰器"""
+    """确保数据库已初始化的装饰器
+
+    进程内只在首次请求（或失败后的退避重试）时检查一次数据库，就绪后不再发起查询。
+    """
+    @wraps(f)
     def decorated_function(*args, **kwargs):
-        try:
-            # 尝试执行一个简单的数据库查询来检查连接
-            with app.app_context():
-                from sqlalchemy import text
-                db.session.execute(text('SELECT 1'))
-        except:
-            # 如果失败，尝试初始化数据库
-            init_database()
+        if not schema_readiness.check(db):
+            app.logger.warning(f"数据库尚未就绪: {schema_readiness.last_error}")
         return f(*args, **kwargs)
-    decorated_function.__name__ = f.__name__
     return decorated_function
 
 
@@ -79,11 +111,9 @@ def get_todo_items(floor='old'):
     # 根据楼层选择对应的数据表
     if floor == 'old':
         ContractsModel = ContractsOld
-        RentalModel = RentalOld
         RoomsModel = RoomsOld
     else:  # floor == 'new'
         ContractsModel = ContractsNew
-        RentalModel = RentalNew
         RoomsModel = RoomsNew
 
     # 1. 合同到期提醒（30天内到期的合同）
@@ -107,13 +137,14 @@ def get_todo_items(floor='old'):
             'days_left': days_left
         })
 
-    # 2. 缴费提醒（未缴费的租金）
-    unpaid_rentals = RentalModel.query.filter_by(payment_status=2).all()
-    for rental in unpaid_rentals:
+    # 2. 缴费提醒（按房间汇总的欠费账单，含往期欠费）
+    for arrears in get_room_arrears(floor):
         todo_items['unpaid_rent'].append({
-            'room_number': rental.room_number,
-            'tenant_name': rental.tenant_name,
-            'total_due': float(rental.total_due) if rental.total_due else 0.0
+            'room_number': arrears['room_number'],
+            'rental_id': arrears['rental_id'],
+            'tenant_name': arrears['tenant_name'],
+            'total_due': arrears['amount_owed'],
+            'months': arrears['months']
         })
 
     # 3. 维修完成提醒（最近7天内状态从维修中变为其他状态的房间）
@@ -202,134 +233,50 @@ def base_new():
     return render_template('base_new.html')
 
 
-@app.route('/index5')
-def index5():
-    from datetime import datetime, timedelta
-    from sqlalchemy import extract, and_
-
-    # 基本统计数据
-    total_contacts = ContactsOld.query.count()
-    total_rental = RentalOld.query.count()
-    total_records = RentalRecordsOld.query.count()
-
-    # 房间统计数据
-    total_rooms = RoomsOld.query.count()
-    rented_rooms = RoomsOld.query.filter_by(room_status=2).count()  # 已出租
-    vacant_rooms = RoomsOld.query.filter_by(room_status=1).count()  # 空闲
-
-    # 未交房租统计
-    unpaid_rentals = RentalOld.query.filter_by(payment_status=2).all()  # 未缴费
-    unpaid_rooms_count = len(unpaid_rentals)
-
-    # 获取未交房租的详细信息
-    unpaid_room_details = []
-    for rental in unpaid_rentals:
-        unpaid_room_details.append({
-            'room_number': rental.room_number,
-            'tenant_name': rental.tenant_name,
-            'total_due': float(rental.total_due) if rental.total_due else 0.0
-        })
+def get_floor_stats(floor):
+    """获取楼层首页统计数据和待办事项（带缓存）"""
+    def compute():
+        # 统计数据在数据库端一次聚合完成
+        stats = get_dashboard_stats(floor)
 
-    # 计算本月收入（基于缴费记录表的实际缴费日期）
-    current_month = datetime.now().month
-    current_year = datetime.now().year
+        # 获取待办事项数据
+        stats['todo_items'] = get_todo_items(floor)
+        return stats
 
-    # 从缴费记录表获取本月收入
-    monthly_records = RentalRecordsOld.query.filter(
-        extract('month', RentalRecordsOld.payment_date) == current_month,
-        extract('year', RentalRecordsOld.payment_date) == current_year
-    ).all()
+    return stats_cache.get_or_compute(floor, compute)
 
-    monthly_income = sum([float(record.total_rent) for record in monthly_records if record.total_rent])
-
-    # 水电费收入（从租赁表中获取本月已缴费的水电费）
-    utilities_income = sum(
-        [float(rental.utilities_fee) for rental in RentalOld.query.filter_by(payment_status=1).all() if
-         rental.utilities_fee])
-
-    # 获取待办事项数据
-    todo_items = get_todo_items('old')
-
-    stats = {
-        'total_contacts': total_contacts,
-        'total_rental': total_rental,
-        'total_records': total_records,
-        'total_rooms': total_rooms,
-        'rented_rooms': rented_rooms,
-        'vacant_rooms': vacant_rooms,
-        'unpaid_rooms': unpaid_rooms_count,
-        'unpaid_room_details': unpaid_room_details,
-        'monthly_income': monthly_income,
-        'utilities_income': utilities_income,
-        'todo_items': todo_items
-    }
 
+@app.route('/index5')
+def index5():
+    stats = get_floor_stats('old')
     return render_template('index5.html', stats=stats)
 
 
 @app.route('/index6')
 def index6():
-    from datetime import datetime, timedelta
-    from sqlalchemy import extract, and_
-
-    # 基本统计数据
-    total_contacts = ContactsNew.query.count()
-    total_rental = RentalNew.query.count()
-    total_records = RentalRecordsNew.query.count()
-
-    # 房间统计数据
-    total_rooms = RoomsNew.query.count()
-    rented_rooms = RoomsNew.query.filter_by(room_status=2).count()  # 已出租
-    vacant_rooms = RoomsNew.query.filter_by(room_status=1).count()  # 空闲
-
-    # 未交房租统计
-    unpaid_rentals = RentalNew.query.filter_by(payment_status=2).all()  # 未缴费
-    unpaid_rooms_count = len(unpaid_rentals)
-
-    # 获取未交房租的详细信息
-    unpaid_room_details = []
-    for rental in unpaid_rentals:
-        unpaid_room_details.append({
-            'room_number': rental.room_number,
-            'tenant_name': rental.tenant_name,
-            'total_due': float(rental.total_due) if rental.total_due else 0.0
-        })
+    stats = get_floor_stats('new')
+    return render_template('index6.html', stats=stats)
 
-    # 计算本月收入（基于缴费记录表的实际缴费日期）
-    current_month = datetime.now().month
-    current_year = datetime.now().year
 
-    # 从缴费记录表获取本月收入
-    monthly_records = RentalRecordsNew.query.filter(
-        extract('month', RentalRecordsNew.payment_date) == current_month,
-        extract('year', RentalRecordsNew.payment_date) == current_year
-    ).all()
+@app.route('/api/stats_cache', methods=['GET'])
+def api_stats_cache():
+    """获取首页统计缓存的命中情况"""
+    return jsonify({'success': True, 'cache': stats_cache.info()})
 
-    monthly_income = sum([float(record.total_rent) for record in monthly_records if record.total_rent])
-
-    # 水电费收入（从租赁表中获取本月已缴费的水电费）
-    utilities_income = sum(
-        [float(rental.utilities_fee) for rental in RentalNew.query.filter_by(payment_status=1).all() if
-         rental.utilities_fee])
-
-    # 获取待办事项数据
-    todo_items = get_todo_items('new')
-
-    stats = {
-        'total_contacts': total_contacts,
-        'total_rental': total_rental,
-        'total_records': total_records,
-        'total_rooms': total_rooms,
-        'rented_rooms': rented_rooms,
-        'vacant_rooms': vacant_rooms,
-        'unpaid_rooms': unpaid_rooms_count,
-        'unpaid_room_details': unpaid_room_details,
-        'monthly_income': monthly_income,
-        'utilities_income': utilities_income,
-        'todo_items': todo_items
-    }
 
-    return render_template('index6.html', stats=stats)
+@app.route('/api/floor_summary', methods=['GET'])
+def api_floor_summary():
+    """获取各楼层租金汇总"""
+    try:
+        return jsonify({'success': True, 'data': get_floor_summary()})
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'查询失败: {str(e)}'})
+
+
+@app.route('/api/pdf_cache', methods=['GET'])
+def api_pdf_cache():
+    """获取合同PDF缓存的命中情况"""
+    return jsonify({'success': True, 'cache': pdf_cache.info()})
 
 
 @app.route('/contacts_old')
@@ -372,46 +319,24 @@ def contacts_old():
 
 @app.route('/rooms_old')
 def rooms_old():
-    rooms_list = RoomsOld.query.all()
+    # 服务端排序、筛选和分页，只渲染当前页
+    page = paginate_list('rooms_old', request.args, default_limit=app.config['LIST_PAGE_SIZE'])
 
     # 计算房间统计信息
-    total_rooms = len(rooms_list)
-    available_rooms = len([r for r in rooms_list if r.room_status == 1])
-    occupied_rooms = len([r for r in rooms_list if r.room_status == 2])
-    maintenance_rooms = len([r for r in rooms_list if r.room_status == 3])
-    disabled_rooms = len([r for r in rooms_list if r.room_status == 4])
-
-    room_stats = {
-        'total_rooms': total_rooms,
-        'available_rooms': available_rooms,
-        'occupied_rooms': occupied_rooms,
-        'maintenance_rooms': maintenance_rooms,
-        'disabled_rooms': disabled_rooms
-    }
+    room_stats = get_room_stats('old')
 
-    return render_template('rooms_old.html', rooms_list=rooms_list, room_stats=room_stats)
+    return render_template('rooms_old.html', rooms_list=page.items, page=page, room_stats=room_stats)
 
 
 @app.route('/rooms_new')
 def rooms_new():
-    rooms_list = RoomsNew.query.all()
+    # 服务端排序、筛选和分页，只渲染当前页
+    page = paginate_list('rooms_new', request.args, default_limit=app.config['LIST_PAGE_SIZE'])
 
     # 计算房间统计信息
-    total_rooms = len(rooms_list)
-    available_rooms = len([r for r in rooms_list if r.room_status == 1])
-    occupied_rooms = len([r for r in rooms_list if r.room_status == 2])
-    maintenance_rooms = len([r for r in rooms_list if r.room_status == 3])
-    disabled_rooms = len([r for r in rooms_list if r.room_status == 4])
-
-    room_stats = {
-        'total_rooms': total_rooms,
-        'available_rooms': available_rooms,
-        'occupied_rooms': occupied_rooms,
-        'maintenance_rooms': maintenance_rooms,
-        'disabled_rooms': disabled_rooms
-    }
+    room_stats = get_room_stats('new')
 
-    return render_template('rooms_new.html', rooms_list=rooms_list, room_stats=room_stats)
+    return render_template('rooms_new.html', rooms_list=page.items, page=page, room_stats=room_stats)
 
 
 @app.route('/contacts_new')
@@ -438,28 +363,25 @@ def rental_old():
     year = request.args.get('year', type=int)
     month = request.args.get('month', type=int)
 
-    # 构建查询
-    query = RentalOld.query
+    conditions = []
 
-    # 如果有年月筛选参数，则按created_at进行筛选
-    if year and month:
-        from calendar import monthrange
+    # 如果有年月筛选参数，则按created_at进行筛选（[当月1日, 次月1日) 范围）
+    if year and month and 1 <= month <= 12:
+        conditions = [in_month(RentalOld.created_at, year, month)]
 
-        # 获取该月的第一天和最后一天
-        start_date = datetime(year, month, 1)
-        _, last_day = monthrange(year, month)
-        end_date = datetime(year, month, last_day, 23, 59, 59)
-
-        query = query.filter(RentalOld.created_at >= start_date, RentalOld.created_at <= end_date)
-
-    rental_list = query.order_by(RentalOld.created_at.desc()).all()
+    # 服务端排序、筛选和分页，默认按创建时间倒序
+    page = paginate_list('rental_old', request.args, extra_conditions=conditions,
+                         default_limit=app.config['LIST_PAGE_SIZE'])
+    rental_stats = get_rental_stats('old')
 
     # 获取所有记录的最早创建时间，用于日历筛选的起始时间
     earliest_record = db.session.query(RentalOld.created_at).order_by(RentalOld.created_at.asc()).first()
     earliest_date = earliest_record[0] if earliest_record else datetime.now()
 
     return render_template('rental_old.html',
-                           rental_list=rental_list,
+                           rental_list=page.items,
+                           page=page,
+                           rental_stats=rental_stats,
                            current_year=year,
                            current_month=month,
                            earliest_date=earliest_date)
@@ -467,63 +389,39 @@ def rental_old():
 
 @app.route('/rental_new')
 def rental_new():
-    rental_list = RentalNew.query.all()
-    return render_template('rental_new.html', rental_list=rental_list)
+    page = paginate_list('rental_new', request.args, default_limit=app.config['LIST_PAGE_SIZE'])
+    rental_stats = get_rental_stats('new')
+    return render_template('rental_new.html', rental_list=page.items, page=page, rental_stats=rental_stats)
 
 
 @app.route('/rental_info_old')
 def rental_info_old():
-    rental_info_list = RentalInfoOld.query.all()
-    return render_template('rental_info_old.html', rental_info_list=rental_info_list)
+    page = paginate_list('rental_info_old', request.args, default_limit=app.config['LIST_PAGE_SIZE'])
+    info_stats = get_rental_info_stats('old')
+    return render_template('rental_info_old.html', rental_info_list=page.items, page=page, info_stats=info_stats)
 
 
 @app.route('/rental_info_new')
 def rental_info_new():
-    rental_info_list = RentalInfoNew.query.all()
-    return render_template('rental_info_new.html', rental_info_list=rental_info_list)
+    page = paginate_list('rental_info_new', request.args, default_limit=app.config['LIST_PAGE_SIZE'])
+    info_stats = get_rental_info_stats('new')
+    return render_template('rental_info_new.html', rental_info_list=page.items, page=page, info_stats=info_stats)
 
 
 @app.route('/contracts_old')
 def contracts_old():
-    # 获取合同列表
-    contracts_list = ContractsOld.query.all()
+    # 获取当前页合同列表
+    page = paginate_list('contracts_old', request.args, default_limit=app.config['LIST_PAGE_SIZE'])
 
-    # 获取房间列表用于筛选
-    rooms_list = RoomsOld.query.all()
+    # 获取房间号列表用于筛选，只查询房号列
+    rooms_list = db.session.query(RoomsOld.room_number).order_by(RoomsOld.room_number).all()
 
     # 计算统计数据
-    total_contracts = len(contracts_list)
-    active_contracts = 0
-    expiring_contracts = 0
-    expired_contracts = 0
-
-    # 如果有合同数据，计算各种状态的合同数量
-    if contracts_list:
-        current_date = datetime.now().date()
-        for contract in contracts_list:
-            if contract.contract_status == 1:  # 有效合同
-                if contract.contract_end_date:
-                    days_to_expire = (contract.contract_end_date - current_date).days
-                    if days_to_expire > 30:
-                        active_contracts += 1
-                    elif days_to_expire > 0:
-                        expiring_contracts += 1
-                    else:
-                        expired_contracts += 1
-                else:
-                    active_contracts += 1
-            else:
-                expired_contracts += 1  # 失效合同
-
-    contract_stats = {
-        'total_contracts': total_contracts,
-        'active_contracts': active_contracts,
-        'expiring_contracts': expiring_contracts,
-        'expired_contracts': expired_contracts
-    }
+    contract_stats = get_contract_stats('old')
 
     return render_template('contracts_old.html',
-                           contracts_list=contracts_list,
+                           contracts_list=page.items,
+                           page=page,
                            rooms_list=rooms_list,
                            contract_stats=contract_stats,
                            current_date=datetime.now().date())
@@ -531,45 +429,18 @@ def contracts_old():
 
 @app.route('/contracts_new')
 def contracts_new():
-    # 获取合同列表
-    contracts_list = ContractsNew.query.all()
+    # 获取当前页合同列表
+    page = paginate_list('contracts_new', request.args, default_limit=app.config['LIST_PAGE_SIZE'])
 
-    # 获取房间列表用于筛选
-    rooms_list = RoomsNew.query.all()
+    # 获取房间号列表用于筛选，只查询房号列
+    rooms_list = db.session.query(RoomsNew.room_number).order_by(RoomsNew.room_number).all()
 
     # 计算统计数据
-    total_contracts = len(contracts_list)
-    active_contracts = 0
-    expiring_contracts = 0
-    expired_contracts = 0
-
-    # 如果有合同数据，计算各种状态的合同数量
-    if contracts_list:
-        current_date = datetime.now().date()
-        for contract in contracts_list:
-            if contract.contract_status == 1:  # 有效合同
-                if contract.contract_end_date:
-                    days_to_expire = (contract.contract_end_date - current_date).days
-                    if days_to_expire > 30:
-                        active_contracts += 1
-                    elif days_to_expire > 0:
-                        expiring_contracts += 1
-                    else:
-                        expired_contracts += 1
-                else:
-                    active_contracts += 1
-            else:
-                expired_contracts += 1  # 失效合同
-
-    contract_stats = {
-        'total_contracts': total_contracts,
-        'active_contracts': active_contracts,
-        'expiring_contracts': expiring_contracts,
-        'expired_contracts': expired_contracts
-    }
+    contract_stats = get_contract_stats('new')
 
     return render_template('contracts_new.html',
-                           contracts_list=contracts_list,
+                           contracts_list=page.items,
+                           page=page,
                            rooms_list=rooms_list,
                            contract_stats=contract_stats,
                            current_date=datetime.now().date())
@@ -577,62 +448,64 @@ def contracts_new():
 
 @app.route('/rental_records_old')
 def rental_records_old():
-    rental_records_list = RentalRecordsOld.query.all()
-    return render_template('rental_records_old.html', rental_records_list=rental_records_list)
+    page = paginate_list('rental_records_old', request.args, default_limit=app.config['LIST_PAGE_SIZE'])
+    records_stats = get_records_stats('old')
+    return render_template('rental_records_old.html', rental_records_list=page.items, page=page,
+                           records_stats=records_stats)
 
 
 @app.route('/rental_records_new')
 def rental_records_new():
-    rental_records_list = RentalRecordsNew.query.all()
-    return render_template('rental_records_new.html', rental_records_list=rental_records_list)
+    page = paginate_list('rental_records_new', request.args, default_limit=app.config['LIST_PAGE_SIZE'])
+    records_stats = get_records_stats('new')
+    return render_template('rental_records_new.html', rental_records_list=page.items, page=page,
+                           records_stats=records_stats)
 
 
-# 联系人管理路由
-@app.route('/contacts_old/add', methods=['GET', 'POST'])
-def contacts_add():
-    """添加联系人页面和处理"""
-    if request.method == 'POST':
-        try:
-            data = request.get_json()
-
-            # 检查电话号码是否已存在
-            existing_contact = ContactsOld.query.filter_by(phone=data['phone']).first()
-            if existing_contact:
-                return jsonify({'success': False, 'message': '电话号码已存在'})
-
-            # 创建新联系人
-            new_contact = ContactsOld(
-                name=data['name'],
-                roomId=data['roomId'],
-                phone=data['phone'],
-                id_card=data['id_card']
-            )
+@app.route('/api/list/<list_name>', methods=['GET'])
+def api_list_page(list_name):
+    """列表数据分页接口，参数与列表页一致（sort、order、limit、after、before 及筛选参数）
 
-            db.session.add(new_contact)
-            db.session.commit()
-
-            return jsonify({'success': True, 'message': '联系人添加成功'})
+    count=0 时不统计总条数（page.total 为 null），适合只需逐页拉取数据的调用方
+    """
+    if list_name not in LIST_CONFIGS:
+        return jsonify({'success': False, 'message': '列表不存在'}), 404
+    try:
+        page = paginate_list(list_name, request.args, default_limit=app.config['LIST_PAGE_SIZE'],
+                             with_total=request.args.get('count') != '0')
+        return jsonify({
+            'success': True,
+            'data': [serialize_row(row) for row in page.items],
+            'page': page.to_dict()
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'查询失败: {str(e)}'})
 
-        except Exception as e:
-            db.session.rollback()
-            return jsonify({'success': False, 'message': f'添加失败: {str(e)}'})
 
-    return render_template('contacts_old.html')
+# 联系人管理路由
+@app.route('/contacts_<any(old, new):floor>/add', methods=['GET', 'POST'])
+def contacts_add(floor):
+    """添加联系人页面和处理"""
+    if request.method == 'POST':
+        return api_add_contact(floor=floor)
+    return render_template(f'contacts_{floor}.html')
 
 
 # API路由 - 房间管理
-@app.route('/api/rooms_old', methods=['POST'])
-def api_add_room_old():
-    """添加五楼房间"""
+@app.route('/api/rooms_<any(old, new):floor>', methods=['POST'])
+@invalidates_stats()
+def api_add_room(floor):
+    """添加房间"""
+    RoomsModel = FLOOR_MODELS[floor]['rooms']
     try:
         data = request.get_json()
 
         # 检查房号是否已存在
-        existing_room = RoomsOld.query.filter_by(room_number=data['room_number']).first()
+        existing_room = RoomsModel.query.filter_by(room_number=data['room_number']).first()
         if existing_room:
             return jsonify({'success': False, 'message': '房号已存在'})
 
-        new_room = RoomsOld(
+        new_room = RoomsModel(
             room_number=data['room_number'],
             room_type=data['room_type'],
             base_rent=float(data['base_rent']),
@@ -652,183 +525,39 @@ def api_add_room_old():
 
 
 # 房间详情
-@app.route('/api/rooms_old/<int:room_id>', methods=['GET'])
-def api_get_room_old(room_id):
-    """获取五楼房间详情"""
+@app.route('/api/rooms_<any(old, new):floor>/<int:room_id>', methods=['GET'])
+def api_get_room(floor, room_id):
+    """获取房间详情"""
+    RoomsModel = FLOOR_MODELS[floor]['rooms']
     try:
-        room = RoomsOld.query.get_or_404(room_id)
-
-        status_map = {
-            1: '空闲',
-            2: '已出租',
-            3: '维修中',
-            4: '停用'
-        }
-
-        room_data = {
-            'id': room.id,
-            'room_number': room.room_number,
-            'room_type': room.room_type,
-            'base_rent': float(room.base_rent),
-            'deposit': float(room.deposit),
-            'status': room.room_status,
-            'status_text': status_map.get(room.room_status, '未知'),
-            'water_meter_number': room.water_meter_number,
-            'electricity_meter_number': room.electricity_meter_number,
-            'created_at': room.created_at.strftime('%Y-%m-%d %H:%M:%S') if room.created_at else '-',
-            'updated_at': room.updated_at.strftime('%Y-%m-%d %H:%M:%S') if room.updated_at else '-'
-        }
-
-        return jsonify(room_data)
+        return jsonify(ROOM_DETAIL.get_or_404(RoomsModel, room_id))
     except Exception as e:
         return jsonify({'error': f'获取房间信息失败: {str(e)}'})
 
 
 # 联系人详情API
-@app.route('/api/contacts_old/<int:contact_id>', methods=['GET'])
-def api_get_contact(contact_id):
+@app.route('/api/contacts_<any(old, new):floor>/<int:contact_id>', methods=['GET'])
+def api_get_contact(floor, contact_id):
     """获取联系人详情"""
+    ContactsModel = FLOOR_MODELS[floor]['contacts']
     try:
-        contact = ContactsOld.query.get_or_404(contact_id)
-
-        contact_data = {
-            'id': contact.id,
-            'name': contact.name,
-            'roomId': contact.roomId,
-            'phone': contact.phone,
-            'id_card': contact.id_card,
-            'created_at': contact.created_at.strftime('%Y-%m-%d %H:%M:%S') if contact.created_at else '-'
-        }
-        return jsonify(contact_data)
+        return jsonify(CONTACT_DETAIL.get_or_404(ContactsModel, contact_id))
     except Exception as e:
         return jsonify({'error': f'获取联系人信息失败: {str(e)}'})
 
 
 # 删除房间
-@app.route('/api/rooms_old/<int:room_id>', methods=['DELETE'])
-def api_delete_room_old(room_id):
-    """删除五楼房间"""
-    try:
-        room = RoomsOld.query.get_or_404(room_id)
-
-        # 检查房间是否有关联的租赁记录
-        rental_count = RentalOld.query.filter_by(room_number=room.room_number).count()
-        if rental_count > 0:
-            return jsonify({'success': False, 'message': '该房间有租赁记录，无法删除'})
-
-        db.session.delete(room)
-        db.session.commit()
-
-        return jsonify({'success': True, 'message': '房间删除成功'})
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'success': False, 'message': f'删除失败: {str(e)}'})
-
-
-# 六楼房间管理API
-@app.route('/api/rooms_new', methods=['POST'])
-def api_add_room_new():
-    """添加六楼房间"""
-    try:
-        data = request.get_json()
-
-        # 检查房号是否已存在
-        existing_room = RoomsNew.query.filter_by(room_number=data['room_number']).first()
-        if existing_room:
-            return jsonify({'success': False, 'message': '房号已存在'})
-
-        new_room = RoomsNew(
-            room_number=data['room_number'],
-            room_type=data['room_type'],
-            base_rent=float(data['base_rent']),
-            deposit=float(data.get('deposit', 0.00)),
-            room_status=int(data['room_status']),
-            water_meter_number=data['water_meter_number'],
-            electricity_meter_number=data['electricity_meter_number']
-        )
-
-        db.session.add(new_room)
-        db.session.commit()
-
-        return jsonify({'success': True, 'message': '房间添加成功'})
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'success': False, 'message': f'添加失败: {str(e)}'})
-
-
-# 获取六楼房间详情
-@app.route('/api/rooms_new/<int:room_id>', methods=['GET'])
-def api_get_room_new(room_id):
-    """获取六楼房间详情"""
-    try:
-        room = RoomsNew.query.get_or_404(room_id)
-
-        status_map = {
-            1: '空闲',
-            2: '已出租',
-            3: '维修中',
-            4: '停用'
-        }
-
-        room_data = {
-            'id': room.id,
-            'room_number': room.room_number,
-            'room_type': room.room_type,
-            'base_rent': float(room.base_rent),
-            'deposit': float(room.deposit),
-            'status': room.room_status,
-            'status_text': status_map.get(room.room_status, '未知'),
-            'water_meter_number': room.water_meter_number,
-            'electricity_meter_number': room.electricity_meter_number,
-            'created_at': room.created_at.strftime('%Y-%m-%d %H:%M:%S') if room.created_at else '-',
-            'updated_at': room.updated_at.strftime('%Y-%m-%d %H:%M:%S') if room.updated_at else '-'
-        }
-
-        return jsonify(room_data)
-    except Exception as e:
-        return jsonify({'error': f'获取房间信息失败: {str(e)}'})
-
-
-# 更新六楼房间信息
-@app.route('/api/rooms_new/<int:room_id>', methods=['PUT'])
-def api_update_room_new(room_id):
-    """更新六楼房间信息"""
-    try:
-        room = RoomsNew.query.get_or_404(room_id)
-        data = request.get_json()
-
-        # 检查房号是否已被其他房间使用
-        if data['room_number'] != room.room_number:
-            existing_room = RoomsNew.query.filter_by(room_number=data['room_number']).first()
-            if existing_room:
-                return jsonify({'success': False, 'message': '房号已存在'})
-
-        # 更新房间信息
-        room.room_number = data['room_number']
-        room.room_type = data['room_type']
-        room.base_rent = float(data['base_rent'])
-        room.deposit = float(data.get('deposit', 0.00))
-        room.room_status = int(data['room_status'])
-        room.water_meter_number = data['water_meter_number']
-        room.electricity_meter_number = data['electricity_meter_number']
-
-        db.session.commit()
-
-        return jsonify({'success': True, 'message': '房间更新成功'})
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'success': False, 'message': f'更新失败: {str(e)}'})
-
-
-# 删除六楼房间
-@app.route('/api/rooms_new/<int:room_id>', methods=['DELETE'])
-def api_delete_room_new(room_id):
-    """删除六楼房间"""
+@app.route('/api/rooms_<any(old, new):floor>/<int:room_id>', methods=['DELETE'])
+@invalidates_stats()
+def api_delete_room(floor, room_id):
+    """删除房间"""
+    RentalModel = FLOOR_MODELS[floor]['rental']
+    RoomsModel = FLOOR_MODELS[floor]['rooms']
     try:
-        room = RoomsNew.query.get_or_404(room_id)
+        room = RoomsModel.query.get_or_404(room_id)
 
         # 检查房间是否有关联的租赁记录
-        rental_count = RentalNew.query.filter_by(room_number=room.room_number).count()
+        rental_count = RentalModel.query.filter_by(room_id=room.id).count()
         if rental_count > 0:
             return jsonify({'success': False, 'message': '该房间有租赁记录，无法删除'})
 
@@ -841,104 +570,14 @@ def api_delete_room_new(room_id):
         return jsonify({'success': False, 'message': f'删除失败: {str(e)}'})
 
 
-# 获取六楼联系人详情
-@app.route('/api/contacts_new/<int:contact_id>', methods=['GET'])
-def api_get_contact_new(contact_id):
-    """获取六楼联系人详情"""
-    try:
-        contact = ContactsNew.query.get_or_404(contact_id)
-
-        contact_data = {
-            'id': contact.id,
-            'name': contact.name,
-            'roomId': contact.roomId,
-            'phone': contact.phone,
-            'id_card': contact.id_card,
-            'created_at': contact.created_at.strftime('%Y-%m-%d %H:%M:%S') if contact.created_at else '-'
-        }
-        return jsonify(contact_data)
-    except Exception as e:
-        return jsonify({'error': f'获取联系人信息失败: {str(e)}'})
-
-
-# 删除六楼联系人
-@app.route('/api/contacts_new/<int:contact_id>', methods=['DELETE'])
-def api_delete_contact_new(contact_id):
-    """删除六楼联系人"""
-    try:
-        contact = ContactsNew.query.get_or_404(contact_id)
-
-        # 检查联系人是否有关联的租赁记录
-
-        db.session.delete(contact)
-        db.session.commit()
-        return jsonify({'success': True, 'message': '联系人删除成功'})
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'success': False, 'message': f'删除失败: {str(e)}'})
-
-
-# 更新六楼联系人信息
-@app.route('/api/contacts_new/<int:contact_id>', methods=['PUT'])
-def api_update_contact_new(contact_id):
-    """更新六楼联系人信息"""
-    try:
-        contact = ContactsNew.query.get_or_404(contact_id)
-        data = request.get_json()
-
-        # 更新联系人信息
-        contact.name = data['name']
-        contact.roomId = data['roomId']
-        contact.phone = data['phone']
-        contact.id_card = data['id_card']
-
-        db.session.commit()
-
-        return jsonify({'success': True, 'message': '联系人更新成功'})
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'success': False, 'message': f'更新失败: {str(e)}'})
-
-
-# 添加六楼联系人
-@app.route('/contacts_new/add', methods=['GET', 'POST'])
-def contacts_new_add():
-    """添加六楼联系人页面和处理"""
-    if request.method == 'POST':
-        try:
-            data = request.get_json()
-
-            # 检查电话号码是否已存在
-            existing_contact = ContactsNew.query.filter_by(phone=data['phone']).first()
-            if existing_contact:
-                return jsonify({'success': False, 'message': '电话号码已存在'})
-
-            # 创建新联系人
-            new_contact = ContactsNew(
-                name=data['name'],
-                roomId=data['roomId'],
-                phone=data['phone'],
-                id_card=data['id_card']
-            )
-
-            db.session.add(new_contact)
-            db.session.commit()
-
-            return jsonify({'success': True, 'message': '联系人添加成功'})
-
-        except Exception as e:
-            db.session.rollback()
-            return jsonify({'success': False, 'message': f'添加失败: {str(e)}'})
-
-    return render_template('contacts_new.html')
-
-
-# 删除五楼联系人
-@app.route('/api/contacts_old/<int:contact_id>', methods=['DELETE'])
-def api_delete_contact_old(contact_id):
+# 删除联系人
+@app.route('/api/contacts_<any(old, new):floor>/<int:contact_id>', methods=['DELETE'])
+@invalidates_stats()
+def api_delete_contact(floor, contact_id):
     """删除联系人"""
+    ContactsModel = FLOOR_MODELS[floor]['contacts']
     try:
-        contact = ContactsOld.query.get_or_404(contact_id)
+        contact = ContactsModel.query.get_or_404(contact_id)
 
         # 检查联系人是否有关联的租赁记录
 
@@ -951,16 +590,18 @@ def api_delete_contact_old(contact_id):
 
 
 # 更新房间信息
-@app.route('/api/rooms_old/<int:room_id>', methods=['PUT'])
-def api_update_room_old(room_id):
-    """更新五楼房间信息"""
+@app.route('/api/rooms_<any(old, new):floor>/<int:room_id>', methods=['PUT'])
+@invalidates_stats()
+def api_update_room(floor, room_id):
+    """更新房间信息"""
+    RoomsModel = FLOOR_MODELS[floor]['rooms']
     try:
-        room = RoomsOld.query.get_or_404(room_id)
+        room = RoomsModel.query.get_or_404(room_id)
         data = request.get_json()
 
         # 检查房号是否已被其他房间使用
         if data['room_number'] != room.room_number:
-            existing_room = RoomsOld.query.filter_by(room_number=data['room_number']).first()
+            existing_room = RoomsModel.query.filter_by(room_number=data['room_number']).first()
             if existing_room:
                 return jsonify({'success': False, 'message': '房号已存在'})
 
@@ -982,16 +623,18 @@ def api_update_room_old(room_id):
 
 
 # 更新联系人信息
-@app.route('/api/contacts_old/<int:contact_id>', methods=['PUT'])
-def api_update_contact_old(contact_id):
+@app.route('/api/contacts_<any(old, new):floor>/<int:contact_id>', methods=['PUT'])
+@invalidates_stats()
+def api_update_contact(floor, contact_id):
     """更新联系人信息"""
+    ContactsModel = FLOOR_MODELS[floor]['contacts']
     try:
-        contact = ContactsOld.query.get_or_404(contact_id)
+        contact = ContactsModel.query.get_or_404(contact_id)
         data = request.get_json()
 
-        # 检查联系人是否已被其他联系人使用
+        # 检查电话号码是否已被其他联系人使用
         if data['phone'] != contact.phone:
-            existing_contact = ContactsOld.query.filter_by(phone=data['phone']).first()
+            existing_contact = ContactsModel.query.filter_by(phone=data['phone']).first()
             if existing_contact:
                 return jsonify({'success': False, 'message': '电话号码已存在'})
 
@@ -1009,18 +652,20 @@ def api_update_contact_old(contact_id):
         return jsonify({'success': False, 'message': f'更新失败: {str(e)}'})
 
 
-# 联系人
-@app.route('/api/contacts', methods=['POST'])
-def api_contacts():
+# 添加联系人API
+@app.route('/api/contacts_<any(old, new):floor>', methods=['POST'])
+@invalidates_stats()
+def api_add_contact(floor):
     """添加联系人"""
+    ContactsModel = FLOOR_MODELS[floor]['contacts']
     try:
         data = request.get_json()
 
         # 检查联系人是否存在
-        exist_contact = ContactsOld.query.filter_by(phone=data['phone']).first()
+        exist_contact = ContactsModel.query.filter_by(phone=data['phone']).first()
         if exist_contact:
             return jsonify({'success': False, 'message': '电话号码已存在'})
-        new_contact = ContactsOld(
+        new_contact = ContactsModel(
             phone=data['phone'],
             name=data['name'],
             roomId=data['roomId'],
@@ -1034,112 +679,69 @@ def api_contacts():
         return jsonify({'success': False, 'message': f'添加失败: {str(e)}'})
 
 
-# 六楼联系人API
-@app.route('/api/contacts_new', methods=['POST'])
-def api_contacts_new():
-    """添加六楼联系人"""
-    try:
-        data = request.get_json()
+@app.route('/api/contacts', methods=['POST'])
+def api_contacts():
+    """添加五楼联系人（旧地址）"""
+    return api_add_contact(floor='old')
 
-        # 检查联系人是否存在
-        exist_contact = ContactsNew.query.filter_by(phone=data['phone']).first()
-        if exist_contact:
-            return jsonify({'success': False, 'message': '电话号码已存在'})
-        new_contact = ContactsNew(
-            phone=data['phone'],
-            name=data['name'],
-            roomId=data['roomId'],
-            id_card=data['id_card']
-        )
-        db.session.add(new_contact)
-        db.session.commit()
-        return jsonify({'success': True, 'message': '联系人添加成功'})
+
+# 全局搜索API：租户、联系人、合同、房间，支持姓名拼音和首字母
+@app.route('/api/search', methods=['GET'])
+def api_search():
+    """跨楼层、跨数据类型的统一搜索，按相关度排序"""
+    try:
+        floor = request.args.get('floor')
+        if floor not in FLOOR_MODELS:
+            floor = None
+        entity = request.args.get('type')
+        entities = [entity] if entity in SEARCH_ENTITIES else None
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+        results = search(request.args.get('q', ''), floor=floor, entities=entities, limit=limit)
+        return jsonify({'success': True, 'results': results})
     except Exception as e:
-        db.session.rollback()
-        return jsonify({'success': False, 'message': f'添加失败: {str(e)}'})
+        return jsonify({'success': False, 'message': f'搜索失败: {str(e)}'})
 
 
 # 租房信息详情API
-@app.route('/api/rental_info_old/<int:info_id>', methods=['GET'])
-def api_get_rental_info_old(info_id):
+@app.route('/api/rental_info_<any(old, new):floor>/<int:info_id>', methods=['GET'])
+def api_get_rental_info(floor, info_id):
     """获取租房信息详情"""
+    RentalInfoModel = FLOOR_MODELS[floor]['rental_info']
     try:
-        info = RentalInfoOld.query.get_or_404(info_id)
-
-        status_map = {
-            1: '已缴费',
-            2: '未缴费'
-        }
-
-        info_data = {
-            'id': info.id,
-            'room_number': info.room_number,
-            'tenant_name': info.tenant_name,
-            'phone': info.phone,
-            'deposit': float(info.deposit) if info.deposit else 0,
-            'occupant_count': info.occupant_count,
-            'check_in_date': info.check_in_date.strftime('%Y-%m-%d') if info.check_in_date else '',
-            'rental_status': info.rental_status,
-            'rental_status_text': status_map.get(info.rental_status, '未知'),
-            'remarks': info.remarks or '',
-            'created_at': info.created_at.strftime('%Y-%m-%d %H:%M:%S') if info.created_at else '-',
-            'updated_at': info.updated_at.strftime('%Y-%m-%d %H:%M:%S') if info.updated_at else '-'
-        }
-
-        return jsonify(info_data)
+        return jsonify(RENTAL_INFO_DETAIL.get_or_404(RentalInfoModel, info_id))
     except Exception as e:
         return jsonify({'error': f'获取租房信息失败: {str(e)}'})
 
 
 # 搜索租房信息API
-@app.route('/api/rental_info_old/search', methods=['GET'])
-def api_search_rental_info_old():
+@app.route('/api/rental_info_<any(old, new):floor>/search', methods=['GET'])
+def api_search_rental_info(floor):
     """搜索租房信息"""
+    RentalInfoModel = FLOOR_MODELS[floor]['rental_info']
     try:
         search_term = request.args.get('q', '').strip()
         filter_status = request.args.get('status', 'all')
 
         # 构建查询
-        query = RentalInfoOld.query
+        query = RENTAL_INFO_LIST.select(RentalInfoModel)
 
-        # 添加搜索条件
+        # 添加搜索条件：通过搜索索引匹配房号、姓名（含拼音）、电话
         if search_term:
-            search_filter = db.or_(
-                RentalInfoOld.room_number.like(f'%{search_term}%'),
-                RentalInfoOld.tenant_name.like(f'%{search_term}%'),
-                RentalInfoOld.phone.like(f'%{search_term}%')
-            )
-            query = query.filter(search_filter)
+            condition = RentalInfoModel.id.in_(match_ids(search_term, floor, 'rental_info'))
+            if len(search_term) < TRIGRAM_MIN_LENGTH:
+                # 短关键词在索引中只能前缀匹配，补充房号、姓名、电话的包含匹配（如“三”“13”“01”）
+                condition = or_(condition, contains_condition(
+                    (RentalInfoModel.room_number, RentalInfoModel.tenant_name, RentalInfoModel.phone), search_term
+                ))
+            query = query.where(condition)
 
         # 添加状态筛选
         if filter_status == 'paid':
-            query = query.filter(RentalInfoOld.rental_status == 1)
+            query = query.where(RentalInfoModel.rental_status == 1)
         elif filter_status == 'unpaid':
-            query = query.filter(RentalInfoOld.rental_status == 2)
-
-        # 执行查询
-        rental_info_list = query.all()
-
-        # 转换为字典格式
-        status_map = {
-            1: '已缴费',
-            2: '未缴费'
-        }
-
-        results = []
-        for info in rental_info_list:
-            results.append({
-                'id': info.id,
-                'room_number': info.room_number,
-                'tenant_name': info.tenant_name,
-                'phone': info.phone,
-                'deposit': float(info.deposit) if info.deposit else 0,
-                'occupant_count': info.occupant_count,
-                'check_in_date': info.check_in_date.strftime('%Y-%m-%d') if info.check_in_date else '',
-                'rental_status': info.rental_status,
-                'rental_status_text': status_map.get(info.rental_status, '未知'),
-                'remarks': info.remarks or ''
-            })
+            query = query.where(RentalInfoModel.rental_status == 2)
+
+        results = RENTAL_INFO_LIST.all(query.order_by(RentalInfoModel.id))
 
         return jsonify({
             'success': True,
@@ -1152,14 +754,17 @@ def api_search_rental_info_old():
 
 
 # 添加租房信息API
-@app.route('/api/rental_info_old', methods=['POST'])
-def api_add_rental_info_old():
+@app.route('/api/rental_info_<any(old, new):floor>', methods=['POST'])
+@invalidates_stats()
+def api_add_rental_info(floor):
     """添加租房信息"""
+    RentalInfoModel = FLOOR_MODELS[floor]['rental_info']
+    RoomsModel = FLOOR_MODELS[floor]['rooms']
     try:
         data = request.get_json()
 
         # 检查房号是否已存在
-        existing_info = RentalInfoOld.query.filter_by(room_number=data['room_number']).first()
+        existing_info = RentalInfoModel.query.filter_by(room_number=data['room_number']).first()
         if existing_info:
             return jsonify({'success': False, 'message': '该房号已有租房信息'})
 
@@ -1172,7 +777,7 @@ def api_add_rental_info_old():
                 return jsonify({'success': False, 'message': '入住日期格式不正确'})
 
         # 创建新记录
-        new_info = RentalInfoOld(
+        new_info = RentalInfoModel(
             room_number=data['room_number'],
             tenant_name=data['tenant_name'],
             phone=data['phone'],
@@ -1186,7 +791,7 @@ def api_add_rental_info_old():
         db.session.add(new_info)
 
         # 更新对应房间状态为已出租
-        room = RoomsOld.query.filter_by(room_number=data['room_number']).first()
+        room = RoomsModel.query.filter_by(room_number=data['room_number']).first()
         if room:
             room.room_status = 2  # 2表示已出租
             room.updated_at = datetime.now()
@@ -1201,16 +806,18 @@ def api_add_rental_info_old():
 
 
 # 更新租房信息API
-@app.route('/api/rental_info_old/<int:info_id>', methods=['PUT'])
-def api_update_rental_info_old(info_id):
+@app.route('/api/rental_info_<any(old, new):floor>/<int:info_id>', methods=['PUT'])
+@invalidates_stats()
+def api_update_rental_info(floor, info_id):
     """更新租房信息"""
+    RentalInfoModel = FLOOR_MODELS[floor]['rental_info']
     try:
-        info = RentalInfoOld.query.get_or_404(info_id)
+        info = RentalInfoModel.query.get_or_404(info_id)
         data = request.get_json()
 
         # 检查房号是否被其他记录使用
         if data['room_number'] != info.room_number:
-            existing_info = RentalInfoOld.query.filter_by(room_number=data['room_number']).first()
+            existing_info = RentalInfoModel.query.filter_by(room_number=data['room_number']).first()
             if existing_info:
                 return jsonify({'success': False, 'message': '该房号已有其他租房信息'})
 
@@ -1242,14 +849,17 @@ def api_update_rental_info_old(info_id):
 
 
 # 删除租房信息API
-@app.route('/api/rental_info_old/<int:info_id>', methods=['DELETE'])
-def api_delete_rental_info_old(info_id):
+@app.route('/api/rental_info_<any(old, new):floor>/<int:info_id>', methods=['DELETE'])
+@invalidates_stats()
+def api_delete_rental_info(floor, info_id):
     """删除租房信息"""
+    RentalInfoModel = FLOOR_MODELS[floor]['rental_info']
+    RentalModel = FLOOR_MODELS[floor]['rental']
     try:
-        info = RentalInfoOld.query.get_or_404(info_id)
+        info = RentalInfoModel.query.get_or_404(info_id)
 
         # 检查是否有关联的租赁记录
-        rental_count = RentalOld.query.filter_by(room_number=info.room_number).count()
+        rental_count = RentalModel.query.filter_by(room_number=info.room_number).count()
         if rental_count > 0:
             return jsonify({'success': False, 'message': '该房间有租赁记录，无法删除'})
 
@@ -1263,241 +873,43 @@ def api_delete_rental_info_old(info_id):
         return jsonify({'success': False, 'message': f'删除失败: {str(e)}'})
 
 
-# 六楼租房信息API
-@app.route('/api/rental_info_new/<int:info_id>', methods=['GET'])
-def api_get_rental_info_new(info_id):
-    """获取六楼租房信息详情"""
-    try:
-        info = RentalInfoNew.query.get_or_404(info_id)
-
-        status_map = {
-            1: '已缴费',
-            2: '未缴费'
-        }
-
-        info_data = {
-            'id': info.id,
-            'room_number': info.room_number,
-            'tenant_name': info.tenant_name,
-            'phone': info.phone,
-            'deposit': float(info.deposit) if info.deposit else 0,
-            'occupant_count': info.occupant_count,
-            'check_in_date': info.check_in_date.strftime('%Y-%m-%d') if info.check_in_date else '',
-            'rental_status': info.rental_status,
-            'rental_status_text': status_map.get(info.rental_status, '未知'),
-            'remarks': info.remarks or '',
-            'created_at': info.created_at.strftime('%Y-%m-%d %H:%M:%S') if info.created_at else '-',
-            'updated_at': info.updated_at.strftime('%Y-%m-%d %H:%M:%S') if info.updated_at else '-'
-        }
-
-        return jsonify(info_data)
-    except Exception as e:
-        return jsonify({'error': f'获取租房信息失败: {str(e)}'})
-
-
-@app.route('/api/rental_info_new/search', methods=['GET'])
-def api_search_rental_info_new():
-    """搜索六楼租房信息"""
-    try:
-        search_term = request.args.get('q', '').strip()
-        filter_status = request.args.get('status', 'all')
-
-        # 构建查询
-        query = RentalInfoNew.query
-
-        # 添加搜索条件
-        if search_term:
-            search_filter = db.or_(
-                RentalInfoNew.room_number.like(f'%{search_term}%'),
-                RentalInfoNew.tenant_name.like(f'%{search_term}%'),
-                RentalInfoNew.phone.like(f'%{search_term}%')
-            )
-            query = query.filter(search_filter)
-
-        # 添加状态筛选
-        if filter_status == 'paid':
-            query = query.filter(RentalInfoNew.rental_status == 1)
-        elif filter_status == 'unpaid':
-            query = query.filter(RentalInfoNew.rental_status == 2)
-
-        # 执行查询
-        rental_info_list = query.all()
-
-        # 转换为字典格式
-        status_map = {
-            1: '已缴费',
-            2: '未缴费'
-        }
-
-        results = []
-        for info in rental_info_list:
-            results.append({
-                'id': info.id,
-                'room_number': info.room_number,
-                'tenant_name': info.tenant_name,
-                'phone': info.phone,
-                'deposit': float(info.deposit) if info.deposit else 0,
-                'occupant_count': info.occupant_count,
-                'check_in_date': info.check_in_date.strftime('%Y-%m-%d') if info.check_in_date else '',
-                'rental_status': info.rental_status,
-                'rental_status_text': status_map.get(info.rental_status, '未知'),
-                'remarks': info.remarks or ''
-            })
-
-        return jsonify({
-            'success': True,
-            'data': results,
-            'total': len(results)
-        })
-
-    except Exception as e:
-        return jsonify({'success': False, 'message': f'搜索失败: {str(e)}'})
-
-
-@app.route('/api/rental_info_new', methods=['POST'])
-def api_add_rental_info_new():
-    """添加六楼租房信息"""
+# 添加租房管理记录API
+@app.route('/api/rental_<any(old, new):floor>', methods=['POST'])
+@invalidates_stats()
+def api_add_rental(floor):
+    """添加租房管理记录"""
+    RentalModel = FLOOR_MODELS[floor]['rental']
     try:
         data = request.get_json()
 
         # 检查房号是否已存在
-        existing_info = RentalInfoNew.query.filter_by(room_number=data['room_number']).first()
-        if existing_info:
-            return jsonify({'success': False, 'message': '该房号已有租房信息'})
+        existing_rental = RentalModel.query.filter_by(room_number=data['room_number']).first()
+        if existing_rental:
+            return jsonify({'success': False, 'message': '该房号已有租房记录'})
 
-        # 处理入住日期
+        # 处理日期字段
         check_in_date = None
+        check_out_date = None
+        contract_start_date = None
+        contract_end_date = None
+
         if data.get('check_in_date'):
             try:
                 check_in_date = datetime.strptime(data['check_in_date'], '%Y-%m-%d').date()
             except ValueError:
                 return jsonify({'success': False, 'message': '入住日期格式不正确'})
 
-        # 创建新记录
-        new_info = RentalInfoNew(
-            room_number=data['room_number'],
-            tenant_name=data['tenant_name'],
-            phone=data['phone'],
-            deposit=float(data['deposit']) if data.get('deposit') else 0,
-            occupant_count=int(data['occupant_count']),
-            check_in_date=check_in_date,
-            rental_status=int(data['rental_status']),
-            remarks=data.get('remarks', '')
-        )
+        if data.get('check_out_date'):
+            try:
+                check_out_date = datetime.strptime(data['check_out_date'], '%Y-%m-%d').date()
+            except ValueError:
+                return jsonify({'success': False, 'message': '退房日期格式不正确'})
 
-        db.session.add(new_info)
-
-        # 更新对应房间状态为已出租
-        room = RoomsNew.query.filter_by(room_number=data['room_number']).first()
-        if room:
-            room.room_status = 2  # 2表示已出租
-            room.updated_at = datetime.now()
-
-        db.session.commit()
-
-        return jsonify({'success': True, 'message': '租房信息添加成功，房间状态已更新'})
-
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'success': False, 'message': f'添加失败: {str(e)}'})
-
-
-@app.route('/api/rental_info_new/<int:info_id>', methods=['PUT'])
-def api_update_rental_info_new(info_id):
-    """更新六楼租房信息"""
-    try:
-        info = RentalInfoNew.query.get_or_404(info_id)
-        data = request.get_json()
-
-        # 检查房号是否被其他记录使用
-        if data['room_number'] != info.room_number:
-            existing_info = RentalInfoNew.query.filter_by(room_number=data['room_number']).first()
-            if existing_info:
-                return jsonify({'success': False, 'message': '该房号已有其他租房信息'})
-
-        # 处理入住日期
-        check_in_date = None
-        if data.get('check_in_date'):
-            try:
-                check_in_date = datetime.strptime(data['check_in_date'], '%Y-%m-%d').date()
-            except ValueError:
-                return jsonify({'success': False, 'message': '入住日期格式不正确'})
-
-        # 更新信息
-        info.room_number = data['room_number']
-        info.tenant_name = data['tenant_name']
-        info.phone = data['phone']
-        info.deposit = float(data['deposit']) if data.get('deposit') else 0
-        info.occupant_count = int(data['occupant_count'])
-        info.check_in_date = check_in_date
-        info.rental_status = int(data['rental_status'])
-        info.remarks = data.get('remarks', '')
-
-        db.session.commit()
-
-        return jsonify({'success': True, 'message': '租房信息更新成功'})
-
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'success': False, 'message': f'更新失败: {str(e)}'})
-
-
-@app.route('/api/rental_info_new/<int:info_id>', methods=['DELETE'])
-def api_delete_rental_info_new(info_id):
-    """删除六楼租房信息"""
-    try:
-        info = RentalInfoNew.query.get_or_404(info_id)
-
-        # 检查是否有关联的租赁记录
-        rental_count = RentalNew.query.filter_by(room_number=info.room_number).count()
-        if rental_count > 0:
-            return jsonify({'success': False, 'message': '该房间有租赁记录，无法删除'})
-
-        db.session.delete(info)
-        db.session.commit()
-
-        return jsonify({'success': True, 'message': '租房信息删除成功'})
-
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'success': False, 'message': f'删除失败: {str(e)}'})
-
-
-# 添加租房管理记录API
-@app.route('/api/rental_old', methods=['POST'])
-def api_add_rental_old():
-    """添加租房管理记录"""
-    try:
-        data = request.get_json()
-
-        # 检查房号是否已存在
-        existing_rental = RentalOld.query.filter_by(room_number=data['room_number']).first()
-        if existing_rental:
-            return jsonify({'success': False, 'message': '该房号已有租房记录'})
-
-        # 处理日期字段
-        check_in_date = None
-        check_out_date = None
-        contract_start_date = None
-        contract_end_date = None
-
-        if data.get('check_in_date'):
-            try:
-                check_in_date = datetime.strptime(data['check_in_date'], '%Y-%m-%d').date()
-            except ValueError:
-                return jsonify({'success': False, 'message': '入住日期格式不正确'})
-
-        if data.get('check_out_date'):
-            try:
-                check_out_date = datetime.strptime(data['check_out_date'], '%Y-%m-%d').date()
-            except ValueError:
-                return jsonify({'success': False, 'message': '退房日期格式不正确'})
-
-        if data.get('contract_start_date'):
-            try:
-                contract_start_date = datetime.strptime(data['contract_start_date'], '%Y-%m-%d').date()
-            except ValueError:
-                return jsonify({'success': False, 'message': '合同开始日期格式不正确'})
+        if data.get('contract_start_date'):
+            try:
+                contract_start_date = datetime.strptime(data['contract_start_date'], '%Y-%m-%d').date()
+            except ValueError:
+                return jsonify({'success': False, 'message': '合同开始日期格式不正确'})
 
         if data.get('contract_end_date'):
             try:
@@ -1507,18 +919,22 @@ def api_add_rental_old():
 
         # 计算应缴费总额
         monthly_rent = float(data.get('monthly_rent', 0))
-        water_fee = float(data.get('water_fee', 0))
-        electricity_fee = float(data.get('electricity_fee', 0))
-        utilities_fee = float(data.get('utilities_fee', 0))
 
-        # 从费用反推用量（前端已经计算好费用，我们需要反推用量）
-        water_usage = water_fee / 3.5 if water_fee > 0 else 0  # 水费：3.5元/方
-        electricity_usage = electricity_fee / 1.2 if electricity_fee > 0 else 0  # 电费：1.2元/度
+        # 按房间单价（合同 > 楼层 > 全局）由用量计算费用；只提交费用时反推用量
+        fees = utility_fees(floor, data['room_number'], data)
+        water_fee = fees['water_fee']
+        electricity_fee = fees['electricity_fee']
+        water_usage = fees['water_usage']
+        electricity_usage = fees['electricity_usage']
+        if data.get('water_usage') is not None or data.get('electricity_usage') is not None:
+            utilities_fee = water_fee + electricity_fee
+        else:
+            utilities_fee = float(data.get('utilities_fee', 0))
 
         total_due = monthly_rent + utilities_fee
 
         # 创建新记录
-        new_rental = RentalOld(
+        new_rental = RentalModel(
             room_number=data['room_number'],
             tenant_name=data['tenant_name'],
             deposit=float(data.get('deposit', 0)),
@@ -1538,6 +954,7 @@ def api_add_rental_old():
         )
 
         db.session.add(new_rental)
+        sync_rental_bill(floor, new_rental)
         db.session.commit()
 
         return jsonify({'success': True, 'message': '租房记录添加成功'})
@@ -1547,53 +964,33 @@ def api_add_rental_old():
         return jsonify({'success': False, 'message': f'添加失败: {str(e)}'})
 
 
-# 租房管理详情API
-@app.route('/api/rental_old/<int:rental_id>', methods=['GET'])
-def api_get_rental_old(rental_id):
+# 租房管理详情API，六楼记录包含入住、退房和合同日期
+RENTAL_DETAIL = {'old': RENTAL_OLD_DETAIL, 'new': RENTAL_NEW_DETAIL}
+
+
+@app.route('/api/rental_<any(old, new):floor>/<int:rental_id>', methods=['GET'])
+def api_get_rental(floor, rental_id):
     """租房管理详情"""
+    RentalModel = FLOOR_MODELS[floor]['rental']
     try:
-        rental = RentalOld.query.get_or_404(rental_id)
-        status_map = {
-            1: '已缴费',
-            2: '未缴费'
-        }
-
-        rental_data = {
-            'id': rental.id,
-            'room_number': rental.room_number,
-            'tenant_name': rental.tenant_name,
-            'deposit': float(rental.deposit) if rental.deposit else 0,
-            'monthly_rent': float(rental.monthly_rent) if rental.monthly_rent else 0,
-            'water_fee': float(rental.water_fee) if rental.water_fee else 0,
-            'electricity_fee': float(rental.electricity_fee) if rental.electricity_fee else 0,
-            'water_usage': float(rental.water_usage) if hasattr(rental, 'water_usage') and rental.water_usage else 0,
-            'electricity_usage': float(rental.electricity_usage) if hasattr(rental,
-                                                                            'electricity_usage') and rental.electricity_usage else 0,
-            'utilities_fee': float(rental.utilities_fee) if rental.utilities_fee else 0,
-            'total_due': float(rental.total_due) if rental.total_due else 0,
-            'payment_status': rental.payment_status,
-            'payment_status_text': status_map.get(rental.payment_status, '未知'),
-            'remarks': rental.remarks or '',
-            'created_at': rental.created_at.strftime('%Y-%m-%d %H:%M:%S') if rental.created_at else '-',
-            'updated_at': rental.updated_at.strftime('%Y-%m-%d %H:%M:%S') if rental.updated_at else '-'
-        }
-
-        return jsonify(rental_data)
+        return jsonify(RENTAL_DETAIL[floor].get_or_404(RentalModel, rental_id))
     except Exception as e:
         return jsonify({'error': f'获取租房管理失败: {str(e)}'})
 
 
 # 编辑租房管理
-@app.route('/api/rental_old/<int:rental_id>', methods=['PUT'])
-def api_update_rental_old(rental_id):
+@app.route('/api/rental_<any(old, new):floor>/<int:rental_id>', methods=['PUT'])
+@invalidates_stats()
+def api_update_rental(floor, rental_id):
     """更新租房管理"""
+    RentalModel = FLOOR_MODELS[floor]['rental']
     try:
-        rental = RentalOld.query.get_or_404(rental_id)
+        rental = RentalModel.query.get_or_404(rental_id)
         data = request.get_json()
 
         # 检查房号是否被其他记录使用
         if data['room_number'] != rental.room_number:
-            existing_info = RentalOld.query.filter_by(room_number=data['room_number']).first()
+            existing_info = RentalModel.query.filter_by(room_number=data['room_number']).first()
             if existing_info:
                 return jsonify({'success': False, 'message': '该房号已有其他租房管理'})
 
@@ -1629,13 +1026,13 @@ def api_update_rental_old(rental_id):
             except ValueError:
                 return jsonify({'success': False, 'message': '退房日期格式不正确'})
 
-        # 获取费用数据
-        water_fee = float(data['water_fee']) if data.get('water_fee') else 0
-        electricity_fee = float(data['electricity_fee']) if data.get('electricity_fee') else 0
-
-        # 从费用反推用量
-        water_usage = water_fee / 3.5 if water_fee > 0 else 0
-        electricity_usage = electricity_fee / 1.2 if electricity_fee > 0 else 0
+        # 按房间单价（合同 > 楼层 > 全局）由用量计算费用；只提交费用时反推用量
+        fees = utility_fees(floor, data['room_number'], data)
+        water_fee = fees['water_fee']
+        electricity_fee = fees['electricity_fee']
+        water_usage = fees['water_usage']
+        electricity_usage = fees['electricity_usage']
+        usage_submitted = data.get('water_usage') is not None or data.get('electricity_usage') is not None
 
         rental.room_number = data['room_number']
         rental.tenant_name = data['tenant_name']
@@ -1645,8 +1042,12 @@ def api_update_rental_old(rental_id):
         rental.water_usage = water_usage
         rental.electricity_usage = electricity_usage
         rental.electricity_fee = electricity_fee
-        rental.utilities_fee = float(data['utilities_fee']) if data.get('utilities_fee') else 0
-        rental.total_due = float(data['total_due']) if data.get('total_due') else 0
+        if usage_submitted:
+            rental.utilities_fee = water_fee + electricity_fee
+            rental.total_due = float(rental.monthly_rent) + rental.utilities_fee
+        else:
+            rental.utilities_fee = float(data['utilities_fee']) if data.get('utilities_fee') else 0
+            rental.total_due = float(data['total_due']) if data.get('total_due') else 0
         rental.payment_status = int(data['payment_status']) if data.get('payment_status') else 2
         rental.check_in_date = check_in_date
         rental.check_out_date = check_out_date
@@ -1654,6 +1055,7 @@ def api_update_rental_old(rental_id):
         rental.contract_end_date = contract_end_date
         rental.remarks = data.get('remarks', '')
 
+        sync_rental_bill(floor, rental)
         db.session.commit()
         return jsonify({'success': True, 'message': '租房管理更新成功'})
 
@@ -1663,43 +1065,67 @@ def api_update_rental_old(rental_id):
 
 
 # 标记已缴费
-@app.route('/rental/<int:rental_id>/mark_paid', methods=['POST'])
-def mark_rental_paid(rental_id):
+@app.route('/rental_<any(old, new):floor>/<int:rental_id>/mark_paid', methods=['POST'])
+@invalidates_stats()
+def mark_rental_paid(floor, rental_id):
     """标记租房记录为已缴费"""
+    RentalModel = FLOOR_MODELS[floor]['rental']
+    RecordsModel = FLOOR_MODELS[floor]['records']
     try:
-        rental = RentalOld.query.get_or_404(rental_id)
-
-        # 更新缴费状态为已缴费(1)
-        rental.payment_status = 1
+        rental = RentalModel.query.get_or_404(rental_id)
         rental.updated_at = datetime.now()
 
-        # 创建缴费记录到 rental_records_old 表
-        rental_record = RentalRecordsOld(
+        # 同步当前账期账单后结清全部欠费账单（包括以前账期），缴费金额为本次结清的金额
+        sync_rental_bill(floor, rental)
+        settled = settle_open_bills(floor, [rental.id])
+        amount = settled.get(rental.id, rental.total_due)
+
+        # 同时更新租房信息表中对应房间的缴费状态
+        if floor in SYNC_RENTAL_INFO_FLOORS:
+            RentalInfoModel = FLOOR_MODELS[floor]['rental_info']
+            rental_info = RentalInfoModel.query.filter_by(room_number=rental.room_number).first()
+            if rental_info:
+                rental_info.rental_status = 1  # 标记为已缴费
+                rental_info.updated_at = datetime.now()
+
+        # 创建缴费记录
+        rental_record = RecordsModel(
             room_number=rental.room_number,
+            room_id=rental.room_id,
             tenant_name=rental.tenant_name,
-            total_rent=rental.total_due,  # 使用应缴费总额
+            total_rent=amount,
             payment_date=datetime.now().date(),
             created_at=datetime.now()
         )
 
-        # 保存更新和新记录
+        # 保存新记录并更新缴费状态为已缴费(1)
         db.session.add(rental_record)
+        rental.payment_status = 1
         db.session.commit()
 
-        return jsonify({'success': True, 'message': '已成功标记为已缴费并记录缴费信息'})
+        return jsonify({'success': True, 'message': f'已成功标记为已缴费并记录缴费信息（¥{float(amount):.2f}）'})
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'message': f'标记失败: {str(e)}'})
 
 
+@app.route('/rental/<int:rental_id>/mark_paid', methods=['POST'])
+def mark_rental_old_paid(rental_id):
+    """标记五楼租房记录为已缴费（旧地址）"""
+    return mark_rental_paid(floor='old', rental_id=rental_id)
+
+
 # 删除租房管理
-@app.route('/api/rental_old/<int:rental_id>', methods=['DELETE'])
-def api_delete_rental_old(rental_id):
+@app.route('/api/rental_<any(old, new):floor>/<int:rental_id>', methods=['DELETE'])
+@invalidates_stats()
+def api_delete_rental(floor, rental_id):
     """删除租房管理记录"""
+    RentalModel = FLOOR_MODELS[floor]['rental']
     try:
-        rental = RentalOld.query.get_or_404(rental_id)
+        rental = RentalModel.query.get_or_404(rental_id)
 
-        # 删除租房记录
+        # 删除租房记录及其未结清的账单，已结清的账单保留用于收入统计
+        delete_unpaid_bills(floor, rental.id)
         db.session.delete(rental)
         db.session.commit()
         return jsonify({'success': True, 'message': '租房记录删除成功'})
@@ -1708,336 +1134,329 @@ def api_delete_rental_old(rental_id):
         return jsonify({'success': False, 'message': f'删除失败: {str(e)}'})
 
 
-# 六楼租房管理API
-@app.route('/api/rental_new', methods=['POST'])
-def api_add_rental_new():
-    """添加六楼租房管理记录"""
+@app.route('/api/rental_<any(old, new):floor>/mark_paid', methods=['POST'])
+def api_batch_mark_paid(floor):
+    """批量标记租房记录为已缴费，请求体格式：{"ids": [1, 2, 3]}"""
     try:
-        data = request.get_json()
-
-        # 检查房号是否已存在
-        existing_rental = RentalNew.query.filter_by(room_number=data['room_number']).first()
-        if existing_rental:
-            return jsonify({'success': False, 'message': '该房号已有租房记录'})
-
-        # 处理日期字段
-        check_in_date = None
-        check_out_date = None
-        contract_start_date = None
-        contract_end_date = None
+        data = request.get_json() or {}
+        rental_ids = list(dict.fromkeys(int(rental_id) for rental_id in data.get('ids', [])))
+        if not rental_ids:
+            return jsonify({'success': False, 'message': '请选择要标记的记录'})
+
+        results = mark_rentals_paid(floor, rental_ids)
+        stats_cache.invalidate(floor)
+        paid_count = sum(1 for status in results.values() if status == 'paid')
+        return jsonify({
+            'success': True,
+            'message': f'已成功标记 {paid_count} 条记录为已缴费',
+            'paid_count': paid_count,
+            'results': [{'id': rental_id, 'status': status} for rental_id, status in results.items()]
+        })
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'message': '记录ID格式不正确'})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': f'标记失败: {str(e)}'})
 
-        if data.get('check_in_date'):
-            try:
-                check_in_date = datetime.strptime(data['check_in_date'], '%Y-%m-%d').date()
-            except ValueError:
-                return jsonify({'success': False, 'message': '入住日期格式不正确'})
 
-        if data.get('check_out_date'):
-            try:
-                check_out_date = datetime.strptime(data['check_out_date'], '%Y-%m-%d').date()
-            except ValueError:
-                return jsonify({'success': False, 'message': '退房日期格式不正确'})
+@app.route('/api/meter_readings_<any(old, new):floor>/import', methods=['POST'])
+def api_import_meter_readings(floor):
+    """批量导入抄表读数并更新水电费
 
-        if data.get('contract_start_date'):
+    支持上传 CSV / JSON 文件（表单字段 file，可选 period=YYYY-MM），
+    或直接提交 JSON：{"period": "2025-01", "readings": [{"meter_number": "W501", "reading": 123.4}]}。
+    """
+    try:
+        upload = request.files.get('file')
+        if upload:
+            period_value = request.form.get('period')
+            if upload.filename.lower().endswith('.json'):
+                rows = iter_json_rows(json.load(upload.stream))
+            else:
+                rows = iter_csv_rows(upload.stream)
+        else:
+            data = request.get_json(silent=True)
+            if data is None:
+                return jsonify({'success': False, 'message': '请上传抄表文件或提交抄表数据'})
+            period_value = data.get('period') if isinstance(data, dict) else None
+            rows = iter_json_rows(data)
+
+        period = None
+        if period_value:
             try:
-                contract_start_date = datetime.strptime(data['contract_start_date'], '%Y-%m-%d').date()
+                period, _ = month_range(*parse_month(period_value))
             except ValueError:
-                return jsonify({'success': False, 'message': '合同开始日期格式不正确'})
+                return jsonify({'success': False, 'message': '账期格式应为 YYYY-MM'})
+
+        result = import_meter_readings(floor, rows, period)
+        stats_cache.invalidate(floor)
+        message = (f"成功导入 {result['imported']} 条读数，更新 {result['rentals_updated']} 条租房记录、"
+                   f"{result['bills_updated']} 张账单的水电费")
+        if result['unmatched']:
+            message += f"，{len(result['unmatched'])} 个表号未匹配到房间"
+        if result['errors']:
+            message += f"，{len(result['errors'])} 行数据有误"
+        return jsonify({'success': True, 'message': message, **result})
+    except (UnicodeDecodeError, json.JSONDecodeError, csv.Error):
+        db.session.rollback()
+        return jsonify({'success': False, 'message': '文件格式不正确，请上传 UTF-8 编码的 CSV 或 JSON 文件'})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': f'导入失败: {str(e)}'})
 
-        if data.get('contract_end_date'):
-            try:
-                contract_end_date = datetime.strptime(data['contract_end_date'], '%Y-%m-%d').date()
-            except ValueError:
-                return jsonify({'success': False, 'message': '合同结束日期格式不正确'})
 
-        # 计算应缴费总额
-        monthly_rent = float(data.get('monthly_rent', 0))
-        water_fee = float(data.get('water_fee', 0))
-        electricity_fee = float(data.get('electricity_fee', 0))
-        utilities_fee = float(data.get('utilities_fee', 0))
+@app.route('/api/meter_readings_<any(old, new):floor>/<room_number>', methods=['GET'])
+def api_get_meter_history(floor, room_number):
+    """房间抄表记录"""
+    try:
+        return jsonify({'success': True, 'readings': get_meter_history(floor, room_number)})
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'获取抄表记录失败: {str(e)}'})
 
-        # 从费用反推用量（前端已经计算好费用，我们需要反推用量）
-        water_usage = water_fee / 3.5 if water_fee > 0 else 0  # 水费：3.5元/方
-        electricity_usage = electricity_fee / 1.2 if electricity_fee > 0 else 0  # 电费：1.2元/度
 
-        total_due = monthly_rent + utilities_fee
+@app.route('/api/utility_rates', methods=['GET'])
+def api_get_utility_rates():
+    """水电费单价表（按生效日期从新到旧）"""
+    try:
+        rates = UtilityRate.query.order_by(UtilityRate.effective_from.desc(), UtilityRate.id.desc()).all()
+        return jsonify({'success': True, 'rates': [{
+            'id': rate.id,
+            'floor': rate.floor,
+            'water_rate': float(rate.water_rate) if rate.water_rate is not None else None,
+            'electricity_rate': float(rate.electricity_rate) if rate.electricity_rate is not None else None,
+            'effective_from': rate.effective_from.strftime('%Y-%m-%d'),
+            'remarks': rate.remarks or ''
+        } for rate in rates]})
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'获取单价失败: {str(e)}'})
 
-        # 创建新记录
-        new_rental = RentalNew(
-            room_number=data['room_number'],
-            tenant_name=data['tenant_name'],
-            deposit=float(data.get('deposit', 0)),
-            monthly_rent=monthly_rent,
-            water_fee=water_fee,
-            electricity_fee=electricity_fee,
-            water_usage=water_usage,
-            electricity_usage=electricity_usage,
-            utilities_fee=utilities_fee,
-            total_due=total_due,
-            payment_status=int(data.get('payment_status', 2)),  # 默认未缴费
-            check_in_date=check_in_date,
-            check_out_date=check_out_date,
-            contract_start_date=contract_start_date,
-            contract_end_date=contract_end_date,
-            remarks=data.get('remarks', '')
-        )
 
-        db.session.add(new_rental)
+@app.route('/api/utility_rates', methods=['POST'])
+def api_add_utility_rate():
+    """新增水电费单价，floor 为空表示全部楼层"""
+    try:
+        data = request.get_json() or {}
+        floor = data.get('floor') or None
+        if floor is not None and floor not in FLOOR_MODELS:
+            return jsonify({'success': False, 'message': '楼层参数不正确'})
+        try:
+            effective_from = datetime.strptime(data.get('effective_from', ''), '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({'success': False, 'message': '生效日期格式不正确'})
+
+        water_rate = data.get('water_rate')
+        electricity_rate = data.get('electricity_rate')
+        water_rate = float(water_rate) if water_rate not in (None, '') else None
+        electricity_rate = float(electricity_rate) if electricity_rate not in (None, '') else None
+        if water_rate is None and electricity_rate is None:
+            return jsonify({'success': False, 'message': '请填写水费或电费单价'})
+        if (water_rate is not None and water_rate < 0) or (electricity_rate is not None and electricity_rate < 0):
+            return jsonify({'success': False, 'message': '单价不能为负数'})
+
+        rate = UtilityRate(floor=floor, water_rate=water_rate, electricity_rate=electricity_rate,
+                           effective_from=effective_from, remarks=data.get('remarks', ''))
+        db.session.add(rate)
         db.session.commit()
-
-        return jsonify({'success': True, 'message': '租房记录添加成功'})
-
+        rate_resolver.invalidate()
+        return jsonify({'success': True, 'message': '单价添加成功', 'id': rate.id})
+    except ValueError:
+        return jsonify({'success': False, 'message': '单价格式不正确'})
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'message': f'添加失败: {str(e)}'})
 
 
-@app.route('/api/rental_new/<int:rental_id>', methods=['GET'])
-def api_get_rental_new(rental_id):
-    """六楼租房管理详情"""
+@app.route('/api/utility_rates/<int:rate_id>', methods=['DELETE'])
+def api_delete_utility_rate(rate_id):
+    """删除水电费单价"""
     try:
-        rental = RentalNew.query.get_or_404(rental_id)
-        status_map = {
-            1: '已缴费',
-            2: '未缴费'
-        }
-
-        rental_data = {
-            'id': rental.id,
-            'room_number': rental.room_number,
-            'tenant_name': rental.tenant_name,
-            'deposit': float(rental.deposit) if rental.deposit else 0,
-            'monthly_rent': float(rental.monthly_rent) if rental.monthly_rent else 0,
-            'water_fee': float(rental.water_fee) if rental.water_fee else 0,
-            'electricity_fee': float(rental.electricity_fee) if rental.electricity_fee else 0,
-            'water_usage': float(rental.water_usage) if hasattr(rental, 'water_usage') and rental.water_usage else 0,
-            'electricity_usage': float(rental.electricity_usage) if hasattr(rental,
-                                                                            'electricity_usage') and rental.electricity_usage else 0,
-            'utilities_fee': float(rental.utilities_fee) if rental.utilities_fee else 0,
-            'total_due': float(rental.total_due) if rental.total_due else 0,
-            'payment_status': rental.payment_status,
-            'payment_status_text': status_map.get(rental.payment_status, '未知'),
-            'check_in_date': rental.check_in_date.strftime('%Y-%m-%d') if rental.check_in_date else '',
-            'check_out_date': rental.check_out_date.strftime('%Y-%m-%d') if rental.check_out_date else '',
-            'contract_start_date': rental.contract_start_date.strftime(
-                '%Y-%m-%d') if rental.contract_start_date else '',
-            'contract_end_date': rental.contract_end_date.strftime('%Y-%m-%d') if rental.contract_end_date else '',
-            'remarks': rental.remarks or '',
-            'created_at': rental.created_at.strftime('%Y-%m-%d %H:%M:%S') if rental.created_at else '-',
-            'updated_at': rental.updated_at.strftime('%Y-%m-%d %H:%M:%S') if rental.updated_at else '-'
-        }
-
-        return jsonify(rental_data)
+        rate = UtilityRate.query.get_or_404(rate_id)
+        db.session.delete(rate)
+        db.session.commit()
+        rate_resolver.invalidate()
+        return jsonify({'success': True, 'message': '单价删除成功'})
     except Exception as e:
-        return jsonify({'error': f'获取租房管理失败: {str(e)}'})
+        db.session.rollback()
+        return jsonify({'success': False, 'message': f'删除失败: {str(e)}'})
 
 
-@app.route('/api/rental_new/<int:rental_id>', methods=['PUT'])
-def api_update_rental_new(rental_id):
-    """更新六楼租房管理"""
+@app.route('/api/utility_rates/<any(old, new):floor>/<room_number>', methods=['GET'])
+def api_resolve_utility_rates(floor, room_number):
+    """房间适用的水电费单价（可选参数 date=YYYY-MM-DD，默认今天）"""
     try:
-        rental = RentalNew.query.get_or_404(rental_id)
-        data = request.get_json()
-
-        # 检查房号是否被其他记录使用
-        if data['room_number'] != rental.room_number:
-            existing_info = RentalNew.query.filter_by(room_number=data['room_number']).first()
-            if existing_info:
-                return jsonify({'success': False, 'message': '该房号已有其他租房管理'})
-
-        # 处理入住日期
-        check_in_date = None
-        if data.get('check_in_date'):
-            try:
-                check_in_date = datetime.strptime(data['check_in_date'], '%Y-%m-%d').date()
-            except ValueError:
-                return jsonify({'success': False, 'message': '入住日期格式不正确'})
-
-        # 处理合同开始日期
-        contract_start_date = None
-        if data.get('contract_start_date'):
-            try:
-                contract_start_date = datetime.strptime(data['contract_start_date'], '%Y-%m-%d').date()
-            except ValueError:
-                return jsonify({'success': False, 'message': '合同开始日期格式不正确'})
-
-        # 处理合同结束日期
-        contract_end_date = None
-        if data.get('contract_end_date'):
-            try:
-                contract_end_date = datetime.strptime(data['contract_end_date'], '%Y-%m-%d').date()
-            except ValueError:
-                return jsonify({'success': False, 'message': '合同结束日期格式不正确'})
-
-        # 处理退房日期
-        check_out_date = None
-        if data.get('check_out_date'):
+        on = None
+        if request.args.get('date'):
             try:
-                check_out_date = datetime.strptime(data['check_out_date'], '%Y-%m-%d').date()
+                on = datetime.strptime(request.args['date'], '%Y-%m-%d').date()
             except ValueError:
-                return jsonify({'success': False, 'message': '退房日期格式不正确'})
+                return jsonify({'success': False, 'message': '日期格式不正确'})
+        water_rate, electricity_rate = rate_resolver.resolve(floor, room_number, on)
+        return jsonify({'success': True, 'water_rate': float(water_rate), 'electricity_rate': float(electricity_rate)})
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'获取单价失败: {str(e)}'})
 
-        # 获取费用数据
-        water_fee = float(data['water_fee']) if data.get('water_fee') else 0
-        electricity_fee = float(data['electricity_fee']) if data.get('electricity_fee') else 0
 
-        # 从费用反推用量
-        water_usage = water_fee / 3.5 if water_fee > 0 else 0
-        electricity_usage = electricity_fee / 1.2 if electricity_fee > 0 else 0
+@app.route('/api/unpaid_room_info/<any(old, new):floor>/<room_number>', methods=['GET'])
+def api_unpaid_room_info(floor, room_number):
+    """获取房间当前租房记录的欠费明细（首页快速缴费），金额与登记缴费时冲抵的账单一致
 
-        rental.room_number = data['room_number']
-        rental.tenant_name = data['tenant_name']
-        rental.deposit = float(data['deposit']) if data.get('deposit') else 0
-        rental.monthly_rent = float(data['monthly_rent']) if data.get('monthly_rent') else 0
-        rental.water_fee = water_fee
-        rental.water_usage = water_usage
-        rental.electricity_usage = electricity_usage
-        rental.electricity_fee = electricity_fee
-        rental.utilities_fee = float(data['utilities_fee']) if data.get('utilities_fee') else 0
-        rental.total_due = float(data['total_due']) if data.get('total_due') else 0
-        rental.payment_status = int(data['payment_status']) if data.get('payment_status') else 2
-        rental.check_in_date = check_in_date
-        rental.check_out_date = check_out_date
-        rental.contract_start_date = contract_start_date
-        rental.contract_end_date = contract_end_date
-        rental.remarks = data.get('remarks', '')
-
-        db.session.commit()
-        return jsonify({'success': True, 'message': '租房管理更新成功'})
+    参数 rental_id 指定租房记录，默认为房间当前的租房记录。
+    """
+    try:
+        rental = get_current_rental(floor, room_number, request.args.get('rental_id', type=int))
+        arrears = get_rental_arrears(floor, rental) if rental else []
+        if not arrears:
+            return jsonify({'success': False, 'message': '该房间没有未缴费记录'})
 
+        return jsonify({
+            'success': True,
+            'room_info': {
+                'rental_id': rental.id,
+                'room_number': rental.room_number,
+                'tenant_name': rental.tenant_name,
+                'monthly_rent': float(rental.monthly_rent or 0),
+                'water_fee': float(rental.water_fee or 0),
+                'electricity_fee': float(rental.electricity_fee or 0),
+                'utilities_fee': float(rental.utilities_fee or 0),
+                'total_due': float(sum(item['owed'] for item in arrears)),
+                'months': len(arrears),
+                'bills': [{
+                    'period': item['period'].strftime('%Y-%m'),
+                    'amount_due': float(item['amount_due']),
+                    'amount_paid': float(item['amount_paid']),
+                    'owed': float(item['owed'])
+                } for item in arrears]
+            }
+        })
     except Exception as e:
-        db.session.rollback()
-        return jsonify({'success': False, 'message': f'更新失败: {str(e)}'})
+        return jsonify({'success': False, 'message': f'获取房间信息失败: {str(e)}'})
 
 
-@app.route('/rental_new/<int:rental_id>/mark_paid', methods=['POST'])
-def mark_rental_new_paid(rental_id):
-    """标记六楼租房记录为已缴费"""
+@app.route('/api/payment_record', methods=['POST'])
+def api_payment_record():
+    """登记缴费：冲抵欠费账单并写入缴费记录，欠费结清后更新租房记录缴费状态（首页快速缴费）"""
     try:
-        rental = RentalNew.query.get_or_404(rental_id)
+        data = request.get_json() or {}
+        floor = data.get('floor')
+        if floor not in FLOOR_MODELS:
+            return jsonify({'success': False, 'message': '楼层参数不正确'})
 
-        # 更新缴费状态为已缴费(1)
-        rental.payment_status = 1
-        rental.updated_at = datetime.now()
+        room_number = (data.get('room_number') or '').strip()
+        tenant_name = (data.get('tenant_name') or '').strip()
+        if not room_number or not tenant_name:
+            return jsonify({'success': False, 'message': '请填写完整的缴费信息'})
 
-        # 同时更新 rental_info_new 表中对应房间的缴费状态
-        rental_info = RentalInfoNew.query.filter_by(room_number=rental.room_number).first()
-        if rental_info:
-            rental_info.rental_status = 1  # 标记为已缴费
-            rental_info.updated_at = datetime.now()
-
-        # 创建缴费记录到 rental_records_new 表
-        rental_record = RentalRecordsNew(
-            room_number=rental.room_number,
-            tenant_name=rental.tenant_name,
-            total_rent=rental.total_due,  # 使用应缴费总额
-            payment_date=datetime.now().date(),
-            created_at=datetime.now()
-        )
+        try:
+            amount = float(data.get('payment_amount'))
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'message': '缴费金额格式不正确'})
+        if amount <= 0:
+            return jsonify({'success': False, 'message': '缴费金额必须大于0'})
+
+        payment_date = datetime.now().date()
+        if data.get('payment_date'):
+            try:
+                payment_date = datetime.strptime(data['payment_date'], '%Y-%m-%d').date()
+            except ValueError:
+                return jsonify({'success': False, 'message': '缴费日期格式不正确'})
 
-        # 保存更新和新记录
-        db.session.add(rental_record)
-        db.session.commit()
+        try:
+            rental_id = int(data['rental_id']) if data.get('rental_id') else None
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'message': '租房记录ID格式不正确'})
 
-        return jsonify({'success': True, 'message': '已成功标记为已缴费并记录缴费信息'})
+        try:
+            outstanding = record_room_payment(floor, room_number, tenant_name, amount, payment_date, rental_id)
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)})
+        if outstanding is None:
+            return jsonify({'success': False, 'message': f'房间 {room_number} 没有未缴费记录'})
+
+        stats_cache.invalidate(floor)
+        message = f'房间 {room_number} 缴费 ¥{amount:.2f} 登记成功'
+        if outstanding > 0:
+            message += f'，仍欠费 ¥{outstanding:.2f}'
+        return jsonify({'success': True, 'message': message, 'outstanding': float(outstanding)})
     except Exception as e:
         db.session.rollback()
-        return jsonify({'success': False, 'message': f'标记失败: {str(e)}'})
+        return jsonify({'success': False, 'message': f'缴费登记失败: {str(e)}'})
 
 
-@app.route('/api/rental_new/<int:rental_id>', methods=['DELETE'])
-def api_delete_rental_new(rental_id):
-    """删除六楼租房管理记录"""
+@app.route('/delete_records', methods=['POST'])
+def delete_records():
+    """批量删除缴费记录，请求体格式：{"floor": "old", "ids": [1, 2, 3]}"""
     try:
-        rental = RentalNew.query.get_or_404(rental_id)
-
-        # 删除租房记录
-        db.session.delete(rental)
-        db.session.commit()
-        return jsonify({'success': True, 'message': '租房记录删除成功'})
+        data = request.get_json() or {}
+        floor = data.get('floor')
+        if floor not in FLOOR_MODELS:
+            return jsonify({'success': False, 'message': '楼层参数不正确'})
+
+        record_ids = list({int(record_id) for record_id in data.get('ids', [])})
+        if not record_ids:
+            return jsonify({'success': False, 'message': '请选择要删除的记录'})
+
+        deleted = delete_payment_records(floor, record_ids)
+        stats_cache.invalidate(floor)
+        return jsonify({'success': True, 'message': f'已成功删除 {deleted} 条记录', 'deleted': deleted})
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'message': '记录ID格式不正确'})
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'message': f'删除失败: {str(e)}'})
 
 
+@app.route('/api/rental_records_<any(old, new):floor>/export', methods=['GET'])
+def api_export_records(floor):
+    """流式导出缴费记录
+
+    参数：format=csv（默认）或 xlsx，以及缴费记录列表页的筛选参数（room_number、tenant_name、payment_date、
+    month、date_from、date_to）。数据从数据库游标分批读取，导出量不影响内存占用。
+    """
+    config = LIST_CONFIGS[f'rental_records_{floor}']
+    export_format = request.args.get('format', 'csv').lower()
+    if export_format not in ('csv', 'xlsx'):
+        return jsonify({'success': False, 'message': '导出格式只支持 csv 或 xlsx'})
+    if export_format == 'xlsx' and not xlsx_available():
+        return jsonify({'success': False, 'message': '服务器未安装 openpyxl，暂不支持导出 XLSX，请选择 CSV 格式'})
+
+    conditions, _ = build_filter_conditions(config, request.args)
+    filename = f"rental_records_{floor}_{datetime.now().strftime('%Y%m%d%H%M%S')}.{export_format}"
+    if export_format == 'xlsx':
+        chunks = stream_records_xlsx(config.model, conditions)
+        mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    else:
+        chunks = stream_records_csv(config.model, conditions)
+        mimetype = 'text/csv'
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}', 'X-Accel-Buffering': 'no'}
+    )
+
+
 # 合同管理API
-@app.route('/api/contracts_old/<int:contract_id>', methods=['GET'])
-def api_get_contract_old(contract_id):
+@app.route('/api/contracts_<any(old, new):floor>/<int:contract_id>', methods=['GET'])
+def api_get_contract(floor, contract_id):
     """获取合同详情"""
+    ContractsModel = FLOOR_MODELS[floor]['contracts']
     try:
-        contract = ContractsOld.query.get_or_404(contract_id)
-
-        status_map = {
-            1: '有效',
-            2: '失效'
-        }
-
-        utilities_map = {
-            1: '包含',
-            2: '不包含'
-        }
-
-        # 安全的日期格式化函数
-        def safe_date_format(date_obj, format_str='%Y-%m-%d'):
-            if date_obj is None:
-                return ''
-            if hasattr(date_obj, 'strftime'):
-                return date_obj.strftime(format_str)
-            else:
-                return str(date_obj)
-
-        def safe_datetime_format(datetime_obj, format_str='%Y-%m-%d %H:%M:%S'):
-            if datetime_obj is None:
-                return '-'
-            if hasattr(datetime_obj, 'strftime'):
-                return datetime_obj.strftime(format_str)
-            else:
-                return str(datetime_obj)
-
-        contract_data = {
-            'id': contract.id,
-            'contract_number': contract.contract_number,
-            'room_number': contract.room_number,
-            'tenant_name': contract.tenant_name,
-            'tenant_phone': contract.tenant_phone,
-            'tenant_id_card': contract.tenant_id_card,
-            'landlord_name': contract.landlord_name,
-            'landlord_phone': contract.landlord_phone,
-            'monthly_rent': float(contract.monthly_rent),
-            'deposit': float(contract.deposit),
-            'contract_start_date': safe_date_format(contract.contract_start_date),
-            'contract_end_date': safe_date_format(contract.contract_end_date),
-            'contract_duration': contract.contract_duration,
-            'payment_method': contract.payment_method,
-            'rent_due_date': safe_date_format(contract.rent_due_date),
-            'contract_status': contract.contract_status,
-            'contract_status_text': status_map.get(contract.contract_status, '未知'),
-            'utilities_included': contract.utilities_included,
-            'utilities_included_text': utilities_map.get(contract.utilities_included, '未知'),
-            'water_rate': float(contract.water_rate),
-            'electricity_rate': float(contract.electricity_rate),
-            'contract_terms': contract.contract_terms or '',
-            'special_agreement': contract.special_agreement or '',
-            'remarks': contract.remarks or '',
-            'created_at': safe_datetime_format(contract.created_at),
-            'updated_at': safe_datetime_format(contract.updated_at)
-        }
-
-        return jsonify({'success': True, 'contract': contract_data})
+        return jsonify({'success': True, 'contract': CONTRACT_DETAIL.get_or_404(ContractsModel, contract_id)})
     except Exception as e:
         return jsonify({'success': False, 'message': f'获取合同信息失败: {str(e)}'})
 
 
-@app.route('/api/contracts_old/<int:contract_id>', methods=['PUT'])
-def api_update_contract_old(contract_id):
+@app.route('/api/contracts_<any(old, new):floor>/<int:contract_id>', methods=['PUT'])
+@invalidates_stats()
+def api_update_contract(floor, contract_id):
     """更新合同信息"""
+    ContractsModel = FLOOR_MODELS[floor]['contracts']
     try:
-        contract = ContractsOld.query.get_or_404(contract_id)
+        contract = ContractsModel.query.get_or_404(contract_id)
         data = request.get_json()
 
         # 检查合同编号是否被其他合同使用
         if data['contract_number'] != contract.contract_number:
-            existing_contract = ContractsOld.query.filter_by(contract_number=data['contract_number']).first()
+            existing_contract = ContractsModel.query.filter_by(contract_number=data['contract_number']).first()
             if existing_contract:
                 return jsonify({'success': False, 'message': '合同编号已存在'})
 
@@ -2068,345 +1487,92 @@ def api_update_contract_old(contract_id):
         contract.contract_number = data['contract_number']
         contract.room_number = data['room_number']
         contract.tenant_name = data['tenant_name']
-        contract.tenant_phone = data['tenant_phone']
-        contract.tenant_id_card = data['tenant_id_card']
+        contract.tenant_phone = data.get('tenant_phone', '')
+        contract.tenant_id_card = data.get('tenant_id_card', '')
         contract.landlord_name = data['landlord_name']
-        contract.landlord_phone = data['landlord_phone']
+        contract.landlord_phone = data.get('landlord_phone', '')
         contract.monthly_rent = float(data['monthly_rent'])
         contract.deposit = float(data['deposit'])
         contract.contract_start_date = contract_start_date
         contract.contract_end_date = contract_end_date
-        contract.contract_duration = int(data['contract_duration'])
-        contract.payment_method = data['payment_method']
+        contract.contract_duration = int(data.get('contract_duration', 12))
+        contract.payment_method = data.get('payment_method', '月付')
         contract.rent_due_date = rent_due_date
-        contract.contract_status = int(data['contract_status'])
-        contract.utilities_included = int(data['utilities_included'])
-        contract.water_rate = float(data['water_rate'])
-        contract.electricity_rate = float(data['electricity_rate'])
+        contract.contract_status = int(data.get('contract_status', 1))
+        contract.utilities_included = int(data.get('utilities_included', 2))
+        contract.water_rate = float(data.get('water_rate', 0))
+        contract.electricity_rate = float(data.get('electricity_rate', 0))
         contract.contract_terms = data.get('contract_terms', '')
         contract.special_agreement = data.get('special_agreement', '')
         contract.remarks = data.get('remarks', '')
         contract.updated_at = datetime.now()
 
         db.session.commit()
+        pdf_cache.invalidate(contract.__tablename__, contract_id)
+        rate_resolver.invalidate(floor)
         return jsonify({'success': True, 'message': '合同更新成功'})
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'message': f'更新失败: {str(e)}'})
 
 
-@app.route('/api/contracts_old/<int:contract_id>/download', methods=['GET'])
-def api_download_contract_old(contract_id):
-    """下载合同PDF文档"""
-    try:
-        contract = ContractsOld.query.get_or_404(contract_id)
-
-        # 生成合同PDF内容
-        pdf_buffer = generate_contract_pdf(contract)
-
-        # 生成文件名
-        filename = f"合同_{contract.contract_number}_{contract.tenant_name}.pdf"
-
-        return send_file(
-            pdf_buffer,
-            as_attachment=True,
-            download_name=filename,
-            mimetype='application/pdf'
-        )
-
-    except Exception as e:
-        return jsonify({'success': False, 'message': f'下载失败: {str(e)}'})
-
-
-def generate_contract_pdf(contract):
-    """生成支持中文的合同PDF内容"""
-
-    # 创建内存缓冲区
-    buffer = BytesIO()
+def send_contract_pdf(contract):
+    """返回合同PDF下载响应
 
-    # 注册中文字体
-    chinese_font = 'Helvetica'  # 默认字体
-
-    # Windows系统中文字体路径列表
-    font_paths = [
-        'C:/Windows/Fonts/msyh.ttc',  # 微软雅黑
-        'C:/Windows/Fonts/msyhbd.ttc',  # 微软雅黑粗体
-        'C:/Windows/Fonts/simsun.ttc',  # 宋体
-        'C:/Windows/Fonts/simhei.ttf',  # 黑体
-        'C:/Windows/Fonts/simkai.ttf',  # 楷体
-    ]
-
-    # 尝试注册可用的中文字体
-    for i, font_path in enumerate(font_paths):
-        try:
-            if os.path.exists(font_path):
-                font_name = f'ChineseFont{i}'
-                pdfmetrics.registerFont(TTFont(font_name, font_path))
-                chinese_font = font_name
-                print(f"成功注册字体: {font_path} -> {font_name}")
-                break
-        except Exception as e:
-            print(f"注册字体失败 {font_path}: {e}")
-            continue
-
-    if chinese_font == 'Helvetica':
-        print("警告: 未找到可用的中文字体，使用默认字体可能导致中文显示异常")
-
-    # 创建PDF文档
-    doc = SimpleDocTemplate(buffer, pagesize=A4,
-                            topMargin=60, bottomMargin=60,
-                            leftMargin=60, rightMargin=60)
-
-    # 安全的日期格式化函数
-    def safe_date_format(date_obj):
-        if date_obj is None:
-            return '____年____月____日'
-        if hasattr(date_obj, 'strftime'):
-            return date_obj.strftime('%Y年%m月%d日')
-        else:
-            return str(date_obj)
-
-    # 状态文本映射
-    status_map = {1: '有效', 2: '失效'}
-    utilities_map = {1: '包含', 2: '不包含'}
-
-    # 创建样式
-    styles = getSampleStyleSheet()
-
-    # 自定义样式（使用中文字体）
-    title_style = ParagraphStyle(
-        'ChineseTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        spaceAfter=20,
-        alignment=TA_CENTER,
-        fontName=chinese_font
+    以合同内容哈希作为 ETag：客户端已有相同版本时返回 304，否则优先使用已缓存的PDF。
+    """
+    etag = contract_fingerprint(contract)
+    if etag in request.if_none_match:
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+
+    pdf_data = pdf_cache.get_or_render(
+        (contract.__tablename__, contract.id), etag,
+        lambda: generate_contract_pdf(contract).getvalue()
     )
 
-    heading_style = ParagraphStyle(
-        'ChineseHeading',
-        parent=styles['Heading2'],
-        fontSize=12,
-        spaceAfter=10,
-        spaceBefore=15,
-        fontName=chinese_font
-    )
+    # 生成文件名
+    filename = f"合同_{contract.contract_number}_{contract.tenant_name}.pdf"
 
-    normal_style = ParagraphStyle(
-        'ChineseNormal',
-        parent=styles['Normal'],
-        fontSize=9,
-        spaceAfter=6,
-        fontName=chinese_font
+    response = send_file(
+        BytesIO(pdf_data),
+        as_attachment=True,
+        download_name=filename,
+        mimetype='application/pdf',
+        etag=etag,
+        max_age=0
     )
+    response.cache_control.no_cache = True
+    return response
 
-    # 构建内容
-    story = []
-
-    # 标题
-    story.append(Paragraph("房屋租赁合同", title_style))
-    story.append(Paragraph(f"合同编号：{contract.contract_number}", normal_style))
-    story.append(Spacer(1, 20))
-
-    # 一、合同基本信息
-    story.append(Paragraph("一、合同基本信息", heading_style))
-    basic_data = [
-        ['合同编号', str(contract.contract_number), '房间号', str(contract.room_number)],
-        ['月租金', f'¥{contract.monthly_rent:.2f}', '押金', f'¥{contract.deposit:.2f}'],
-        ['合同状态', status_map.get(contract.contract_status, '未知'),
-         '付款方式', str(contract.payment_method or '按月付款')]
-    ]
-    basic_table = Table(basic_data, colWidths=[70, 110, 70, 110])
-    basic_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-        ('BACKGROUND', (2, 0), (2, -1), colors.lightgrey),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, -1), chinese_font),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('LEFTPADDING', (0, 0), (-1, -1), 6),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
-    story.append(basic_table)
-    story.append(Spacer(1, 12))
-
-    # 二、租客信息
-    story.append(Paragraph("二、租客信息", heading_style))
-    tenant_data = [
-        ['租客姓名', str(contract.tenant_name), '联系电话', str(contract.tenant_phone or '未填写')],
-        ['身份证号', str(contract.tenant_id_card or '未填写'), '', '']
-    ]
-    tenant_table = Table(tenant_data, colWidths=[70, 110, 70, 110])
-    tenant_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-        ('BACKGROUND', (2, 0), (2, -1), colors.lightgrey),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, -1), chinese_font),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('LEFTPADDING', (0, 0), (-1, -1), 6),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-        ('SPAN', (1, 1), (3, 1)),  # 合并身份证号的单元格
-    ]))
-    story.append(tenant_table)
-    story.append(Spacer(1, 12))
-
-    # 三、房东信息
-    story.append(Paragraph("三、房东信息", heading_style))
-    landlord_data = [
-        ['房东姓名', str(contract.landlord_name or '未填写'),
-         '联系电话', str(contract.landlord_phone or '未填写')]
-    ]
-    landlord_table = Table(landlord_data, colWidths=[70, 110, 70, 110])
-    landlord_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-        ('BACKGROUND', (2, 0), (2, -1), colors.lightgrey),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, -1), chinese_font),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('LEFTPADDING', (0, 0), (-1, -1), 6),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
-    story.append(landlord_table)
-    story.append(Spacer(1, 12))
-
-    # 四、合同期限
-    story.append(Paragraph("四、合同期限", heading_style))
-    period_data = [
-        ['合同开始', safe_date_format(contract.contract_start_date),
-         '合同结束', safe_date_format(contract.contract_end_date)],
-        ['租期时长', f'{contract.contract_duration or 12}个月',
-         '租金到期', safe_date_format(contract.rent_due_date)]
-    ]
-    period_table = Table(period_data, colWidths=[70, 110, 70, 110])
-    period_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-        ('BACKGROUND', (2, 0), (2, -1), colors.lightgrey),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, -1), chinese_font),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('LEFTPADDING', (0, 0), (-1, -1), 6),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
-    story.append(period_table)
-    story.append(Spacer(1, 12))
-
-    # 五、费用信息
-    story.append(Paragraph("五、费用信息", heading_style))
-    fee_data = [
-        ['水电费', utilities_map.get(contract.utilities_included, '未知'),
-         '水费单价', f'¥{contract.water_rate:.2f}/吨'],
-        ['电费单价', f'¥{contract.electricity_rate:.2f}/度', '', '']
-    ]
-    fee_table = Table(fee_data, colWidths=[70, 110, 70, 110])
-    fee_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-        ('BACKGROUND', (2, 0), (2, -1), colors.lightgrey),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, -1), chinese_font),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('LEFTPADDING', (0, 0), (-1, -1), 6),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-        ('TOPPADDING', (0, 0), (-1, -1), 4),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
-    ]))
-    story.append(fee_table)
-    story.append(Spacer(1, 12))
-
-    # 六、合同条款
-    story.append(Paragraph("六、合同条款", heading_style))
-
-    # 处理合同条款文本
-    terms_lines = []
-    terms_lines.append("1. 基本条款：")
-    terms_lines.append(str(contract.contract_terms or '按照国家相关法律法规执行，双方应遵守合同约定。'))
-    terms_lines.append("")
-    terms_lines.append("2. 特殊约定：")
-    terms_lines.append(str(contract.special_agreement or '无特殊约定。'))
-    terms_lines.append("")
-    terms_lines.append("3. 备注说明：")
-    terms_lines.append(str(contract.remarks or '无备注。'))
-
-    for line in terms_lines:
-        if line.strip():
-            story.append(Paragraph(line, normal_style))
-        else:
-            story.append(Spacer(1, 6))
-
-    story.append(Spacer(1, 20))
-
-    # 签名区域
-    signature_data = [
-        ['甲方（房东）', '乙方（租客）'],
-        ['', ''],
-        ['', ''],
-        ['签名：______________', '签名：______________'],
-        [f'签署日期：{safe_date_format(contract.created_at.date() if contract.created_at else None)}',
-         f'签署日期：{safe_date_format(contract.created_at.date() if contract.created_at else None)}']
-    ]
-    signature_table = Table(signature_data, colWidths=[180, 180])
-    signature_table.setStyle(TableStyle([
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, -1), chinese_font),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('LEFTPADDING', (0, 0), (-1, -1), 8),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 8),
-        ('TOPPADDING', (0, 0), (-1, -1), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-    ]))
-    story.append(signature_table)
-    story.append(Spacer(1, 15))
-
-    # 页脚
-    footer_lines = [
-        "本合同一式两份，甲乙双方各执一份，具有同等法律效力。",
-        f"合同生成时间：{datetime.now().strftime('%Y年%m月%d日 %H:%M:%S')}"
-    ]
-
-    footer_style = ParagraphStyle(
-        'ChineseFooter',
-        parent=normal_style,
-        alignment=TA_CENTER,
-        fontSize=8
-    )
 
-    for line in footer_lines:
-        story.append(Paragraph(line, footer_style))
+@app.route('/api/contracts_<any(old, new):floor>/<int:contract_id>/download', methods=['GET'])
+def api_download_contract(floor, contract_id):
+    """下载合同PDF文档"""
+    ContractsModel = FLOOR_MODELS[floor]['contracts']
+    try:
+        contract = ContractsModel.query.get_or_404(contract_id)
+        return send_contract_pdf(contract)
 
-    # 构建PDF
-    doc.build(story)
+    except Exception as e:
+        return jsonify({'success': False, 'message': f'下载失败: {str(e)}'})
 
-    # 返回缓冲区
-    buffer.seek(0)
-    return buffer
 
+@app.route('/api/contracts_<any(old, new):floor>', methods=['POST'])
+@invalidates_stats()
+def api_create_contract(floor):
+    """创建合同
 
-@app.route('/api/contracts_old', methods=['POST'])
-def api_create_contract_old():
-    """创建五楼合同"""
+    新建合同表单提交 start_date、payment_cycle、notes 等字段，同时兼容与合同详情一致的
+    contract_start_date、payment_method、remarks 等字段名。
+    """
+    ContractsModel = FLOOR_MODELS[floor]['contracts']
     try:
         data = request.get_json()
 
         # 检查合同编号是否已存在
-        existing_contract = ContractsOld.query.filter_by(contract_number=data['contract_number']).first()
+        existing_contract = ContractsModel.query.filter_by(contract_number=data['contract_number']).first()
         if existing_contract:
             return jsonify({'success': False, 'message': '合同编号已存在'})
 
@@ -2421,20 +1587,20 @@ def api_create_contract_old():
             except ValueError:
                 return jsonify({'success': False, 'message': '签约日期格式不正确'})
 
-        if data.get('start_date'):
+        if data.get('start_date') or data.get('contract_start_date'):
             try:
-                start_date = datetime.strptime(data['start_date'], '%Y-%m-%d').date()
+                start_date = datetime.strptime(data.get('start_date') or data['contract_start_date'], '%Y-%m-%d').date()
             except ValueError:
                 return jsonify({'success': False, 'message': '租期开始日期格式不正确'})
 
-        if data.get('end_date'):
+        if data.get('end_date') or data.get('contract_end_date'):
             try:
-                end_date = datetime.strptime(data['end_date'], '%Y-%m-%d').date()
+                end_date = datetime.strptime(data.get('end_date') or data['contract_end_date'], '%Y-%m-%d').date()
             except ValueError:
                 return jsonify({'success': False, 'message': '租期结束日期格式不正确'})
 
         # 创建新合同
-        new_contract = ContractsOld(
+        new_contract = ContractsModel(
             contract_number=data['contract_number'],
             room_number=data.get('room_number', ''),
             tenant_name=data['tenant_name'],
@@ -2447,273 +1613,45 @@ def api_create_contract_old():
             contract_start_date=start_date,
             contract_end_date=end_date,
             contract_duration=int(data.get('contract_duration', 12)),
-            payment_method=data.get('payment_cycle', '按月付款'),
+            payment_method=data.get('payment_cycle', data.get('payment_method', '按月付款')),
             rent_due_date=start_date,
             contract_status=1,
-            utilities_included=int(data.get('include_utilities', 2)),
+            utilities_included=int(data.get('include_utilities', data.get('utilities_included', 2))),
             water_rate=float(data.get('water_rate', 0)),
             electricity_rate=float(data.get('electricity_rate', 0)),
-            contract_terms='',
-            special_agreement='',
-            remarks=data.get('notes', ''),
-            created_at=sign_date or datetime.now().date(),
+            contract_terms=data.get('contract_terms', ''),
+            special_agreement=data.get('special_agreement', ''),
+            remarks=data.get('notes', data.get('remarks', '')),
+            created_at=sign_date or datetime.now(),
             updated_at=datetime.now()
         )
 
         db.session.add(new_contract)
         db.session.commit()
+        rate_resolver.invalidate(floor)
         return jsonify({'success': True, 'message': '合同创建成功'})
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'message': f'创建失败: {str(e)}'})
 
 
-@app.route('/api/contracts_old/<int:contract_id>', methods=['DELETE'])
-def api_delete_contract_old(contract_id):
-    """删除五楼合同"""
+@app.route('/api/contracts_<any(old, new):floor>/<int:contract_id>', methods=['DELETE'])
+@invalidates_stats()
+def api_delete_contract(floor, contract_id):
+    """删除合同"""
+    ContractsModel = FLOOR_MODELS[floor]['contracts']
     try:
-        contract = ContractsOld.query.get_or_404(contract_id)
+        contract = ContractsModel.query.get_or_404(contract_id)
         db.session.delete(contract)
         db.session.commit()
+        pdf_cache.invalidate(contract.__tablename__, contract_id)
+        rate_resolver.invalidate(floor)
         return jsonify({'success': True, 'message': '合同删除成功'})
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'message': f'删除失败: {str(e)}'})
 
 
-# 六楼合同管理API
-@app.route('/api/contracts_new/<int:contract_id>', methods=['GET'])
-def api_get_contract_new(contract_id):
-    """获取六楼合同详情"""
-    try:
-        contract = ContractsNew.query.get_or_404(contract_id)
-
-        status_map = {
-            1: '有效',
-            2: '失效'
-        }
-
-        utilities_map = {
-            1: '包含',
-            2: '不包含'
-        }
-
-        # 安全的日期格式化函数
-        def safe_date_format(date_obj, format_str='%Y-%m-%d'):
-            if date_obj is None:
-                return ''
-            if hasattr(date_obj, 'strftime'):
-                return date_obj.strftime(format_str)
-            else:
-                return str(date_obj)
-
-        def safe_datetime_format(datetime_obj, format_str='%Y-%m-%d %H:%M:%S'):
-            if datetime_obj is None:
-                return '-'
-            if hasattr(datetime_obj, 'strftime'):
-                return datetime_obj.strftime(format_str)
-            else:
-                return str(datetime_obj)
-
-        contract_data = {
-            'id': contract.id,
-            'contract_number': contract.contract_number,
-            'room_number': contract.room_number,
-            'tenant_name': contract.tenant_name,
-            'tenant_phone': contract.tenant_phone,
-            'tenant_id_card': contract.tenant_id_card,
-            'landlord_name': contract.landlord_name,
-            'landlord_phone': contract.landlord_phone,
-            'monthly_rent': float(contract.monthly_rent),
-            'deposit': float(contract.deposit),
-            'contract_start_date': safe_date_format(contract.contract_start_date),
-            'contract_end_date': safe_date_format(contract.contract_end_date),
-            'contract_duration': contract.contract_duration,
-            'payment_method': contract.payment_method,
-            'rent_due_date': safe_date_format(contract.rent_due_date),
-            'contract_status': contract.contract_status,
-            'contract_status_text': status_map.get(contract.contract_status, '未知'),
-            'utilities_included': contract.utilities_included,
-            'utilities_included_text': utilities_map.get(contract.utilities_included, '未知'),
-            'water_rate': float(contract.water_rate),
-            'electricity_rate': float(contract.electricity_rate),
-            'contract_terms': contract.contract_terms or '',
-            'special_agreement': contract.special_agreement or '',
-            'remarks': contract.remarks or '',
-            'created_at': safe_datetime_format(contract.created_at),
-            'updated_at': safe_datetime_format(contract.updated_at)
-        }
-
-        return jsonify({'success': True, 'contract': contract_data})
-    except Exception as e:
-        return jsonify({'success': False, 'message': f'获取合同信息失败: {str(e)}'})
-
-
-@app.route('/api/contracts_new/<int:contract_id>', methods=['PUT'])
-def api_update_contract_new(contract_id):
-    """更新六楼合同信息"""
-    try:
-        contract = ContractsNew.query.get_or_404(contract_id)
-        data = request.get_json()
-
-        # 检查合同编号是否被其他合同使用
-        if data['contract_number'] != contract.contract_number:
-            existing_contract = ContractsNew.query.filter_by(contract_number=data['contract_number']).first()
-            if existing_contract:
-                return jsonify({'success': False, 'message': '合同编号已存在'})
-
-        # 处理日期字段
-        contract_start_date = None
-        contract_end_date = None
-        rent_due_date = None
-
-        if data.get('contract_start_date'):
-            try:
-                contract_start_date = datetime.strptime(data['contract_start_date'], '%Y-%m-%d').date()
-            except ValueError:
-                return jsonify({'success': False, 'message': '合同开始日期格式不正确'})
-
-        if data.get('contract_end_date'):
-            try:
-                contract_end_date = datetime.strptime(data['contract_end_date'], '%Y-%m-%d').date()
-            except ValueError:
-                return jsonify({'success': False, 'message': '合同结束日期格式不正确'})
-
-        if data.get('rent_due_date'):
-            try:
-                rent_due_date = datetime.strptime(data['rent_due_date'], '%Y-%m-%d').date()
-            except ValueError:
-                return jsonify({'success': False, 'message': '租金到期日期格式不正确'})
-
-        # 更新合同信息
-        contract.contract_number = data['contract_number']
-        contract.room_number = data['room_number']
-        contract.tenant_name = data['tenant_name']
-        contract.tenant_phone = data.get('tenant_phone', '')
-        contract.tenant_id_card = data.get('tenant_id_card', '')
-        contract.landlord_name = data['landlord_name']
-        contract.landlord_phone = data.get('landlord_phone', '')
-        contract.monthly_rent = float(data['monthly_rent'])
-        contract.deposit = float(data['deposit'])
-        contract.contract_start_date = contract_start_date
-        contract.contract_end_date = contract_end_date
-        contract.contract_duration = int(data.get('contract_duration', 12))
-        contract.payment_method = data.get('payment_method', '月付')
-        contract.rent_due_date = rent_due_date
-        contract.contract_status = int(data.get('contract_status', 1))
-        contract.utilities_included = int(data.get('utilities_included', 2))
-        contract.water_rate = float(data.get('water_rate', 0))
-        contract.electricity_rate = float(data.get('electricity_rate', 0))
-        contract.contract_terms = data.get('contract_terms', '')
-        contract.special_agreement = data.get('special_agreement', '')
-        contract.remarks = data.get('remarks', '')
-        contract.updated_at = datetime.now()
-
-        db.session.commit()
-        return jsonify({'success': True, 'message': '合同更新成功'})
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'success': False, 'message': f'更新失败: {str(e)}'})
-
-
-@app.route('/api/contracts_new/<int:contract_id>', methods=['DELETE'])
-def api_delete_contract_new(contract_id):
-    """删除六楼合同"""
-    try:
-        contract = ContractsNew.query.get_or_404(contract_id)
-        db.session.delete(contract)
-        db.session.commit()
-        return jsonify({'success': True, 'message': '合同删除成功'})
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'success': False, 'message': f'删除失败: {str(e)}'})
-
-
-@app.route('/api/contracts_new', methods=['POST'])
-def api_create_contract_new():
-    """创建六楼合同"""
-    try:
-        data = request.get_json()
-
-        # 检查合同编号是否已存在
-        existing_contract = ContractsNew.query.filter_by(contract_number=data['contract_number']).first()
-        if existing_contract:
-            return jsonify({'success': False, 'message': '合同编号已存在'})
-
-        # 处理日期字段
-        contract_start_date = None
-        contract_end_date = None
-
-        if data.get('contract_start_date'):
-            try:
-                contract_start_date = datetime.strptime(data['contract_start_date'], '%Y-%m-%d').date()
-            except ValueError:
-                return jsonify({'success': False, 'message': '合同开始日期格式不正确'})
-
-        if data.get('contract_end_date'):
-            try:
-                contract_end_date = datetime.strptime(data['contract_end_date'], '%Y-%m-%d').date()
-            except ValueError:
-                return jsonify({'success': False, 'message': '合同结束日期格式不正确'})
-
-        # 创建新合同
-        new_contract = ContractsNew(
-            contract_number=data['contract_number'],
-            room_number=data['room_number'],
-            tenant_name=data['tenant_name'],
-            tenant_phone=data.get('tenant_phone', ''),
-            tenant_id_card=data.get('tenant_id_card', ''),
-            landlord_name=data['landlord_name'],
-            landlord_phone=data.get('landlord_phone', ''),
-            monthly_rent=float(data['monthly_rent']),
-            deposit=float(data['deposit']),
-            contract_start_date=contract_start_date,
-            contract_end_date=contract_end_date,
-            contract_duration=int(data.get('contract_duration', 12)),
-            payment_method=data.get('payment_method', '月付'),
-            rent_due_date=contract_start_date,
-            contract_status=1,
-            utilities_included=int(data.get('utilities_included', 2)),
-            water_rate=float(data.get('water_rate', 0)),
-            electricity_rate=float(data.get('electricity_rate', 0)),
-            contract_terms=data.get('contract_terms', ''),
-            special_agreement=data.get('special_agreement', ''),
-            remarks=data.get('remarks', ''),
-            created_at=datetime.now(),
-            updated_at=datetime.now()
-        )
-
-        db.session.add(new_contract)
-        db.session.commit()
-        return jsonify({'success': True, 'message': '合同创建成功'})
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({'success': False, 'message': f'创建失败: {str(e)}'})
-
-
-@app.route('/api/contracts_new/<int:contract_id>/download', methods=['GET'])
-def api_download_contract_new(contract_id):
-    """下载六楼合同PDF文档"""
-    try:
-        contract = ContractsNew.query.get_or_404(contract_id)
-
-        # 生成合同PDF内容
-        pdf_buffer = generate_contract_pdf(contract)
-
-        # 生成文件名
-        filename = f"合同_{contract.contract_number}_{contract.tenant_name}.pdf"
-
-        return send_file(
-            pdf_buffer,
-            as_attachment=True,
-            download_name=filename,
-            mimetype='application/pdf'
-        )
-
-    except Exception as e:
-        return jsonify({'success': False, 'message': f'下载失败: {str(e)}'})
-
-
 # 旧版系统设置
 @app.route('/system_setting')
 def system_setting():
@@ -2741,29 +1679,19 @@ def out_system():
 
 
 # 获取已出租房间列表API
-@app.route('/api/rented_rooms_old', methods=['GET'])
-def api_get_rented_rooms_old():
-    """获取五楼已出租房间列表"""
+@app.route('/api/rented_rooms_<any(old, new):floor>', methods=['GET'])
+def api_get_rented_rooms(floor):
+    """获取已出租房间列表"""
+    RentalInfoModel = FLOOR_MODELS[floor]['rental_info']
+    RoomsModel = FLOOR_MODELS[floor]['rooms']
     try:
         # 查询状态为已出租(2)的房间，并关联租房信息获取租客姓名
-        rented_rooms = db.session.query(RoomsOld, RentalInfoOld).join(
-            RentalInfoOld, RoomsOld.room_number == RentalInfoOld.room_number
-        ).filter(RoomsOld.room_status == 2).all()
-
-        rooms_list = []
-        for room, rental_info in rented_rooms:
-            rooms_list.append({
-                'id': room.id,
-                'room_number': room.room_number,
-                'room_type': room.room_type,
-                'base_rent': float(room.base_rent) if room.base_rent else 0,
-                'deposit': float(room.deposit) if room.deposit else 0,  # 使用房间表的押金
-                'tenant_name': rental_info.tenant_name if rental_info else '',
-                'tenant_phone': rental_info.phone if rental_info else '',
-                'rental_deposit': float(rental_info.deposit) if rental_info and rental_info.deposit else 0,  # 租房信息表的押金
-                'check_in_date': rental_info.check_in_date.strftime(
-                    '%Y-%m-%d') if rental_info and rental_info.check_in_date else ''
-            })
+        # deposit 为房间表的押金，rental_deposit 为租房信息表的押金
+        rooms_list = RENTED_ROOMS.all(
+            RENTED_ROOMS.select(RoomsModel, info=RentalInfoModel)
+            .join_from(RoomsModel, RentalInfoModel, RoomsModel.id == RentalInfoModel.room_id)
+            .where(RoomsModel.room_status == 2)
+        )
 
         return jsonify({
             'success': True,
@@ -2776,84 +1704,48 @@ def api_get_rented_rooms_old():
         })
 
 
-@app.route('/api/rented_rooms_new', methods=['GET'])
-def api_get_rented_rooms_new():
-    """获取六楼已出租房间列表"""
-    try:
-        # 查询状态为已出租(2)的房间，并关联租房信息获取租客姓名
-        rented_rooms = db.session.query(RoomsNew, RentalInfoNew).join(
-            RentalInfoNew, RoomsNew.room_number == RentalInfoNew.room_number
-        ).filter(RoomsNew.room_status == 2).all()
-
-        rooms_list = []
-        for room, rental_info in rented_rooms:
-            rooms_list.append({
-                'id': room.id,
-                'room_number': room.room_number,
-                'room_type': room.room_type,
-                'base_rent': float(room.base_rent) if room.base_rent else 0,
-                'deposit': float(room.deposit) if room.deposit else 0,  # 使用房间表的押金
-                'tenant_name': rental_info.tenant_name if rental_info else '',
-                'tenant_phone': rental_info.phone if rental_info else '',
-                'rental_deposit': float(rental_info.deposit) if rental_info and rental_info.deposit else 0,  # 租房信息表的押金
-                'check_in_date': rental_info.check_in_date.strftime(
-                    '%Y-%m-%d') if rental_info and rental_info.check_in_date else ''
-            })
-
-        return jsonify({
-            'success': True,
-            'rooms': rooms_list
-        })
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'message': f'获取已出租房间失败: {str(e)}'
-        })
-
+@app.route('/api/contracts_<any(old, new):floor>/export_zip', methods=['GET'])
+def api_export_contracts_zip(floor):
+    """批量导出合同PDF，以ZIP格式流式下载
 
-# 获取空闲房间列表API
-@app.route('/api/available_rooms_old', methods=['GET'])
-def api_get_available_rooms_old():
-    """获取五楼空闲房间列表"""
+    参数：ids（逗号分隔的合同ID），或合同列表页的筛选参数（如 contract_status=1 导出全部有效合同）
+    """
+    config = LIST_CONFIGS[f'contracts_{floor}']
+    model = config.model
     try:
-        # 查询状态为空闲(1)的房间
-        available_rooms = RoomsOld.query.filter_by(room_status=1).all()
-
-        rooms_list = []
-        for room in available_rooms:
-            rooms_list.append({
-                'id': room.id,
-                'room_number': room.room_number,
-                'room_type': room.room_type,
-                'base_rent': float(room.base_rent) if room.base_rent else 0
-            })
-
-        return jsonify({
-            'success': True,
-            'rooms': rooms_list
-        })
+        conditions, applied = build_filter_conditions(config, request.args)
+        ids = [int(value) for value in request.args.get('ids', '').split(',') if value.strip()]
+        if ids:
+            conditions.append(model.id.in_(ids))
+        elif not applied and request.args.get('all') != '1':
+            return jsonify({'success': False, 'message': '请选择要导出的合同或设置筛选条件'})
+
+        contracts = model.query.filter(*conditions).order_by(model.room_number, model.id).all()
+        if not contracts:
+            return jsonify({'success': False, 'message': '没有符合条件的合同'})
     except Exception as e:
-        return jsonify({
-            'success': False,
-            'message': f'获取空闲房间失败: {str(e)}'
-        })
+        return jsonify({'success': False, 'message': f'导出失败: {str(e)}'})
+
+    filename = f"contracts_{floor}_{datetime.now().strftime('%Y%m%d%H%M%S')}.zip"
+    chunks = stream_contracts_zip(contracts, workers=app.config['PDF_EXPORT_WORKERS'],
+                                  font_paths=app.config['PDF_FONT_PATHS'])
+    return Response(
+        stream_with_context(chunks),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
 
 
-@app.route('/api/available_rooms_new', methods=['GET'])
-def api_get_available_rooms_new():
-    """获取六楼空闲房间列表"""
+# 获取空闲房间列表API
+@app.route('/api/available_rooms_<any(old, new):floor>', methods=['GET'])
+def api_get_available_rooms(floor):
+    """获取空闲房间列表"""
+    RoomsModel = FLOOR_MODELS[floor]['rooms']
     try:
         # 查询状态为空闲(1)的房间
-        available_rooms = RoomsNew.query.filter_by(room_status=1).all()
-
-        rooms_list = []
-        for room in available_rooms:
-            rooms_list.append({
-                'id': room.id,
-                'room_number': room.room_number,
-                'room_type': room.room_type,
-                'base_rent': float(room.base_rent) if room.base_rent else 0
-            })
+        rooms_list = AVAILABLE_ROOMS.all(
+            AVAILABLE_ROOMS.select(RoomsModel).where(RoomsModel.room_status == 1).order_by(RoomsModel.id)
+        )
 
         return jsonify({
             'success': True,
@@ -3003,14 +1895,8 @@ def api_delete_admin(admin_id):
 
 # Vercel 部署时的应用初始化
 def init_app_for_vercel():
-    """为 Vercel 部署初始化应用"""
-    try:
-        with app.app_context():
-            # 在 Vercel 环境中初始化数据库
-            db.create_all()
-            print("数据库初始化成功")
-    except Exception as e:
-        print(f"数据库初始化失败: {e}")
+    """为 Vercel 部署初始化应用（冷启动时执行一次建表）"""
+    init_database()
 
 # 检查是否在 Vercel 环境中
 if os.getenv('VERCEL'):
@@ -0,0 +1,14 @@
+"""热点接口的基准测试
+
+用 Flask 测试客户端在模拟数据集上请求首页、列表页、搜索、合同PDF下载和标记缴费等接口，
+记录 p50/p95 耗时、SQL 语句数和峰值内存，结果保存为 JSON，并可与保存的基线结果对比：
+
+    python -m benchmarks run --output benchmarks/results/baseline.json
+    python -m benchmarks run --baseline benchmarks/results/baseline.json
+    python -m benchmarks compare benchmarks/results/baseline.json benchmarks/results/latest.json
+
+并发压测对本地运行的服务回放员工操作（首页刷新、列表浏览、搜索、连续标记缴费、合同PDF下载），
+统计吞吐量、尾延迟和错误，用于确定 worker 数和数据库连接池大小：
+
+    python -m benchmarks load --url http://127.0.0.1:5000 --clients 20 --duration 120
+"""
@@ -0,0 +1,116 @@
+import json
+import os
+import click
+from benchmarks.cases import CASES
+from benchmarks.load import LoadDriver, LoadError, DEFAULT_MIX, WORKFLOWS, format_report
+from benchmarks.runner import BENCHMARK_DIR, run_benchmarks, compare_results, format_results, format_comparison
+
+DEFAULT_OUTPUT = os.path.join(BENCHMARK_DIR, 'results', 'latest.json')
+
+
+def _load(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _compare(baseline, current, threshold):
+    rows, regressions = compare_results(baseline, current, threshold)
+    click.echo(format_comparison(rows, baseline, current))
+    if regressions:
+        raise click.ClickException(f"{len(regressions)} 个用例退化: {', '.join(regressions)}")
+
+
+@click.group()
+def cli():
+    """热点接口基准测试"""
+
+
+@cli.command('run')
+@click.option('--rooms-per-floor', type=click.IntRange(1), default=50, show_default=True, help='数据集每层房间数')
+@click.option('--years', type=click.IntRange(1), default=3, show_default=True, help='数据集的月度数据年数')
+@click.option('--seed', type=int, default=1, show_default=True, help='数据集随机种子')
+@click.option('--database-url', default=None, help='使用已有数据库（默认使用按参数生成的 SQLite 数据集）')
+@click.option('--iterations', type=click.IntRange(1), default=30, show_default=True, help='每个用例的计时请求次数')
+@click.option('--warmup', type=click.IntRange(0), default=3, show_default=True, help='每个用例的预热请求次数')
+@click.option('--warm', is_flag=True, help='保留首页统计、单价和PDF缓存（默认每次请求前清空）')
+@click.option('--only', multiple=True, type=click.Choice([case.name for case in CASES]), help='只运行指定用例，可重复')
+@click.option('--output', type=click.Path(dir_okay=False), default=DEFAULT_OUTPUT, show_default=True,
+              help='结果 JSON 文件')
+@click.option('--baseline', type=click.Path(exists=True, dir_okay=False), default=None, help='与基线结果对比')
+@click.option('--threshold', type=float, default=10.0, show_default=True, help='耗时增幅超过该百分比记为退化')
+def run_command(rooms_per_floor, years, seed, database_url, iterations, warmup, warm, only, output, baseline,
+                threshold):
+    """在模拟数据集上运行基准测试"""
+    cases = [case for case in CASES if not only or case.name in only]
+    dataset = {'rooms_per_floor': rooms_per_floor, 'years': years, 'seed': seed}
+    click.echo(f"准备数据集并运行 {len(cases)} 个用例（每个 {iterations} 次）...")
+    current = run_benchmarks(
+        cases, dataset, database_url=database_url, iterations=iterations, warmup=warmup, warm=warm,
+        on_result=lambda name, result: click.echo(f"  {name}: p50 {result['p50_ms']:.2f} ms")
+    )
+    click.echo(format_results(current['results']))
+
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(current, f, ensure_ascii=False, indent=2)
+    click.echo(f"结果已保存到 {output}")
+
+    if baseline:
+        _compare(_load(baseline), current, threshold)
+
+
+@cli.command('compare')
+@click.argument('baseline', type=click.Path(exists=True, dir_okay=False))
+@click.argument('current', type=click.Path(exists=True, dir_okay=False))
+@click.option('--threshold', type=float, default=10.0, show_default=True, help='耗时增幅超过该百分比记为退化')
+def compare_command(baseline, current, threshold):
+    """对比两次基准测试结果，有退化时以非零状态退出"""
+    _compare(_load(baseline), _load(current), threshold)
+
+
+def _parse_mix(values):
+    mix = dict(DEFAULT_MIX)
+    for value in values:
+        name, _, weight = value.partition('=')
+        if name not in WORKFLOWS:
+            raise click.BadParameter(f"未知的工作流程 {name}，可选: {', '.join(WORKFLOWS)}", param_hint='--mix')
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise click.BadParameter(f'权重格式不正确: {value}', param_hint='--mix')
+    if not any(weight > 0 for weight in mix.values()):
+        raise click.BadParameter('至少需要一个权重大于 0 的工作流程', param_hint='--mix')
+    return mix
+
+
+@cli.command('load')
+@click.option('--url', default='http://127.0.0.1:5000', show_default=True, help='本地运行的服务地址')
+@click.option('--clients', type=click.IntRange(1), default=10, show_default=True, help='并发客户端数')
+@click.option('--duration', type=click.FloatRange(1), default=60, show_default=True, help='压测时长（秒）')
+@click.option('--think-time', type=click.FloatRange(0), default=0.5, show_default=True,
+              help='两次操作之间的平均停顿（秒），0 表示不停顿')
+@click.option('--mix', multiple=True, help=f"工作流程权重，如 search=5，可重复（默认 "
+                                           f"{', '.join(f'{k}={v}' for k, v in DEFAULT_MIX.items())}）")
+@click.option('--seed', type=int, default=None, help='随机种子')
+@click.option('--timeout', type=click.FloatRange(1), default=30, show_default=True, help='单个请求超时（秒）')
+@click.option('--output', type=click.Path(dir_okay=False), default=None, help='结果 JSON 文件')
+def load_command(url, clients, duration, think_time, mix, seed, timeout, output):
+    """对本地运行的服务并发回放员工操作，统计吞吐量、尾延迟和错误（会修改数据，请在模拟数据集上运行）"""
+    driver = LoadDriver(url, clients=clients, duration=duration, think_time=think_time, mix=_parse_mix(mix),
+                        seed=seed, timeout=timeout)
+    try:
+        driver.discover()
+    except LoadError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"{clients} 个并发客户端压测 {url}，持续 {duration:g} 秒...")
+    report = driver.run()
+    click.echo(format_report(report))
+    if output:
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        click.echo(f"结果已保存到 {output}")
+
+
+if __name__ == '__main__':
+    cli()
@@ -0,0 +1,53 @@
+from sqlalchemy import select
+from models import db, ContractsOld, RentalOld, RentalInfoOld
+
+
+class Case:
+    """一个基准测试用例
+
+    path 为请求路径，或 path(fixtures, iteration) 返回请求路径的函数（用于每次请求不同的数据）。
+    """
+
+    def __init__(self, name, path, method='GET', json=None):
+        self.name = name
+        self.path = path
+        self.method = method
+        self.json = json
+
+    def url(self, fixtures, iteration):
+        return self.path(fixtures, iteration) if callable(self.path) else self.path
+
+
+def load_fixtures():
+    """从数据库中选取用例需要的数据：下载的合同、标记缴费的租房记录、搜索词"""
+    contract_id = db.session.execute(select(ContractsOld.id).order_by(ContractsOld.id).limit(1)).scalar()
+    # 未缴费的租房记录排在前面，每次请求依次标记不同的记录
+    rental_ids = db.session.execute(
+        select(RentalOld.id).order_by(RentalOld.payment_status.desc(), RentalOld.id)
+    ).scalars().all()
+    tenant_name = db.session.execute(
+        select(RentalInfoOld.tenant_name).order_by(RentalInfoOld.id).limit(1)
+    ).scalar()
+    return {
+        'contract_id': contract_id,
+        'rental_ids': rental_ids,
+        # 按姓氏搜索，匹配较多的租客
+        'search_term': tenant_name[0] if tenant_name else '张',
+    }
+
+
+def _rental_id(fixtures, iteration):
+    rental_ids = fixtures['rental_ids']
+    return rental_ids[iteration % len(rental_ids)]
+
+
+CASES = [
+    Case('index5', '/index5'),
+    Case('index6', '/index6'),
+    Case('rooms_old', '/rooms_old'),
+    Case('contracts_new', '/contracts_new'),
+    Case('rental_info_old_search', lambda fixtures, i: f"/api/rental_info_old/search?q={fixtures['search_term']}"),
+    Case('rented_rooms_old', '/api/rented_rooms_old'),
+    Case('contract_pdf_download', lambda fixtures, i: f"/api/contracts_old/{fixtures['contract_id']}/download"),
+    Case('mark_rental_paid', lambda fixtures, i: f'/rental/{_rental_id(fixtures, i)}/mark_paid', method='POST'),
+]
@@ -0,0 +1,331 @@
+import http.client
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from urllib.parse import urlencode, urlsplit
+from benchmarks.runner import percentile
+
+FLOORS = {'old': '五楼', 'new': '六楼'}
+DASHBOARDS = {'old': '/index5', 'new': '/index6'}
+LIST_PAGES = ('rooms', 'rental', 'rental_info', 'contracts', 'rental_records')
+MARK_PAID_PATHS = {'old': '/rental/{}/mark_paid', 'new': '/rental_new/{}/mark_paid'}
+
+
+class LoadError(Exception):
+    """压测无法开始（服务不可访问或没有数据）"""
+
+
+class HttpClient:
+    """单个虚拟用户的 HTTP 连接（保持长连接，出错后重新连接）"""
+
+    def __init__(self, base_url, timeout=30):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        https = parts.scheme == 'https'
+        self.connection_class = http.client.HTTPSConnection if https else http.client.HTTPConnection
+        self.connection = None
+
+    def request(self, method, path, body=None):
+        """发送请求，返回 (状态码, Content-Type, 响应内容)"""
+        if self.connection is None:
+            self.connection = self.connection_class(self.host, self.port, timeout=self.timeout)
+        headers = {}
+        if body is not None:
+            body = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        try:
+            self.connection.request(method, self.prefix + path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            data = response.read()
+        except Exception:
+            self.close()
+            raise
+        if response.will_close:
+            self.close()
+        return response.status, response.getheader('Content-Type', ''), data
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+def check_response(status, content_type, data):
+    """返回错误说明，没有错误时返回 None
+
+    除 HTTP 错误状态码外，接口出错时多数返回状态码 200 和 {"success": false, "message": ...}，同样计为错误。
+    """
+    if status >= 400:
+        return 'http', f'HTTP {status}'
+    if content_type.startswith('application/json'):
+        try:
+            payload = json.loads(data)
+        except ValueError:
+            return 'http', '响应不是有效的 JSON'
+        if isinstance(payload, dict) and payload.get('success') is False:
+            return 'failed', payload.get('message') or '未知错误'
+    return None
+
+
+class Recorder:
+    """线程安全地汇总各请求的耗时和错误"""
+
+    def __init__(self):
+        self.durations = defaultdict(list)
+        self.errors = defaultdict(lambda: defaultdict(int))
+        self.workflows = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, label, elapsed_ms, error=None):
+        with self._lock:
+            self.durations[label].append(elapsed_ms)
+            if error:
+                kind, message = error
+                self.errors[label][(kind, message)] += 1
+
+    def workflow_done(self, name):
+        with self._lock:
+            self.workflows[name] += 1
+
+
+class Session:
+    """一个虚拟用户：按权重随机选择工作流程并依次执行，两次操作之间随机停顿"""
+
+    def __init__(self, driver, index):
+        self.driver = driver
+        self.data = driver.data
+        self.rng = random.Random(None if driver.seed is None else driver.seed * 1000 + index)
+        self.client = HttpClient(driver.base_url, timeout=driver.timeout)
+
+    def call(self, label, path, method='GET', body=None):
+        """执行一次请求并记录，返回解析后的 JSON（非 JSON 或出错时返回 None）"""
+        started = time.perf_counter()
+        try:
+            status, content_type, data = self.client.request(method, path, body)
+        except Exception as e:
+            self.driver.recorder.record(label, (time.perf_counter() - started) * 1000,
+                                        ('transport', f'{type(e).__name__}: {e}'))
+            return None
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        error = check_response(status, content_type, data)
+        self.driver.recorder.record(label, elapsed_ms, error)
+        if error or not content_type.startswith('application/json'):
+            return None
+        return json.loads(data)
+
+    def think(self):
+        if self.driver.think_time > 0:
+            time.sleep(self.rng.expovariate(1 / self.driver.think_time))
+
+    def run(self, deadline):
+        names = list(self.driver.mix)
+        weights = [self.driver.mix[name] for name in names]
+        try:
+            while time.monotonic() < deadline:
+                name = self.rng.choices(names, weights)[0]
+                WORKFLOWS[name](self)
+                self.driver.recorder.workflow_done(name)
+                self.think()
+        finally:
+            self.client.close()
+
+    # 工作流程
+
+    def dashboard(self):
+        """刷新楼层首页和各楼层汇总"""
+        floor = self.rng.choice(list(FLOORS))
+        self.call('dashboard', DASHBOARDS[floor])
+        self.call('floor_summary', '/api/floor_summary')
+
+    def browse(self):
+        """打开列表页，再向后翻几页"""
+        floor = self.rng.choice(list(FLOORS))
+        name = f'{self.rng.choice(LIST_PAGES)}_{floor}'
+        self.call('list_page', f'/{name}')
+        cursor = None
+        for _ in range(self.rng.randint(1, 3)):
+            self.think()
+            params = {'after': cursor} if cursor else {}
+            result = self.call('list_api', f'/api/list/{name}?{urlencode(params)}')
+            cursor = result and result['page'].get('next_cursor')
+            if not cursor:
+                break
+
+    def search(self):
+        """按姓名、姓氏、房号或电话号码前缀搜索，打开第一条结果"""
+        floor = self.rng.choice(list(FLOORS))
+        term = self.rng.choice(self.data['terms'][floor])
+        self.call('search', '/api/search?' + urlencode({'q': term, 'floor': floor}))
+        result = self.call('rental_info_search', f'/api/rental_info_{floor}/search?' + urlencode({'q': term}))
+        if result and result['data']:
+            self.think()
+            self.call('rental_info_detail', f"/api/rental_info_{floor}/{result['data'][0]['id']}")
+
+    def mark_paid_burst(self):
+        """收租时连续标记多条租房记录为已缴费"""
+        floor = self.rng.choice(list(FLOORS))
+        for _ in range(self.rng.randint(3, 8)):
+            rental_id = self.driver.next_rental(floor, self.rng)
+            self.call('mark_paid', MARK_PAID_PATHS[floor].format(rental_id), method='POST')
+
+    def pdf_download(self):
+        """查看合同详情并下载合同PDF"""
+        floor = self.rng.choice(list(FLOORS))
+        contract_id = self.rng.choice(self.data['contracts'][floor])
+        self.call('contract_detail', f'/api/contracts_{floor}/{contract_id}')
+        self.call('contract_pdf', f'/api/contracts_{floor}/{contract_id}/download')
+
+
+WORKFLOWS = {
+    'dashboard': Session.dashboard,
+    'browse': Session.browse,
+    'search': Session.search,
+    'mark_paid': Session.mark_paid_burst,
+    'pdf': Session.pdf_download,
+}
+
+DEFAULT_MIX = {'dashboard': 3, 'browse': 4, 'search': 3, 'mark_paid': 1, 'pdf': 1}
+
+
+class LoadDriver:
+    """对本地运行的服务并发回放员工的日常操作
+
+    每个并发客户端为一个线程和一条长连接，按 mix 中的权重随机执行工作流程（首页刷新、列表浏览、搜索、
+    连续标记缴费、合同PDF下载），每次操作之间按指数分布停顿，平均 think_time 秒（为 0 时不停顿）。
+    压测前通过列表接口读取租房记录、合同和租客信息作为请求数据。标记缴费会修改数据，应在模拟数据集上运行。
+    """
+
+    def __init__(self, base_url, clients=10, duration=60, think_time=0.5, mix=None, seed=None, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.clients = clients
+        self.duration = duration
+        self.think_time = think_time
+        self.mix = {name: weight for name, weight in (mix or DEFAULT_MIX).items() if weight > 0}
+        self.seed = seed
+        self.timeout = timeout
+        self.recorder = Recorder()
+        self.data = None
+        self._rental_lock = threading.Lock()
+        self._rental_positions = {}
+
+    def _fetch(self, client, path):
+        try:
+            status, content_type, data = client.request('GET', path)
+        except Exception as e:
+            raise LoadError(f'无法访问 {self.base_url}{path}: {e}')
+        if check_response(status, content_type, data) or not content_type.startswith('application/json'):
+            raise LoadError(f'{path} 返回错误: HTTP {status} {data[:200]!r}')
+        return json.loads(data)['data']
+
+    def discover(self):
+        """读取压测用的数据：未缴费优先的租房记录、合同、搜索词"""
+        client = HttpClient(self.base_url, timeout=self.timeout)
+        data = {'rentals': {}, 'contracts': {}, 'terms': {}}
+        try:
+            for floor in FLOORS:
+                rentals = self._fetch(client, f'/api/list/rental_{floor}?payment_status=2&limit=200')
+                rentals += self._fetch(client, f'/api/list/rental_{floor}?payment_status=1&limit=200')
+                contracts = self._fetch(client, f'/api/list/contracts_{floor}?limit=200')
+                infos = self._fetch(client, f'/api/list/rental_info_{floor}?limit=200')
+                if not rentals or not contracts or not infos:
+                    raise LoadError(f'{FLOORS[floor]}没有租房记录、合同或租房信息，请先运行 flask generate-data')
+                data['rentals'][floor] = [row['id'] for row in rentals]
+                data['contracts'][floor] = [row['id'] for row in contracts]
+                terms = set()
+                for row in infos:
+                    terms.update([row['tenant_name'], row['tenant_name'][:1], row['room_number']])
+                    if row.get('phone'):
+                        terms.add(row['phone'][:7])
+                data['terms'][floor] = sorted(term for term in terms if term)
+        finally:
+            client.close()
+        self.data = data
+        return data
+
+    def next_rental(self, floor, rng):
+        """依次取下一条租房记录（未缴费的在前），用完后从头开始"""
+        rentals = self.data['rentals'][floor]
+        with self._rental_lock:
+            position = self._rental_positions.get(floor, rng.randrange(len(rentals)))
+            self._rental_positions[floor] = position + 1
+        return rentals[position % len(rentals)]
+
+    def run(self):
+        if self.data is None:
+            self.discover()
+        started = time.monotonic()
+        deadline = started + self.duration
+        threads = [threading.Thread(target=Session(self, index).run, args=(deadline,), daemon=True)
+                   for index in range(self.clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.report(time.monotonic() - started)
+
+    def report(self, elapsed):
+        """汇总吞吐量、耗时分位数和错误，返回可写入 JSON 的结果"""
+        recorder = self.recorder
+        endpoints = {}
+        total_requests = total_errors = 0
+        all_durations = []
+        for label, durations in sorted(recorder.durations.items()):
+            errors = recorder.errors.get(label, {})
+            error_count = sum(errors.values())
+            total_requests += len(durations)
+            total_errors += error_count
+            all_durations.extend(durations)
+            endpoints[label] = {
+                'requests': len(durations),
+                'throughput': round(len(durations) / elapsed, 2),
+                'p50_ms': round(percentile(durations, 50), 2),
+                'p95_ms': round(percentile(durations, 95), 2),
+                'p99_ms': round(percentile(durations, 99), 2),
+                'max_ms': round(max(durations), 2),
+                'errors': error_count,
+                'error_messages': [
+                    {'kind': kind, 'message': message, 'count': count}
+                    for (kind, message), count in sorted(errors.items(), key=lambda item: -item[1])[:5]
+                ],
+            }
+        return {
+            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'url': self.base_url,
+            'clients': self.clients,
+            'duration_s': round(elapsed, 2),
+            'think_time_s': self.think_time,
+            'mix': self.mix,
+            'requests': total_requests,
+            'throughput': round(total_requests / elapsed, 2) if elapsed else 0.0,
+            'p50_ms': round(percentile(all_durations, 50), 2),
+            'p95_ms': round(percentile(all_durations, 95), 2),
+            'p99_ms': round(percentile(all_durations, 99), 2),
+            'errors': total_errors,
+            'error_rate': round(total_errors / total_requests, 4) if total_requests else 0.0,
+            'workflows': dict(sorted(recorder.workflows.items())),
+            'endpoints': endpoints,
+        }
+
+
+def format_report(report):
+    """格式化压测结果为表格文本"""
+    lines = [
+        f"{report['clients']} 个并发客户端，{report['duration_s']} 秒，共 {report['requests']} 个请求，"
+        f"吞吐量 {report['throughput']} 次/秒，错误率 {report['error_rate'] * 100:.2f}%",
+        f"总体 p50 {report['p50_ms']} ms  p95 {report['p95_ms']} ms  p99 {report['p99_ms']} ms",
+        f"完成的工作流程: {', '.join(f'{name} {count}' for name, count in report['workflows'].items())}",
+        f"{'接口':<20}{'请求数':>8}{'次/秒':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'错误':>7}",
+    ]
+    for label, stats in report['endpoints'].items():
+        lines.append(f"{label:<20}{stats['requests']:>8}{stats['throughput']:>9.2f}{stats['p50_ms']:>10.2f}"
+                     f"{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}{stats['max_ms']:>10.2f}{stats['errors']:>7}")
+    for label, stats in report['endpoints'].items():
+        for error in stats['error_messages']:
+            lines.append(f"  {label} [{error['kind']}] x{error['count']}: {error['message']}")
+    return '\n'.join(lines)
@@ -0,0 +1,301 @@
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime
+from sqlalchemy import event, select
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BENCHMARK_DIR)
+DATA_DIR = os.path.join(BENCHMARK_DIR, 'data')
+
+
+def percentile(values, q):
+    """线性插值计算分位数，q 取 0~100"""
+    values = sorted(values)
+    if not values:
+        return 0.0
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_DIR, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def sqlite_dataset(dataset):
+    """返回 SQLite 数据集文件路径，不存在时生成
+
+    生成的数据按当天日期计算账期，因此文件名包含日期和生成参数，相同参数同一天内只生成一次。
+    每次运行复制一份作为工作数据库，标记缴费等写操作不会改变数据集本身。
+    """
+    os.makedirs(DATA_DIR, exist_ok=True)
+    name = (f"dataset-r{dataset['rooms_per_floor']}-y{dataset['years']}-s{dataset['seed']}-"
+            f"{date.today():%Y%m%d}.db")
+    path = os.path.join(DATA_DIR, name)
+    if not os.path.exists(path):
+        _generate(f'sqlite:///{path}', dataset)
+    run_path = os.path.join(DATA_DIR, 'run.db')
+    shutil.copyfile(path, run_path)
+    return f'sqlite:///{run_path}'
+
+
+def _generate(database_url, dataset, reset=False):
+    """在子进程中用 flask generate-data 生成数据集（应用按 DATABASE_URL 连接数据库）"""
+    command = [sys.executable, '-m', 'flask', '--app', 'app', 'generate-data',
+               '--rooms-per-floor', str(dataset['rooms_per_floor']), '--years', str(dataset['years']), '--seed', str(dataset['seed'])]
+    if reset:
+        command.append('--reset')
+    env = dict(os.environ, DATABASE_URL=database_url)
+    result = subprocess.run(command, cwd=PROJECT_DIR, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f'生成数据集失败:\n{result.stdout}{result.stderr}')
+    return result.stdout
+
+
+class QueryCounter:
+    """统计测量期间执行的 SQL 语句数"""
+
+    def __init__(self):
+        self.active = False
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if self.active:
+            self.count += 1
+
+
+class BenchmarkRunner:
+    """用 Flask 测试客户端依次请求各用例，记录耗时分位数、SQL 语句数和峰值内存
+
+    默认每次请求前清空首页统计、水电费单价和合同PDF缓存，测量的是接口本身的开销；warm=True 时保留缓存。
+    峰值内存为单独一次请求在 tracemalloc 下的 Python 内存分配峰值，与计时分开测量以免影响耗时。
+    """
+
+    def __init__(self, app, iterations=30, warmup=3, warm=False):
+        self.app = app
+        self.iterations = iterations
+        self.warmup = warmup
+        self.warm = warm
+        self.counter = QueryCounter()
+
+    def _reset_caches(self, fixtures):
+        from stats_cache import stats_cache
+        from rates import rate_resolver
+        from pdf_cache import pdf_cache
+        from models import ContractsOld
+        stats_cache.invalidate()
+        rate_resolver.invalidate()
+        pdf_cache.invalidate(ContractsOld.__tablename__, fixtures['contract_id'])
+
+    def _request(self, client, case, fixtures, iteration):
+        if not self.warm:
+            self._reset_caches(fixtures)
+        self.counter.count = 0
+        self.counter.active = True
+        started = time.perf_counter()
+        response = client.open(case.url(fixtures, iteration), method=case.method, json=case.json)
+        response.get_data()
+        elapsed = time.perf_counter() - started
+        self.counter.active = False
+
+        error = None
+        if response.status_code >= 400:
+            error = f'HTTP {response.status_code}'
+        elif response.is_json and response.get_json().get('success') is False:
+            error = response.get_json().get('message')
+        response.close()
+        return elapsed, self.counter.count, response.status_code, error
+
+    def run_case(self, client, case, fixtures):
+        iteration = 0
+        for _ in range(self.warmup):
+            self._request(client, case, fixtures, iteration)
+            iteration += 1
+
+        durations, queries, errors = [], [], []
+        status = None
+        for _ in range(self.iterations):
+            elapsed, count, status, error = self._request(client, case, fixtures, iteration)
+            iteration += 1
+            durations.append(elapsed * 1000)
+            queries.append(count)
+            if error:
+                errors.append(error)
+
+        tracemalloc.start()
+        try:
+            self._request(client, case, fixtures, iteration)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        result = {
+            'method': case.method,
+            'path': case.url(fixtures, 0),
+            'status': status,
+            'iterations': self.iterations,
+            'p50_ms': round(percentile(durations, 50), 3),
+            'p95_ms': round(percentile(durations, 95), 3),
+            'mean_ms': round(sum(durations) / len(durations), 3),
+            'min_ms': round(min(durations), 3),
+            'max_ms': round(max(durations), 3),
+            'queries': max(queries),
+            'peak_memory_kb': round(peak / 1024, 1),
+            'errors': len(errors),
+        }
+        if errors:
+            result['last_error'] = errors[-1]
+        return result
+
+    def run(self, cases, on_result=None):
+        from models import db
+        from benchmarks.cases import load_fixtures
+
+        results = {}
+        with self.app.app_context():
+            fixtures = load_fixtures()
+            event.listen(db.engine, 'after_cursor_execute', self.counter)
+            try:
+                client = self.app.test_client()
+                for case in cases:
+                    results[case.name] = self.run_case(client, case, fixtures)
+                    if on_result:
+                        on_result(case.name, results[case.name])
+            finally:
+                event.remove(db.engine, 'after_cursor_execute', self.counter)
+        return results
+
+
+def row_counts(app):
+    """各业务表的数据量，记录在结果中用于判断两次结果是否基于同样规模的数据"""
+    from models import db, FLOOR_MODELS
+    from sqlalchemy import func
+    counts = {}
+    with app.app_context():
+        for key, model in FLOOR_MODELS['old'].items():
+            table = model.__table__
+            counts[table.name] = db.session.execute(select(func.count()).select_from(table)).scalar()
+    return dict(sorted(counts.items()))
+
+
+def run_benchmarks(cases, dataset, database_url=None, iterations=30, warmup=3, warm=False, on_result=None):
+    """准备数据库后运行用例，返回可写入 JSON 的结果
+
+    未指定 database_url 时使用按 dataset 参数生成的 SQLite 数据集；指定时直接使用该数据库
+    （数据库为空时先生成数据），写操作用例会修改其中的数据。
+    """
+    if database_url is None:
+        database_url = sqlite_dataset(dataset)
+    # 应用在导入时读取数据库配置
+    os.environ['DATABASE_URL'] = database_url
+    from app import app
+    from models import db, RoomsOld
+    from migrations import run_migrations
+
+    with app.app_context():
+        run_migrations()
+        empty = db.session.execute(select(RoomsOld.id).limit(1)).first() is None
+    if empty:
+        _generate(database_url, dataset)
+
+    runner = BenchmarkRunner(app, iterations=iterations, warmup=warmup, warm=warm)
+    rows = row_counts(app)
+    results = runner.run(cases, on_result=on_result)
+    with app.app_context():
+        dialect = db.engine.dialect.name
+    return {
+        'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'database': dialect,
+        'dataset': dict(dataset, rows=rows),
+        'iterations': iterations,
+        'warmup': warmup,
+        'cache': 'warm' if warm else 'cold',
+        'results': results,
+    }
+
+
+def _change(before, after):
+    if not before:
+        return None
+    return (after - before) / before * 100
+
+
+def compare_results(baseline, current, threshold=10.0):
+    """逐个用例对比两次结果
+
+    p50、p95 增幅超过 threshold（百分比）或 SQL 语句数增加时记为退化。返回 (对比行, 退化的用例名列表)。
+    """
+    rows = []
+    regressions = []
+    for name, result in current['results'].items():
+        before = baseline['results'].get(name)
+        if before is None:
+            rows.append({'name': name, 'new': True, 'current': result})
+            continue
+        row = {'name': name, 'baseline': before, 'current': result, 'regressed': []}
+        for metric in ('p50_ms', 'p95_ms', 'peak_memory_kb'):
+            row[metric] = _change(before[metric], result[metric])
+        if (row['p50_ms'] or 0) > threshold:
+            row['regressed'].append('p50')
+        if (row['p95_ms'] or 0) > threshold:
+            row['regressed'].append('p95')
+        if result['queries'] > before['queries']:
+            row['regressed'].append('queries')
+        if row['regressed']:
+            regressions.append(name)
+        rows.append(row)
+    return rows, regressions
+
+
+def format_results(results):
+    """格式化单次结果为表格文本"""
+    lines = [f"{'用例':<24}{'p50 ms':>10}{'p95 ms':>10}{'SQL':>6}{'内存 KB':>11}  状态"]
+    for name, result in results.items():
+        state = f"{result['errors']} 次失败: {result.get('last_error')}" if result['errors'] else result['status']
+        lines.append(f"{name:<24}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['queries']:>6}"
+                     f"{result['peak_memory_kb']:>11.1f}  {state}")
+    return '\n'.join(lines)
+
+
+def _percent(value):
+    return '    -' if value is None else f'{value:+.1f}%'
+
+
+def format_comparison(rows, baseline, current):
+    """格式化对比结果为表格文本"""
+    lines = []
+    if baseline.get('dataset', {}).get('rows') != current.get('dataset', {}).get('rows'):
+        lines.append('注意：两次结果的数据量不同，对比仅供参考')
+    if (baseline.get('database'), baseline.get('cache')) != (current.get('database'), current.get('cache')):
+        lines.append('注意：两次结果的数据库或缓存模式不同，对比仅供参考')
+    lines.append(f"基线 {baseline.get('git_commit') or '-'} ({baseline.get('created_at')})  "
+                 f"当前 {current.get('git_commit') or '-'} ({current.get('created_at')})")
+    lines.append(f"{'用例':<24}{'p50 ms':>18}{'':>9}{'p95 ms':>18}{'':>9}{'SQL':>10}{'内存':>9}")
+    for row in rows:
+        result = row['current']
+        if row.get('new'):
+            lines.append(f"{row['name']:<24}{result['p50_ms']:>18.2f}{'新增':>9}{result['p95_ms']:>18.2f}"
+                         f"{'':>9}{result['queries']:>10}")
+            continue
+        before = row['baseline']
+        mark = f"  退化: {', '.join(row['regressed'])}" if row['regressed'] else ''
+        lines.append(
+            f"{row['name']:<24}"
+            f"{before['p50_ms']:>8.2f} → {result['p50_ms']:>7.2f}{_percent(row['p50_ms']):>9}"
+            f"{before['p95_ms']:>8.2f} → {result['p95_ms']:>7.2f}{_percent(row['p95_ms']):>9}"
+            f"{before['queries']:>4} → {result['queries']:<3}"
+            f"{_percent(row['peak_memory_kb']):>9}{mark}"
+        )
+    return '\n'.join(lines)
@@ -0,0 +1,235 @@
+from datetime import date, datetime
+from decimal import Decimal
+from sqlalchemy import select, insert, update, delete, func
+from models import db, FLOOR_MODELS
+
+# 账单状态
+BILL_PAID = 1
+BILL_UNPAID = 2
+BILL_PARTIAL = 3
+
+
+def period_of(value):
+    """返回日期所在账期（当月1日）"""
+    return date(value.year, value.month, 1)
+
+
+def current_period():
+    """当前账期"""
+    return period_of(datetime.now())
+
+
+def _money(value):
+    return Decimal(str(value or 0)).quantize(Decimal('0.01'))
+
+
+def bill_status(amount_due, amount_paid):
+    """根据应缴、已缴金额计算账单状态"""
+    if amount_paid >= amount_due:
+        return BILL_PAID
+    if amount_paid > 0:
+        return BILL_PARTIAL
+    return BILL_UNPAID
+
+
+def sync_rental_bill(floor, rental, period=None):
+    """根据租房管理记录生成或更新其账期账单（默认当前账期），不提交事务
+
+    只同步应缴金额，已缴金额只随登记缴费、标记缴费变化：新生成的账单为未缴费，不按租房记录
+    （可能是上个账期留下的）缴费状态结清。租房记录的缴费状态随账单状态更新。
+    账期开始前已退房的记录没有该账期的账单时不生成，返回 None。
+    """
+    BillsModel = FLOOR_MODELS[floor]['bills']
+    period = period or current_period()
+    db.session.flush()
+
+    bill = BillsModel.query.filter_by(rental_id=rental.id, period=period).first()
+    if bill is None:
+        if rental.check_out_date is not None and rental.check_out_date < period:
+            return None
+        bill = BillsModel(rental_id=rental.id, period=period, amount_paid=0)
+        db.session.add(bill)
+
+    bill.room_number = rental.room_number
+    bill.tenant_name = rental.tenant_name
+    bill.rent = _money(rental.monthly_rent)
+    bill.water_fee = _money(rental.water_fee)
+    bill.electricity_fee = _money(rental.electricity_fee)
+    bill.amount_due = _money(rental.total_due)
+    bill.amount_paid = _money(bill.amount_paid)
+    bill.status = bill_status(bill.amount_due, bill.amount_paid)
+    rental.payment_status = 1 if bill.status == BILL_PAID else 2
+    return bill
+
+
+def ensure_current_bills(floor, rentals):
+    """为还没有当前账期账单的租房记录批量生成未缴费账单（一条 INSERT），不提交事务
+
+    Args:
+        rentals: 租房记录（ORM 对象或包含 id、room_number、tenant_name、monthly_rent、
+            water_fee、electricity_fee、total_due 的查询结果行）
+    """
+    BillsModel = FLOOR_MODELS[floor]['bills']
+    period = current_period()
+    rentals = list(rentals)
+    if not rentals:
+        return
+    existing = set(db.session.execute(
+        select(BillsModel.rental_id).where(
+            BillsModel.rental_id.in_([rental.id for rental in rentals]), BillsModel.period == period)
+    ).scalars())
+    missing = [rental for rental in rentals if rental.id not in existing]
+    if not missing:
+        return
+
+    now = datetime.now()
+    db.session.execute(insert(BillsModel), [{
+        'rental_id': rental.id,
+        'room_number': rental.room_number,
+        'tenant_name': rental.tenant_name,
+        'period': period,
+        'rent': _money(rental.monthly_rent),
+        'water_fee': _money(rental.water_fee),
+        'electricity_fee': _money(rental.electricity_fee),
+        'amount_due': _money(rental.total_due),
+        'amount_paid': Decimal('0.00'),
+        'status': bill_status(_money(rental.total_due), Decimal('0.00')),
+        'created_at': now,
+        'updated_at': now
+    } for rental in missing])
+
+
+def settle_open_bills(floor, rental_ids, paid_at=None):
+    """结清租房记录所有未结清的账单（包括以前账期的欠费，一条 UPDATE），不提交事务
+
+    Returns:
+        dict: {租房记录ID: 本次结清的金额（Decimal）}，没有未结清账单的记录不在其中
+    """
+    BillsModel = FLOOR_MODELS[floor]['bills']
+    open_bills = (BillsModel.rental_id.in_(rental_ids), BillsModel.status != BILL_PAID)
+    settled = {row.rental_id: _money(row.owed) for row in db.session.execute(
+        select(BillsModel.rental_id, func.sum(BillsModel.amount_due - BillsModel.amount_paid).label('owed'))
+        .where(*open_bills)
+        .group_by(BillsModel.rental_id)
+    )}
+    db.session.execute(
+        update(BillsModel)
+        .where(*open_bills)
+        .values(amount_paid=BillsModel.amount_due, status=BILL_PAID, paid_at=paid_at or datetime.now())
+    )
+    return settled
+
+
+def get_open_bills(floor, rental_id):
+    """租房记录未结清的账单，按账期从早到晚排列"""
+    BillsModel = FLOOR_MODELS[floor]['bills']
+    return BillsModel.query.filter(
+        BillsModel.rental_id == rental_id, BillsModel.status != BILL_PAID
+    ).order_by(BillsModel.period).all()
+
+
+def get_rental_arrears(floor, rental):
+    """租房记录的欠费明细（与 apply_rental_payment 冲抵的账单一致），按账期从早到晚排列
+
+    未缴费但还没有当前账期账单的租房记录，按当前应缴总额计入当前账期（登记缴费时会先生成该账单）。
+
+    Args:
+        rental: 租房记录（包含 id、payment_status、total_due）
+    Returns:
+        list: 每个账期的应缴、已缴和欠费金额（Decimal）
+    """
+    BillsModel = FLOOR_MODELS[floor]['bills']
+    arrears = [{
+        'period': bill.period,
+        'amount_due': _money(bill.amount_due),
+        'amount_paid': _money(bill.amount_paid),
+        'owed': _money(bill.amount_due) - _money(bill.amount_paid),
+    } for bill in get_open_bills(floor, rental.id)]
+
+    period = current_period()
+    if rental.payment_status == 2 and not any(item['period'] == period for item in arrears):
+        has_bill = db.session.execute(
+            select(BillsModel.id).where(BillsModel.rental_id == rental.id, BillsModel.period == period)
+        ).first()
+        if not has_bill and _money(rental.total_due) > 0:
+            arrears.append({'period': period, 'amount_due': _money(rental.total_due),
+                            'amount_paid': Decimal('0.00'), 'owed': _money(rental.total_due)})
+    return arrears
+
+
+def apply_rental_payment(floor, rental_id, amount, paid_at=None):
+    """将一笔缴费按账期从早到晚冲抵租房记录的欠费账单，不提交事务
+
+    只冲抵这条租房记录（即当前租客）的账单，同一房间以前租客的欠费不受影响。
+
+    Returns:
+        Decimal: 冲抵后剩余的欠费金额；没有欠费账单时返回 None
+    Raises:
+        ValueError: 缴费金额超过欠费金额（不记为预存款，需按欠费金额登记）
+    """
+    paid_at = paid_at or datetime.now()
+    remaining = _money(amount)
+
+    bills = get_open_bills(floor, rental_id)
+    if not bills:
+        return None
+    owed_total = sum((_money(bill.amount_due) - _money(bill.amount_paid) for bill in bills), Decimal('0.00'))
+    if remaining > owed_total:
+        raise ValueError(f'缴费金额 ¥{remaining} 超过欠费金额 ¥{owed_total}')
+
+    outstanding = Decimal('0.00')
+    for bill in bills:
+        owed = _money(bill.amount_due) - _money(bill.amount_paid)
+        applied = min(owed, remaining)
+        if applied > 0:
+            bill.amount_paid = _money(bill.amount_paid) + applied
+            bill.status = bill_status(_money(bill.amount_due), bill.amount_paid)
+            bill.paid_at = paid_at
+            remaining -= applied
+            owed -= applied
+        outstanding += owed
+    return outstanding
+
+
+def delete_unpaid_bills(floor, rental_id):
+    """删除租房记录未结清的账单（租房记录删除时调用），不提交事务"""
+    BillsModel = FLOOR_MODELS[floor]['bills']
+    db.session.execute(
+        delete(BillsModel).where(BillsModel.rental_id == rental_id, BillsModel.status != BILL_PAID)
+    )
+
+
+def get_room_arrears(floor, before=None):
+    """按房间和租房记录汇总欠费账单（走欠费部分索引）
+
+    同一房间前后租客的欠费分别汇总，每项对应一次登记缴费可冲抵的账单（见 apply_rental_payment）。
+
+    Args:
+        before (date): 只统计该账期之前的账单，为空时统计全部
+    Returns:
+        list: 每个房间（租房记录）的欠费金额、欠费月数和最早欠费账期，按欠费金额从高到低排列
+    """
+    BillsModel = FLOOR_MODELS[floor]['bills']
+    owed = func.sum(BillsModel.amount_due - BillsModel.amount_paid)
+    query = select(
+        BillsModel.room_number,
+        BillsModel.rental_id,
+        func.max(BillsModel.tenant_name).label('tenant_name'),
+        owed.label('amount_owed'),
+        func.count().label('months'),
+        func.min(BillsModel.period).label('since'),
+    ).where(BillsModel.status != BILL_PAID)
+    if before is not None:
+        query = query.where(BillsModel.period < before)
+    rows = db.session.execute(
+        query.group_by(BillsModel.room_number, BillsModel.rental_id)
+        .order_by(owed.desc(), BillsModel.room_number, BillsModel.rental_id)
+    ).all()
+    return [{
+        'room_number': row.room_number,
+        'rental_id': row.rental_id,
+        'tenant_name': row.tenant_name,
+        'amount_owed': float(row.amount_owed or 0),
+        'months': int(row.months),
+        'since': row.since,
+    } for row in rows]
@@ -26,3 +26,35 @@ class Config:
         'pool_recycle': 300,
     }
     PER_PAGE = 10
+
+    # 合同PDF优先使用的中文字体文件，多个路径用系统路径分隔符分隔
+    PDF_FONT_PATHS = [path for path in os.getenv('PDF_FONT_PATHS', '').split(os.pathsep) if path]
+
+    # 列表页每页显示数量
+    LIST_PAGE_SIZE = int(os.getenv('LIST_PAGE_SIZE', 50))
+
+    # 首页统计数据缓存时间（秒）
+    STATS_CACHE_TTL = int(os.getenv('STATS_CACHE_TTL', 60))
+
+    # 合同PDF缓存上限（条目数、总字节数）
+    PDF_CACHE_MAX_ENTRIES = int(os.getenv('PDF_CACHE_MAX_ENTRIES', 256))
+    PDF_CACHE_MAX_BYTES = int(os.getenv('PDF_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+
+    # 批量导出合同PDF时的渲染进程数，0 表示在请求进程内生成
+    PDF_EXPORT_WORKERS = int(os.getenv('PDF_EXPORT_WORKERS', min(4, os.cpu_count() or 1)))
+
+    # 默认水电费单价（合同和楼层均未设置单价时使用）
+    DEFAULT_WATER_RATE = float(os.getenv('DEFAULT_WATER_RATE', 3.5))
+    DEFAULT_ELECTRICITY_RATE = float(os.getenv('DEFAULT_ELECTRICITY_RATE', 1.2))
+
+    # 水电费单价缓存时间（秒），合同或单价表修改时会主动清除
+    RATE_CACHE_TTL = int(os.getenv('RATE_CACHE_TTL', 300))
+
+    # 是否统计每个请求的耗时、SQL 语句数等指标（/metrics 接口和 Server-Timing 响应头）
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1') == '1'
+
+    # 慢查询和 N+1 查询检测：慢查询阈值（毫秒）、同一请求内同一语句重复执行次数阈值、日志文件（为空时只保存在内存）
+    QUERY_PROFILER_ENABLED = os.getenv('QUERY_PROFILER_ENABLED', '1') == '1'
+    SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 200))
+    N_PLUS_ONE_THRESHOLD = int(os.getenv('N_PLUS_ONE_THRESHOLD', 10))
+    QUERY_PROFILER_LOG = os.getenv('QUERY_PROFILER_LOG', 'logs/slow_queries.log')
@@ -0,0 +1,134 @@
+import logging
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from io import RawIOBase
+from types import SimpleNamespace
+from contract_pdf import generate_contract_pdf, register_chinese_font, contract_fingerprint, PDF_FIELDS
+from pdf_cache import pdf_cache
+
+logger = logging.getLogger(__name__)
+
+_pool_lock = threading.Lock()
+_pool = None
+_pool_unavailable = False
+
+
+def _init_worker(font_paths):
+    """子进程启动时注册字体"""
+    register_chinese_font(font_paths)
+
+
+def _render_snapshot(snapshot):
+    """在子进程中根据合同字段快照生成PDF"""
+    return generate_contract_pdf(SimpleNamespace(**snapshot)).getvalue()
+
+
+def contract_snapshot(contract):
+    """提取生成PDF所需的字段，ORM 对象不能跨进程传递"""
+    return {field: getattr(contract, field, None) for field in PDF_FIELDS}
+
+
+def get_render_pool(workers, font_paths=None):
+    """获取合同PDF渲染进程池（首次调用时创建）
+
+    workers 为 0 或当前环境不支持多进程（如部分无服务器平台）时返回 None，由调用方在本进程内生成。
+    """
+    global _pool, _pool_unavailable
+    if workers <= 0 or _pool_unavailable:
+        return None
+    if _pool:
+        return _pool
+
+    with _pool_lock:
+        if _pool or _pool_unavailable:
+            return _pool
+        try:
+            _pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                        initargs=(list(font_paths or []),))
+        except (OSError, NotImplementedError, ImportError) as e:
+            logger.warning(f"无法创建PDF渲染进程池，改为单进程生成: {e}")
+            _pool_unavailable = True
+        return _pool
+
+
+class _ZipChunkBuffer(RawIOBase):
+    """只追加的写缓冲区，ZipFile 写入的数据由生成器按块取走"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _rendered_pdfs(contracts, pool, window):
+    """按合同顺序生成 (合同, PDF数据)
+
+    已缓存的直接使用，其余交给进程池生成；最多提前提交 window 个任务，避免生成结果在内存中堆积。
+    """
+    pending = deque()
+    contracts = iter(contracts)
+
+    def submit(contract):
+        key = (contract.__tablename__, contract.id)
+        etag = contract_fingerprint(contract)
+        result = pdf_cache.get(key, etag)
+        if result is None and pool:
+            result = pool.submit(_render_snapshot, contract_snapshot(contract))
+        pending.append((contract, key, etag, result))
+
+    for contract in contracts:
+        submit(contract)
+        if len(pending) >= window:
+            break
+
+    while pending:
+        contract, key, etag, result = pending.popleft()
+        if result is None:
+            data = generate_contract_pdf(contract).getvalue()
+            pdf_cache.put(key, etag, data)
+        elif isinstance(result, bytes):
+            data = result
+        else:
+            data = result.result()
+            pdf_cache.put(key, etag, data)
+        next_contract = next(contracts, None)
+        if next_contract is not None:
+            submit(next_contract)
+        yield contract, data
+
+
+def stream_contracts_zip(contracts, workers=0, font_paths=None):
+    """逐个生成合同PDF并以ZIP格式分块输出，内存中只保留当前写入的文件
+
+    Args:
+        contracts (list): 合同 ORM 对象列表
+        workers (int): 渲染进程数，0 表示在当前进程内生成
+        font_paths (list): 子进程注册字体时优先尝试的路径
+    """
+    pool = get_render_pool(workers, font_paths)
+    window = max(1, workers) * 2
+    buffer = _ZipChunkBuffer()
+    used_names = set()
+
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for contract, data in _rendered_pdfs(contracts, pool, window):
+            filename = f"合同_{contract.contract_number}_{contract.tenant_name}.pdf"
+            if filename in used_names:
+                filename = f"合同_{contract.contract_number}_{contract.tenant_name}_{contract.id}.pdf"
+            used_names.add(filename)
+            archive.writestr(filename, data)
+            yield buffer.drain()
+    # 写入中央目录
+    yield buffer.drain()
@@ -0,0 +1,325 @@
+import hashlib
+import logging
+import os
+import threading
+from datetime import datetime
+from io import BytesIO
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+
+logger = logging.getLogger(__name__)
+
+# 中文字体候选路径，按顺序尝试（可通过配置 PDF_FONT_PATHS 在前面追加）
+DEFAULT_FONT_PATHS = [
+    # Windows
+    'C:/Windows/Fonts/msyh.ttc',  # 微软雅黑
+    'C:/Windows/Fonts/simsun.ttc',  # 宋体
+    'C:/Windows/Fonts/simhei.ttf',  # 黑体
+    'C:/Windows/Fonts/simkai.ttf',  # 楷体
+    # Linux
+    '/usr/share/fonts/truetype/wqy/wqy-microhei.ttc',  # 文泉驿微米黑
+    '/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc',  # 文泉驿正黑
+    '/usr/share/fonts/wqy-microhei/wqy-microhei.ttc',
+    '/usr/share/fonts/wqy-zenhei/wqy-zenhei.ttc',
+    '/usr/share/fonts/truetype/droid/DroidSansFallbackFull.ttf',
+    '/usr/share/fonts/google-droid/DroidSansFallback.ttf',
+    # macOS
+    '/System/Library/Fonts/STHeiti Light.ttc',
+    '/Library/Fonts/Arial Unicode.ttf',
+]
+
+# 未找到可嵌入的字体时使用 reportlab 内置的 CID 中文字体（由阅读器提供字形）
+CID_FONT_NAME = 'STSong-Light'
+
+_font_lock = threading.Lock()
+_font_name = None
+_styles = None
+
+
+def register_chinese_font(extra_paths=None):
+    """解析并注册中文字体，进程内只执行一次，返回字体名称
+
+    Args:
+        extra_paths (list): 优先尝试的字体文件路径
+    """
+    global _font_name
+    if _font_name:
+        return _font_name
+
+    with _font_lock:
+        if _font_name:
+            return _font_name
+
+        for font_path in list(extra_paths or []) + DEFAULT_FONT_PATHS:
+            if not font_path or not os.path.exists(font_path):
+                continue
+            try:
+                font_name = 'ChineseFont'
+                if font_path.lower().endswith('.ttc'):
+                    pdfmetrics.registerFont(TTFont(font_name, font_path, subfontIndex=0))
+                else:
+                    pdfmetrics.registerFont(TTFont(font_name, font_path))
+                _font_name = font_name
+                logger.info(f"成功注册字体: {font_path}")
+                return _font_name
+            except Exception as e:
+                logger.warning(f"注册字体失败 {font_path}: {e}")
+
+        pdfmetrics.registerFont(UnicodeCIDFont(CID_FONT_NAME))
+        _font_name = CID_FONT_NAME
+        logger.info(f"未找到可嵌入的中文字体，使用内置字体 {CID_FONT_NAME}")
+        return _font_name
+
+
+def init_pdf_fonts(app):
+    """应用启动时注册合同 PDF 使用的字体和样式"""
+    register_chinese_font(app.config.get('PDF_FONT_PATHS'))
+    get_pdf_styles()
+
+
+def get_pdf_styles():
+    """获取合同 PDF 的段落样式和表格样式（首次调用时创建并缓存）"""
+    global _styles
+    if _styles:
+        return _styles
+
+    chinese_font = register_chinese_font()
+    styles = getSampleStyleSheet()
+
+    normal_style = ParagraphStyle(
+        'ChineseNormal',
+        parent=styles['Normal'],
+        fontSize=9,
+        spaceAfter=6,
+        fontName=chinese_font
+    )
+
+    _styles = {
+        'font': chinese_font,
+        'title': ParagraphStyle(
+            'ChineseTitle',
+            parent=styles['Heading1'],
+            fontSize=18,
+            spaceAfter=20,
+            alignment=TA_CENTER,
+            fontName=chinese_font
+        ),
+        'heading': ParagraphStyle(
+            'ChineseHeading',
+            parent=styles['Heading2'],
+            fontSize=12,
+            spaceAfter=10,
+            spaceBefore=15,
+            fontName=chinese_font
+        ),
+        'normal': normal_style,
+        'footer': ParagraphStyle(
+            'ChineseFooter',
+            parent=normal_style,
+            alignment=TA_CENTER,
+            fontSize=8
+        ),
+        # 信息表格通用样式：第1、3列为灰底标签列
+        'info_table': [
+            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+            ('BACKGROUND', (2, 0), (2, -1), colors.lightgrey),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, -1), chinese_font),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 6),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+            ('TOPPADDING', (0, 0), (-1, -1), 4),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+        ],
+        'signature_table': TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, -1), chinese_font),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 8),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 8),
+            ('TOPPADDING', (0, 0), (-1, -1), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ]),
+    }
+    return _styles
+
+
+def _info_table(data, extra_commands=None):
+    """创建四列信息表格"""
+    styles = get_pdf_styles()
+    table = Table(data, colWidths=[70, 110, 70, 110])
+    table.setStyle(TableStyle(styles['info_table'] + list(extra_commands or [])))
+    return table
+
+
+def generate_contract_pdf(contract):
+    """生成支持中文的合同PDF内容"""
+
+    # 创建内存缓冲区
+    buffer = BytesIO()
+
+    styles = get_pdf_styles()
+    title_style = styles['title']
+    heading_style = styles['heading']
+    normal_style = styles['normal']
+
+    # 创建PDF文档
+    doc = SimpleDocTemplate(buffer, pagesize=A4,
+                            topMargin=60, bottomMargin=60,
+                            leftMargin=60, rightMargin=60)
+
+    # 安全的日期格式化函数
+    def safe_date_format(date_obj):
+        if date_obj is None:
+            return '____年____月____日'
+        if hasattr(date_obj, 'strftime'):
+            return date_obj.strftime('%Y年%m月%d日')
+        else:
+            return str(date_obj)
+
+    # 状态文本映射
+    status_map = {1: '有效', 2: '失效'}
+    utilities_map = {1: '包含', 2: '不包含'}
+
+    # 构建内容
+    story = []
+
+    # 标题
+    story.append(Paragraph("房屋租赁合同", title_style))
+    story.append(Paragraph(f"合同编号：{contract.contract_number}", normal_style))
+    story.append(Spacer(1, 20))
+
+    # 一、合同基本信息
+    story.append(Paragraph("一、合同基本信息", heading_style))
+    basic_data = [
+        ['合同编号', str(contract.contract_number), '房间号', str(contract.room_number)],
+        ['月租金', f'¥{contract.monthly_rent:.2f}', '押金', f'¥{contract.deposit:.2f}'],
+        ['合同状态', status_map.get(contract.contract_status, '未知'),
+         '付款方式', str(contract.payment_method or '按月付款')]
+    ]
+    story.append(_info_table(basic_data))
+    story.append(Spacer(1, 12))
+
+    # 二、租客信息
+    story.append(Paragraph("二、租客信息", heading_style))
+    tenant_data = [
+        ['租客姓名', str(contract.tenant_name), '联系电话', str(contract.tenant_phone or '未填写')],
+        ['身份证号', str(contract.tenant_id_card or '未填写'), '', '']
+    ]
+    story.append(_info_table(tenant_data, [('SPAN', (1, 1), (3, 1))]))  # 合并身份证号的单元格
+    story.append(Spacer(1, 12))
+
+    # 三、房东信息
+    story.append(Paragraph("三、房东信息", heading_style))
+    landlord_data = [
+        ['房东姓名', str(contract.landlord_name or '未填写'),
+         '联系电话', str(contract.landlord_phone or '未填写')]
+    ]
+    story.append(_info_table(landlord_data))
+    story.append(Spacer(1, 12))
+
+    # 四、合同期限
+    story.append(Paragraph("四、合同期限", heading_style))
+    period_data = [
+        ['合同开始', safe_date_format(contract.contract_start_date),
+         '合同结束', safe_date_format(contract.contract_end_date)],
+        ['租期时长', f'{contract.contract_duration or 12}个月',
+         '租金到期', safe_date_format(contract.rent_due_date)]
+    ]
+    story.append(_info_table(period_data))
+    story.append(Spacer(1, 12))
+
+    # 五、费用信息
+    story.append(Paragraph("五、费用信息", heading_style))
+    fee_data = [
+        ['水电费', utilities_map.get(contract.utilities_included, '未知'),
+         '水费单价', f'¥{contract.water_rate:.2f}/吨'],
+        ['电费单价', f'¥{contract.electricity_rate:.2f}/度', '', '']
+    ]
+    story.append(_info_table(fee_data))
+    story.append(Spacer(1, 12))
+
+    # 六、合同条款
+    story.append(Paragraph("六、合同条款", heading_style))
+
+    # 处理合同条款文本
+    terms_lines = []
+    terms_lines.append("1. 基本条款：")
+    terms_lines.append(str(contract.contract_terms or '按照国家相关法律法规执行，双方应遵守合同约定。'))
+    terms_lines.append("")
+    terms_lines.append("2. 特殊约定：")
+    terms_lines.append(str(contract.special_agreement or '无特殊约定。'))
+    terms_lines.append("")
+    terms_lines.append("3. 备注说明：")
+    terms_lines.append(str(contract.remarks or '无备注。'))
+
+    for line in terms_lines:
+        if line.strip():
+            story.append(Paragraph(line, normal_style))
+        else:
+            story.append(Spacer(1, 6))
+
+    story.append(Spacer(1, 20))
+
+    # 签名区域
+    signature_data = [
+        ['甲方（房东）', '乙方（租客）'],
+        ['', ''],
+        ['', ''],
+        ['签名：______________', '签名：______________'],
+        [f'签署日期：{safe_date_format(contract.created_at.date() if contract.created_at else None)}',
+         f'签署日期：{safe_date_format(contract.created_at.date() if contract.created_at else None)}']
+    ]
+    signature_table = Table(signature_data, colWidths=[180, 180])
+    signature_table.setStyle(styles['signature_table'])
+    story.append(signature_table)
+    story.append(Spacer(1, 15))
+
+    # 页脚
+    footer_lines = [
+        "本合同一式两份，甲乙双方各执一份，具有同等法律效力。",
+        f"合同生成时间：{datetime.now().strftime('%Y年%m月%d日 %H:%M:%S')}"
+    ]
+
+    for line in footer_lines:
+        story.append(Paragraph(line, styles['footer']))
+
+    # 构建PDF
+    doc.build(story)
+
+    # 返回缓冲区
+    buffer.seek(0)
+    return buffer
+
+
+# 合同PDF版式版本号，修改版式时递增，使已缓存的PDF全部失效
+PDF_LAYOUT_VERSION = 1
+
+# 生成合同PDF时使用的字段
+PDF_FIELDS = (
+    'id', 'contract_number', 'room_number', 'tenant_name', 'tenant_phone', 'tenant_id_card',
+    'landlord_name', 'landlord_phone', 'monthly_rent', 'deposit', 'contract_start_date',
+    'contract_end_date', 'contract_duration', 'payment_method', 'rent_due_date', 'contract_status',
+    'utilities_included', 'water_rate', 'electricity_rate', 'contract_terms', 'special_agreement',
+    'remarks', 'created_at',
+)
+
+
+def contract_fingerprint(contract):
+    """根据合同表名、版式版本和PDF使用的字段计算内容哈希，用作缓存键和 ETag"""
+    digest = hashlib.sha256()
+    digest.update(f'{contract.__tablename__}:{PDF_LAYOUT_VERSION}'.encode('utf-8'))
+    for field in PDF_FIELDS:
+        digest.update(b'\x1f')
+        digest.update(str(getattr(contract, field, None)).encode('utf-8'))
+    return digest.hexdigest()[:32]
@@ -0,0 +1,214 @@
+from datetime import datetime, timedelta
+from sqlalchemy import select, func, case, and_, or_, true
+from models import db, FLOOR_MODELS, Rental, Bill
+from billing import BILL_PAID, current_period, get_room_arrears
+
+
+def _is_postgresql():
+    """当前数据库是否为 PostgreSQL"""
+    return db.engine.dialect.name == 'postgresql'
+
+
+def count_if(condition):
+    """条件计数：PostgreSQL 使用 COUNT(*) FILTER，其它数据库使用 CASE 表达式"""
+    if _is_postgresql():
+        return func.count().filter(condition)
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def sum_if(column, condition):
+    """条件求和：PostgreSQL 使用 SUM(...) FILTER，其它数据库使用 CASE 表达式"""
+    if _is_postgresql():
+        return func.coalesce(func.sum(column).filter(condition), 0)
+    return func.coalesce(func.sum(case((condition, column), else_=0)), 0)
+
+
+def get_dashboard_stats(floor='old'):
+    """获取楼层首页统计数据
+
+    所有计数与金额汇总在数据库端一次聚合完成，不再把整表数据加载到 Python 中求和。
+    Args:
+        floor (str): 'old' 表示五楼，'new' 表示六楼
+    """
+    models = FLOOR_MODELS[floor]
+    ContactsModel = models['contacts']
+    RentalModel = models['rental']
+    RecordsModel = models['records']
+    RoomsModel = models['rooms']
+    BillsModel = models['bills']
+
+    # 每张表各自聚合为一行，再合并为一条 SELECT 发送到数据库
+    contacts_agg = select(
+        func.count().label('total_contacts')
+    ).select_from(ContactsModel).subquery()
+
+    rooms_agg = select(
+        func.count().label('total_rooms'),
+        count_if(RoomsModel.room_status == 2).label('rented_rooms'),  # 已出租
+        count_if(RoomsModel.room_status == 1).label('vacant_rooms'),  # 空闲
+    ).select_from(RoomsModel).subquery()
+
+    rental_agg = select(
+        func.count().label('total_rental')
+    ).select_from(RentalModel).subquery()
+
+    records_agg = select(
+        func.count().label('total_records')
+    ).select_from(RecordsModel).subquery()
+
+    # 本月收入（当前账期账单的已缴金额），已缴金额先计入租金，超出租金的部分计入水电费
+    paid_rent = case((BillsModel.amount_paid >= BillsModel.rent, BillsModel.rent), else_=BillsModel.amount_paid)
+    income_agg = select(
+        func.coalesce(func.sum(paid_rent), 0).label('monthly_income'),
+        func.coalesce(func.sum(BillsModel.amount_paid - paid_rent), 0).label('utilities_income'),
+        func.coalesce(func.sum(BillsModel.amount_due), 0).label('monthly_due'),
+    ).where(BillsModel.period == current_period()).subquery()
+
+    row = db.session.execute(
+        select(contacts_agg, rooms_agg, rental_agg, records_agg, income_agg).select_from(
+            contacts_agg.join(rooms_agg, true())
+            .join(rental_agg, true())
+            .join(records_agg, true())
+            .join(income_agg, true())
+        )
+    ).mappings().one()
+
+    # 欠费房间（按房间和租房记录汇总所有账期未结清的账单）
+    unpaid_room_details = [{
+        'room_number': arrears['room_number'],
+        'rental_id': arrears['rental_id'],
+        'tenant_name': arrears['tenant_name'],
+        'total_due': arrears['amount_owed'],
+        'months': arrears['months']
+    } for arrears in get_room_arrears(floor)]
+
+    return {
+        'total_contacts': row['total_contacts'],
+        'total_rental': row['total_rental'],
+        'total_records': row['total_records'],
+        'total_rooms': row['total_rooms'],
+        'rented_rooms': int(row['rented_rooms']),
+        'vacant_rooms': int(row['vacant_rooms']),
+        'unpaid_rooms': len(unpaid_room_details),
+        'unpaid_room_details': unpaid_room_details,
+        'arrears_amount': sum((item['total_due'] for item in unpaid_room_details), 0.0),
+        'monthly_income': float(row['monthly_income'] or 0),
+        'utilities_income': float(row['utilities_income'] or 0),
+        'monthly_due': float(row['monthly_due'] or 0),
+    }
+
+
+def get_room_stats(floor='old'):
+    """房间列表页的状态统计"""
+    RoomsModel = FLOOR_MODELS[floor]['rooms']
+    row = db.session.execute(select(
+        func.count().label('total_rooms'),
+        count_if(RoomsModel.room_status == 1).label('available_rooms'),
+        count_if(RoomsModel.room_status == 2).label('occupied_rooms'),
+        count_if(RoomsModel.room_status == 3).label('maintenance_rooms'),
+        count_if(RoomsModel.room_status == 4).label('disabled_rooms'),
+    ).select_from(RoomsModel)).mappings().one()
+    return {key: int(value) for key, value in row.items()}
+
+
+def get_rental_stats(floor='old'):
+    """租房管理列表页的统计"""
+    RentalModel = FLOOR_MODELS[floor]['rental']
+    row = db.session.execute(select(
+        func.count().label('total_rental'),
+        count_if(RentalModel.check_out_date.is_(None)).label('checked_in'),
+        count_if(RentalModel.payment_status == 1).label('paid'),
+        count_if(RentalModel.payment_status == 2).label('unpaid'),
+    ).select_from(RentalModel)).mappings().one()
+    return {key: int(value) for key, value in row.items()}
+
+
+def get_rental_info_stats(floor='old'):
+    """租房信息列表页的统计"""
+    InfoModel = FLOOR_MODELS[floor]['rental_info']
+    row = db.session.execute(select(
+        func.count().label('total_info'),
+        count_if(InfoModel.rental_status == 1).label('paid'),
+        count_if(InfoModel.rental_status == 2).label('unpaid'),
+        func.coalesce(func.sum(InfoModel.deposit), 0).label('total_deposit'),
+    ).select_from(InfoModel)).mappings().one()
+    return {
+        'total_info': int(row['total_info']),
+        'paid': int(row['paid']),
+        'unpaid': int(row['unpaid']),
+        'total_deposit': float(row['total_deposit'] or 0)
+    }
+
+
+def get_contract_stats(floor='old'):
+    """合同列表页的统计
+
+    有效合同按到期天数划分：超过30天为有效，30天内为即将到期，已到期和失效合同计为过期。
+    """
+    ContractsModel = FLOOR_MODELS[floor]['contracts']
+    today = datetime.now().date()
+    threshold = today + timedelta(days=30)
+    is_active = ContractsModel.contract_status == 1
+    end_date = ContractsModel.contract_end_date
+    row = db.session.execute(select(
+        func.count().label('total_contracts'),
+        count_if(and_(is_active, or_(end_date.is_(None), end_date > threshold))).label('active_contracts'),
+        count_if(and_(is_active, end_date > today, end_date <= threshold)).label('expiring_contracts'),
+    ).select_from(ContractsModel)).mappings().one()
+    total = int(row['total_contracts'])
+    active = int(row['active_contracts'])
+    expiring = int(row['expiring_contracts'])
+    return {
+        'total_contracts': total,
+        'active_contracts': active,
+        'expiring_contracts': expiring,
+        'expired_contracts': total - active - expiring
+    }
+
+
+def get_records_stats(floor='old'):
+    """缴费记录列表页的统计"""
+    RecordsModel = FLOOR_MODELS[floor]['records']
+    row = db.session.execute(select(
+        func.count().label('total_records'),
+        func.coalesce(func.sum(RecordsModel.total_rent), 0).label('total_amount'),
+        func.count(func.distinct(RecordsModel.room_number)).label('room_count'),
+    ).select_from(RecordsModel)).mappings().one()
+    total = int(row['total_records'])
+    amount = float(row['total_amount'] or 0)
+    return {
+        'total_records': total,
+        'total_amount': amount,
+        'room_count': int(row['room_count']),
+        'average_amount': amount / total if total else 0.0
+    }
+
+
+def get_floor_summary():
+    """各楼层租金汇总：在合并表上按 floor 分组，一次查询得到所有楼层的数据
+
+    欠费与本月收入读取账单表：欠费为所有账期未结清的金额，本月收入为当前账期账单的已缴金额。
+    """
+    rental_rows = db.session.execute(select(
+        Rental.floor,
+        func.count().label('total_rental'),
+    ).group_by(Rental.floor)).all()
+    not_paid = Bill.status != BILL_PAID
+    bill_rows = db.session.execute(select(
+        Bill.floor,
+        func.count(func.distinct(case((not_paid, Bill.room_number)))).label('unpaid_rooms'),
+        sum_if(Bill.amount_due - Bill.amount_paid, not_paid).label('unpaid_amount'),
+        sum_if(Bill.amount_paid, Bill.period == current_period()).label('monthly_income'),
+    ).group_by(Bill.floor)).mappings().all()
+
+    summary = {floor: {'total_rental': 0, 'unpaid_rooms': 0, 'unpaid_amount': 0.0, 'monthly_income': 0.0}
+               for floor in FLOOR_MODELS}
+    for row in rental_rows:
+        summary[row.floor]['total_rental'] = int(row.total_rental)
+    for row in bill_rows:
+        summary[row['floor']].update({
+            'unpaid_rooms': int(row['unpaid_rooms']),
+            'unpaid_amount': float(row['unpaid_amount'] or 0),
+            'monthly_income': float(row['monthly_income'] or 0),
+        })
+    return summary
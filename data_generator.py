@@ -0,0 +1,451 @@
+import io
+import random
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+import click
+from sqlalchemy import select, delete, func, text
+from models import db, FLOOR_MODELS, UtilityRate, SearchEntry, BillingRollover
+from billing import BILL_PAID, BILL_UNPAID, current_period
+from search import rebuild_search_index
+from rent_collection import FLOOR_NAMES
+from migrations import run_migrations
+
+FLOOR_DIGITS = {'old': '5', 'new': '6'}
+
+SURNAMES = '王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗郑梁谢宋唐许韩冯邓曹彭曾肖田董袁潘于蒋蔡余杜叶程苏魏吕丁任沈姚卢姜崔钟谭陆汪范金石廖贾夏韦方白邹孟熊秦邱江尹薛段雷侯龙史陶黎贺顾毛郝龚邵万钱严武戴莫孔汤'
+GIVEN_NAMES = '伟芳娜敏静丽强磊军洋勇艳杰娟涛明超霞平刚华玉萍红玲芬燕彬鹏辉浩宇欣怡涵轩萱晨阳思远博文斌琳婷雪慧建国志'
+
+# 房型及月租金范围
+ROOM_TYPES = (('单间', 800, 1200), ('一室一厅', 1200, 1800), ('两室一厅', 1800, 2600))
+LANDLORD = ('李明', '13900000000')
+
+# 全局单价（生成数据的起始账期生效）；楼层单价在生成区间的中间调整
+GLOBAL_RATES = (3.5, 1.2)
+FLOOR_RATES = (4.0, 1.3)
+
+# 按楼层删除数据时的顺序（房间最后删除）
+FLOOR_TABLES = ('bills', 'meter_readings', 'records', 'rental', 'rental_info', 'contracts', 'contacts', 'rooms')
+
+
+def _add_months(period, months):
+    index = period.year * 12 + period.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _month_end(period):
+    return _add_months(period, 1) - timedelta(days=1)
+
+
+# SQLite 上日期、时间按 SQLAlchemy 的存储格式写入
+_SQLITE_CONVERTERS = (
+    (db.DateTime, lambda value: value.isoformat(' ', 'microseconds')),
+    (db.Date, date.isoformat),
+)
+
+
+def _copy_value(value):
+    """PostgreSQL COPY 文本格式的字段值"""
+    if value is None:
+        return '\\N'
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+class BulkWriter:
+    """按数据表缓冲生成的数据行，攒满一批后批量写入
+
+    PostgreSQL（psycopg2）上使用 COPY，SQLite 上直接调用驱动的 executemany（跳过逐行的参数编译），
+    其它数据库使用 SQLAlchemy 的 executemany。主键ID由生成器分配，
+    便于账单等数据直接引用租房记录；写入完成后同步 PostgreSQL 的自增序列。
+    """
+
+    def __init__(self, connection, batch_size=20000):
+        self.connection = connection
+        self.batch_size = batch_size
+        self.counts = Counter()
+        self._buffers = {}
+        self._next_ids = {}
+        self._use_copy = connection.dialect.name == 'postgresql' and connection.dialect.driver == 'psycopg2'
+        self._use_driver = connection.dialect.name == 'sqlite'
+
+    def next_id(self, table):
+        if table.name not in self._next_ids:
+            current = self.connection.execute(select(func.max(table.c.id))).scalar()
+            self._next_ids[table.name] = (current or 0) + 1
+        row_id = self._next_ids[table.name]
+        self._next_ids[table.name] += 1
+        return row_id
+
+    def add(self, table, row):
+        buffer = self._buffers.setdefault(table, [])
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self._write(table, buffer)
+            buffer.clear()
+
+    def flush(self, table=None):
+        """写入缓冲中的数据行，table 为空时写入全部数据表"""
+        for buffered_table, buffer in self._buffers.items():
+            if buffer and table in (None, buffered_table):
+                self._write(buffered_table, buffer)
+                buffer.clear()
+
+    def finish(self):
+        """写入全部剩余数据并同步自增序列"""
+        self.flush()
+        if self.connection.dialect.name == 'postgresql':
+            for name in self._next_ids:
+                self.connection.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), (SELECT MAX(id) FROM {name}))"
+                ))
+
+    def _write(self, table, rows):
+        if self._use_copy:
+            columns = list(rows[0])
+            data = io.StringIO()
+            for row in rows:
+                data.write('\t'.join(_copy_value(row[column]) for column in columns))
+                data.write('\n')
+            data.seek(0)
+            quoted = ', '.join(f'"{column}"' for column in columns)
+            cursor = self.connection.connection.cursor()
+            cursor.copy_expert(f'COPY {table.name} ({quoted}) FROM STDIN', data)
+            cursor.close()
+        elif self._use_driver:
+            columns = list(rows[0])
+            converters = [(index, converter) for index, column in enumerate(columns)
+                          for column_type, converter in _SQLITE_CONVERTERS if isinstance(table.c[column].type, column_type)]
+            values = []
+            for row in rows:
+                row_values = list(row.values())
+                for index, convert in converters:
+                    if row_values[index] is not None:
+                        row_values[index] = convert(row_values[index])
+                values.append(row_values)
+            quoted = ', '.join(f'"{column}"' for column in columns)
+            statement = f'INSERT INTO {table.name} ({quoted}) VALUES ({", ".join("?" * len(columns))})'
+            cursor = self.connection.connection.cursor()
+            cursor.executemany(statement, values)
+            cursor.close()
+        else:
+            self.connection.execute(table.insert(), rows)
+        self.counts[table.name] += len(rows)
+
+
+class DataGenerator:
+    """生成各楼层一致的模拟数据：房间、租客、合同、租房记录、抄表记录、月度账单和缴费记录
+
+    每个房间按月模拟租住情况：租客入住后按合同期（默认12个月）续约，合同到期时按 churn 概率退租，
+    租住期间每月按 turnover 概率提前退租，退租后空置0-2个月再入住新租客。每月生成抄表读数和账单，
+    已缴费账单生成对应的缴费记录；在租租客最近3个月的账单按 arrears 概率欠费。
+    同一 seed 生成的数据相同。
+    """
+
+    def __init__(self, writer, rooms_per_floor=50, years=3, churn=0.3, turnover=0.01, arrears=0.05,
+                 contract_months=12, seed=None):
+        self.writer = writer
+        self.rooms_per_floor = rooms_per_floor
+        self.years = years
+        self.churn = churn
+        self.turnover = turnover
+        self.arrears = arrears
+        self.contract_months = contract_months
+        self.rng = random.Random(seed)
+        self.today = datetime.now().date()
+        self.end_period = current_period()
+        self.start_period = _add_months(self.end_period, -(years * 12 - 1))
+        self.periods = [_add_months(self.start_period, offset) for offset in range(years * 12)]
+        self.rate_change = self.periods[len(self.periods) // 2]
+
+    # 基础数据
+
+    def _name(self):
+        return self.rng.choice(SURNAMES) + ''.join(self.rng.choice(GIVEN_NAMES) for _ in range(self.rng.choice((1, 2))))
+
+    def _phone(self):
+        return '1' + self.rng.choice('3578') + ''.join(self.rng.choice('0123456789') for _ in range(9))
+
+    def _id_card(self):
+        birthday = date(1960, 1, 1) + timedelta(days=self.rng.randrange(365 * 45))
+        return (f'{self.rng.randrange(110000, 660000)}{birthday:%Y%m%d}'
+                f'{self.rng.randrange(1000):03d}{self.rng.choice("0123456789X")}')
+
+    def _moment(self, day, hour=None):
+        """某天内的随机时间"""
+        hour = 8 + int(self.rng.random() * 12) if hour is None else hour
+        return datetime(day.year, day.month, day.day, hour, int(self.rng.random() * 60))
+
+    def _rates(self, period):
+        return FLOOR_RATES if period >= self.rate_change else GLOBAL_RATES
+
+    def generate_rates(self, floor):
+        table = UtilityRate.__table__
+        writer = self.writer
+        writer.add(table, {
+            'id': writer.next_id(table), 'floor': floor, 'water_rate': FLOOR_RATES[0],
+            'electricity_rate': FLOOR_RATES[1], 'effective_from': self.rate_change,
+            'remarks': '模拟数据：楼层单价调整', 'created_at': self._moment(self.rate_change)
+        })
+
+    def generate_global_rates(self):
+        table = UtilityRate.__table__
+        self.writer.add(table, {
+            'id': self.writer.next_id(table), 'floor': None, 'water_rate': GLOBAL_RATES[0],
+            'electricity_rate': GLOBAL_RATES[1], 'effective_from': self.start_period,
+            'remarks': '模拟数据：全局单价', 'created_at': self._moment(self.start_period)
+        })
+
+    # 楼层数据
+
+    def generate_floor(self, floor):
+        models = FLOOR_MODELS[floor]
+        tables = {key: models[key].__table__ for key in FLOOR_TABLES}
+        width = max(2, len(str(self.rooms_per_floor)))
+        digit = FLOOR_DIGITS[floor]
+
+        rooms = []
+        for index in range(1, self.rooms_per_floor + 1):
+            room_type, low, high = self.rng.choice(ROOM_TYPES)
+            base_rent = float(self.rng.randrange(low, high + 1, 50))
+            rooms.append({
+                'id': self.writer.next_id(tables['rooms']), 'floor': floor,
+                'room_number': f'{digit}{index:0{width}d}', 'room_type': room_type,
+                'base_rent': base_rent, 'deposit': base_rent,
+                'room_status': 1, 'water_meter_number': f'W{digit}{index:05d}',
+                'electricity_meter_number': f'E{digit}{index:05d}',
+                'created_at': self._moment(self.start_period), 'updated_at': self._moment(self.start_period)
+            })
+
+        # 先模拟各房间的租住情况以确定房间状态，房间须在引用它的数据之前写入
+        tenancies = {room['id']: self._simulate_room() for room in rooms}
+        for room in rooms:
+            occupied = any(end is None for _, end in tenancies[room['id']])
+            room['room_status'] = 2 if occupied else (3 if self.rng.random() < 0.02 else 1)
+            self.writer.add(tables['rooms'], room)
+        self.writer.flush(tables['rooms'])
+
+        for room in rooms:
+            self._generate_room(floor, tables, room, tenancies[room['id']])
+
+        # 每个账期的结转记录，结转的租房记录数为该账期在租的租客数
+        occupied = Counter(month for room_tenancies in tenancies.values() for start, end in room_tenancies
+                           for month in range(start, len(self.periods) if end is None else end + 1))
+        rollovers = BillingRollover.__table__
+        for month, period in enumerate(self.periods):
+            self.writer.add(rollovers, {
+                'id': self.writer.next_id(rollovers), 'floor': floor, 'period': period,
+                'rental_count': occupied[month], 'created_at': datetime.combine(period, datetime.min.time())
+            })
+
+    def _simulate_room(self):
+        """模拟房间的租住区间，返回 [(入住账期序号, 退租账期序号或 None)]"""
+        tenancies = []
+        month = 0 if self.rng.random() < 0.85 else self.rng.randrange(1, 4)
+        while month < len(self.periods):
+            start = month
+            while True:
+                month += 1
+                if month >= len(self.periods):
+                    tenancies.append((start, None))
+                    return tenancies
+                at_term_end = (month - start) % self.contract_months == 0
+                if (at_term_end and self.rng.random() < self.churn) or self.rng.random() < self.turnover:
+                    tenancies.append((start, month - 1))
+                    break
+            month += self.rng.choice((0, 0, 0, 1, 1, 2))
+        return tenancies
+
+    def _generate_room(self, floor, tables, room, tenancies):
+        writer = self.writer
+        room_number = room['room_number']
+        water_reading = self.rng.randrange(0, 500) + 0.0
+        electricity_reading = self.rng.randrange(0, 5000) + 0.0
+        occupants_by_tenancy = {}
+        tenancy_by_month = {}
+        for tenancy in tenancies:
+            start, end = tenancy
+            for month in range(start, len(self.periods) if end is None else end + 1):
+                tenancy_by_month[month] = tenancy
+
+        usage_by_month = {}
+        for month, period in enumerate(self.periods):
+            occupied = month in tenancy_by_month
+            water_usage = 0.0
+            if occupied:
+                occupants = occupants_by_tenancy.setdefault(tenancy_by_month[month], self.rng.randint(1, 3))
+                water_usage = round(self.rng.uniform(2, 6) * occupants, 2)
+            electricity_usage = round(self.rng.uniform(60, 260), 2) if occupied else round(self.rng.uniform(0, 3), 2)
+            water_reading = round(water_reading + water_usage, 2)
+            electricity_reading = round(electricity_reading + electricity_usage, 2)
+            read_on = min(_month_end(period), self.today)
+            for meter_type, meter_number, reading, usage in (
+                ('water', room['water_meter_number'], water_reading, water_usage),
+                ('electricity', room['electricity_meter_number'], electricity_reading, electricity_usage),
+            ):
+                writer.add(tables['meter_readings'], {
+                    'id': writer.next_id(tables['meter_readings']), 'floor': floor, 'room_number': room_number,
+                    'meter_type': meter_type, 'meter_number': meter_number, 'period': period, 'reading': reading,
+                    'usage': usage if month else None, 'read_on': read_on, 'created_at': self._moment(read_on)
+                })
+            usage_by_month[month] = (water_usage, electricity_usage)
+
+        for tenancy in tenancies:
+            self._generate_tenancy(floor, tables, room, tenancy, usage_by_month,
+                                   occupants_by_tenancy.get(tenancy, 1))
+
+    def _generate_tenancy(self, floor, tables, room, tenancy, usage_by_month, occupants):
+        writer = self.writer
+        start, end = tenancy
+        active = end is None
+        last = len(self.periods) - 1 if active else end
+        room_number = room['room_number']
+        tenant_name = self._name()
+        phone = self._phone()
+        id_card = self._id_card()
+        check_in = self.periods[start] + timedelta(days=self.rng.randrange(0, 10))
+        check_in = min(check_in, self.today)
+        check_out = None if active else _month_end(self.periods[end])
+        rent = room['base_rent']
+
+        # 每个合同期一份合同，续约时租金上调
+        term_start = start
+        contract_start = contract_end = None
+        while term_start <= last:
+            term_end = term_start + self.contract_months - 1
+            contract_start = self.periods[term_start] if term_start > start else check_in
+            contract_end = _month_end(self.periods[term_end]) if term_end < len(self.periods) else \
+                _month_end(_add_months(self.periods[term_start], self.contract_months - 1))
+            current_term = active and term_end >= last
+            writer.add(tables['contracts'], {
+                'id': writer.next_id(tables['contracts']), 'floor': floor,
+                'contract_number': f'HT{room_number}{self.periods[term_start]:%Y%m}',
+                'room_number': room_number, 'room_id': room['id'], 'tenant_name': tenant_name,
+                'tenant_phone': phone, 'tenant_id_card': id_card, 'landlord_name': LANDLORD[0],
+                'landlord_phone': LANDLORD[1], 'monthly_rent': rent, 'deposit': room['deposit'],
+                'contract_start_date': contract_start, 'contract_end_date': contract_end,
+                'contract_duration': self.contract_months, 'payment_method': '月付', 'rent_due_date': None,
+                'contract_status': 1 if current_term else 2, 'utilities_included': 2,
+                'water_rate': 0.0, 'electricity_rate': 0.0, 'contract_terms': None, 'special_agreement': None,
+                'remarks': None, 'created_at': self._moment(contract_start), 'updated_at': self._moment(contract_start)
+            })
+            if term_end >= last:
+                break
+            term_start = term_end + 1
+            rent = float(round(rent * 1.03 / 10) * 10)
+
+        rental_id = writer.next_id(tables['rental'])
+        writer.add(tables['contacts'], {
+            'id': writer.next_id(tables['contacts']), 'floor': floor, 'name': tenant_name, 'roomId': room_number,
+            'room_id': room['id'], 'phone': phone, 'id_card': id_card, 'created_at': self._moment(check_in)
+        })
+
+        current_paid = True
+        last_fees = (0.0, 0.0, 0.0, 0.0)
+        for month in range(start, last + 1):
+            period = self.periods[month]
+            water_rate, electricity_rate = self._rates(period)
+            water_usage, electricity_usage = usage_by_month[month]
+            water_fee = round(water_usage * water_rate, 2)
+            electricity_fee = round(electricity_usage * electricity_rate, 2)
+            amount_due = round(rent + water_fee + electricity_fee, 2)
+            unpaid = active and month > last - 3 and self.rng.random() < self.arrears
+            paid_at = None
+            if not unpaid:
+                paid_on = min(period + timedelta(days=self.rng.randrange(0, 10)), self.today)
+                paid_at = self._moment(paid_on)
+                writer.add(tables['records'], {
+                    'id': writer.next_id(tables['records']), 'floor': floor, 'room_number': room_number,
+                    'room_id': room['id'], 'tenant_name': tenant_name, 'total_rent': amount_due,
+                    'payment_date': paid_on, 'created_at': paid_at
+                })
+            writer.add(tables['bills'], {
+                'id': writer.next_id(tables['bills']), 'floor': floor, 'rental_id': rental_id,
+                'room_number': room_number, 'tenant_name': tenant_name, 'period': period, 'rent': rent,
+                'water_fee': water_fee, 'electricity_fee': electricity_fee, 'amount_due': amount_due,
+                'amount_paid': 0.0 if unpaid else amount_due, 'status': BILL_UNPAID if unpaid else BILL_PAID,
+                'paid_at': paid_at, 'created_at': self._moment(period, hour=0),
+                'updated_at': paid_at or self._moment(period, hour=0)
+            })
+            if month == last:
+                current_paid = not unpaid
+                last_fees = (water_usage, electricity_usage, water_fee, electricity_fee)
+
+        water_usage, electricity_usage, water_fee, electricity_fee = last_fees
+        payment_status = 1 if current_paid else 2
+        updated_at = self._moment(min(self.periods[last] + timedelta(days=9), self.today))
+        writer.add(tables['rental'], {
+            'id': rental_id, 'floor': floor, 'room_number': room_number, 'room_id': room['id'],
+            'tenant_name': tenant_name, 'deposit': room['deposit'], 'monthly_rent': rent,
+            'water_fee': water_fee, 'electricity_fee': electricity_fee, 'water_usage': water_usage,
+            'electricity_usage': electricity_usage, 'utilities_fee': round(water_fee + electricity_fee, 2),
+            'total_due': round(rent + water_fee + electricity_fee, 2), 'payment_status': payment_status,
+            'check_in_date': check_in, 'check_out_date': check_out, 'contract_start_date': contract_start,
+            'contract_end_date': contract_end, 'remarks': None, 'created_at': self._moment(check_in),
+            'updated_at': updated_at
+        })
+        if active:
+            writer.add(tables['rental_info'], {
+                'id': writer.next_id(tables['rental_info']), 'floor': floor, 'room_number': room_number,
+                'room_id': room['id'], 'tenant_name': tenant_name, 'phone': phone, 'deposit': room['deposit'],
+                'occupant_count': occupants, 'check_in_date': check_in, 'rental_status': payment_status,
+                'remarks': None, 'created_at': self._moment(check_in), 'updated_at': updated_at
+            })
+
+
+def clear_floor_data(connection, floor):
+    """删除楼层的全部业务数据（含楼层单价、结转记录和搜索索引）"""
+    for key in FLOOR_TABLES:
+        table = FLOOR_MODELS[floor][key].__table__
+        connection.execute(delete(table).where(table.c.floor == floor))
+    connection.execute(delete(UtilityRate.__table__).where(UtilityRate.__table__.c.floor == floor))
+    connection.execute(delete(BillingRollover.__table__).where(BillingRollover.__table__.c.floor == floor))
+    connection.execute(delete(SearchEntry.__table__).where(SearchEntry.__table__.c.floor == floor))
+
+
+def register_generator_commands(app):
+    """注册模拟数据命令：flask generate-data"""
+
+    @app.cli.command('generate-data')
+    @click.option('--floor', type=click.Choice(['old', 'new', 'all']), default='all', help='生成数据的楼层')
+    @click.option('--rooms-per-floor', type=click.IntRange(1), default=50, show_default=True, help='每层房间数')
+    @click.option('--years', type=click.IntRange(1), default=3, show_default=True, help='生成的月度数据年数（截至当月）')
+    @click.option('--churn', type=click.FloatRange(0, 1), default=0.3, show_default=True, help='合同到期退租的概率')
+    @click.option('--turnover', type=click.FloatRange(0, 1), default=0.01, show_default=True, help='每月提前退租的概率')
+    @click.option('--arrears', type=click.FloatRange(0, 1), default=0.05, show_default=True, help='近3个月账单欠费的概率')
+    @click.option('--seed', type=int, default=None, help='随机种子，相同种子生成相同数据')
+    @click.option('--reset', is_flag=True, help='先删除所选楼层的已有数据')
+    def generate_data_command(floor, rooms_per_floor, years, churn, turnover, arrears, seed, reset):
+        """生成模拟数据（房间、租客、合同、租房记录、抄表记录、账单、缴费记录），用于性能测试
+
+        生成速度：SQLite 上每 100 万条数据约 25~35 秒（--rooms-per-floor 2000 --years 5 约 100 万条），
+        大部分时间花在 Python 端生成数据行和转换日期格式，数据库写入约占三分之一。
+        """
+        floors = list(FLOOR_MODELS) if floor == 'all' else [floor]
+        run_migrations()
+        started = time.perf_counter()
+        with db.engine.begin() as connection:
+            for name in floors:
+                rooms = FLOOR_MODELS[name]['rooms'].__table__
+                has_rooms = connection.execute(select(rooms.c.id).where(rooms.c.floor == name).limit(1)).first()
+                if has_rooms and not reset:
+                    raise click.ClickException(f'{FLOOR_NAMES[name]}已有数据，使用 --reset 删除后重新生成')
+                clear_floor_data(connection, name)
+
+            writer = BulkWriter(connection)
+            generator = DataGenerator(writer, rooms_per_floor=rooms_per_floor, years=years, churn=churn,
+                                      turnover=turnover, arrears=arrears, seed=seed)
+            global_rates = UtilityRate.__table__
+            if not connection.execute(select(global_rates.c.id).where(global_rates.c.floor.is_(None)).limit(1)).first():
+                generator.generate_global_rates()
+            for name in floors:
+                generator.generate_rates(name)
+                generator.generate_floor(name)
+            writer.finish()
+            generated = time.perf_counter()
+            indexed = rebuild_search_index(connection)
+
+        for table_name, count in sorted(writer.counts.items()):
+            click.echo(f"  {table_name}: {count} 条")
+        click.echo(f"  search_index: {indexed} 条（重建）")
+        click.echo(f"共生成 {sum(writer.counts.values())} 条数据，写入耗时 {generated - started:.1f} 秒，"
+                   f"总耗时 {time.perf_counter() - started:.1f} 秒")
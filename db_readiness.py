@@ -0,0 +1,78 @@
+import threading
+import time
+from sqlalchemy import text
+
+
+class SchemaReadiness:
+    """进程级数据库就绪状态
+
+    状态流转：unknown -> ready，或 unknown -> failed -> (退避等待后重试) -> ready/failed。
+    进入 ready 后不再访问数据库；检查失败时按指数退避安排下一次重试，
+    在退避期间的请求直接跳过检查。检查只执行查询，不会执行建表等 DDL。
+    """
+
+    UNKNOWN = 'unknown'
+    READY = 'ready'
+    FAILED = 'failed'
+
+    def __init__(self, probe_table='admin', initial_backoff=1.0, max_backoff=60.0):
+        self.probe_table = probe_table
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.state = self.UNKNOWN
+        self.failures = 0
+        self.last_error = None
+        self._next_retry_at = 0.0
+        self._lock = threading.Lock()
+
+    def mark_ready(self):
+        """启动阶段建表成功后直接标记为就绪"""
+        with self._lock:
+            self.state = self.READY
+            self.failures = 0
+            self.last_error = None
+
+    def _mark_failed(self, error):
+        self.state = self.FAILED
+        self.failures += 1
+        self.last_error = str(error)
+        backoff = min(self.initial_backoff * (2 ** (self.failures - 1)), self.max_backoff)
+        self._next_retry_at = time.monotonic() + backoff
+
+    def check(self, db):
+        """检查数据库连接和表结构是否可用，返回是否就绪"""
+        if self.state == self.READY:
+            return True
+        if self.state == self.FAILED and time.monotonic() < self._next_retry_at:
+            return False
+
+        # 同一时间只允许一个请求执行检查，其它请求不等待
+        if not self._lock.acquire(blocking=False):
+            return self.state == self.READY
+        try:
+            if self.state == self.READY:
+                return True
+            try:
+                db.session.execute(text(f'SELECT 1 FROM {self.probe_table} LIMIT 1'))
+                self.state = self.READY
+                self.failures = 0
+                self.last_error = None
+            except Exception as e:
+                db.session.rollback()
+                self._mark_failed(e)
+            return self.state == self.READY
+        finally:
+            self._lock.release()
+
+    def info(self):
+        """返回当前就绪状态"""
+        return {
+            'state': self.state,
+            'failures': self.failures,
+            'last_error': self.last_error,
+            'retry_in': max(0.0, round(self._next_retry_at - time.monotonic(), 2))
+            if self.state == self.FAILED else 0.0
+        }
+
+
+schema_readiness = SchemaReadiness()
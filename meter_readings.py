@@ -0,0 +1,272 @@
+import csv
+import io
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import select, update, delete, insert, func, and_, or_
+from models import db, FLOOR_MODELS
+from billing import BILL_PAID, current_period, bill_status, _money
+from rates import rate_resolver
+
+# 导入文件的列名，中英文表头均可
+COLUMN_ALIASES = {
+    'meter_number': ('meter_number', '表号'),
+    'reading': ('reading', '读数', '本期读数'),
+    'read_on': ('read_on', '抄表日期'),
+}
+
+
+def iter_csv_rows(stream):
+    """逐行读取上传的 CSV 文件，生成 (行号, 行数据)，不把整个文件读入内存"""
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+    for line_no, row in enumerate(reader, start=2):
+        yield line_no, row
+
+
+def iter_json_rows(data):
+    """读取 JSON 格式的抄表数据：读数列表，或包含 readings 列表的对象"""
+    if isinstance(data, dict):
+        data = data.get('readings', [])
+    for line_no, row in enumerate(data or [], start=1):
+        yield line_no, row if isinstance(row, dict) else {}
+
+
+def _field(row, name):
+    for alias in COLUMN_ALIASES[name]:
+        value = row.get(alias)
+        if isinstance(value, str):
+            value = value.strip()
+        if value not in (None, ''):
+            return value
+    return None
+
+
+def build_meter_index(floor):
+    """一次查询楼层所有房间，建立 表号 -> (房号, 表类型) 的内存索引"""
+    RoomsModel = FLOOR_MODELS[floor]['rooms']
+    index = {}
+    rows = db.session.execute(
+        select(RoomsModel.room_number, RoomsModel.water_meter_number, RoomsModel.electricity_meter_number)
+    ).all()
+    for room_number, water_meter, electricity_meter in rows:
+        if water_meter:
+            index[water_meter.strip()] = (room_number, 'water')
+        if electricity_meter:
+            index[electricity_meter.strip()] = (room_number, 'electricity')
+    return index
+
+
+def _previous_readings(floor, meter_numbers, period):
+    """查询各表在指定账期之前最近一次的读数"""
+    ReadingsModel = FLOOR_MODELS[floor]['meter_readings']
+    latest = select(
+        ReadingsModel.meter_number, func.max(ReadingsModel.period).label('period')
+    ).where(
+        ReadingsModel.meter_number.in_(meter_numbers), ReadingsModel.period < period
+    ).group_by(ReadingsModel.meter_number).subquery()
+    rows = db.session.execute(
+        select(ReadingsModel.meter_number, ReadingsModel.reading).join(
+            latest, and_(ReadingsModel.meter_number == latest.c.meter_number,
+                         ReadingsModel.period == latest.c.period)
+        )
+    ).all()
+    return {meter_number: reading for meter_number, reading in rows}
+
+
+def import_meter_readings(floor, rows, period=None):
+    """批量导入抄表读数，并更新对应房间的水电费
+
+    按表号匹配房间，与上期读数相减得到本期用量，写入抄表记录；随后按用量重新计算该账期账单的水电费和
+    应缴金额，导入当前账期时同时更新在租记录。同一账期重复导入时覆盖之前的读数。全部在同一事务中提交。
+
+    Args:
+        floor (str): 楼层，'old' 或 'new'
+        rows: (行号, 行数据) 的可迭代对象，行数据包含表号、读数，可选抄表日期
+        period (date): 账期（当月1日），默认当前账期
+
+    Returns:
+        dict: 导入条数、更新的租房记录数和账单数、未匹配的表号和出错的行
+    """
+    ReadingsModel = FLOOR_MODELS[floor]['meter_readings']
+    period = period or current_period()
+    today = datetime.now().date()
+
+    index = build_meter_index(floor)
+    readings = {}
+    unmatched = []
+    errors = []
+    for line_no, row in rows:
+        meter_number = _field(row, 'meter_number')
+        if meter_number is None:
+            errors.append({'line': line_no, 'message': '缺少表号'})
+            continue
+        meter_number = str(meter_number)
+        if meter_number not in index:
+            unmatched.append(meter_number)
+            continue
+        try:
+            reading = Decimal(str(_field(row, 'reading'))).quantize(Decimal('0.01'))
+        except (InvalidOperation, ValueError):
+            errors.append({'line': line_no, 'message': f'表号 {meter_number} 的读数无效'})
+            continue
+        read_on = _field(row, 'read_on')
+        try:
+            read_on = datetime.strptime(str(read_on), '%Y-%m-%d').date() if read_on else today
+        except ValueError:
+            errors.append({'line': line_no, 'message': f'表号 {meter_number} 的抄表日期格式不正确'})
+            continue
+        readings[meter_number] = (line_no, reading, read_on)  # 同一表号出现多次时以最后一行为准
+
+    previous = _previous_readings(floor, list(readings), period) if readings else {}
+    new_rows = []
+    room_usage = {}
+    for meter_number, (line_no, reading, read_on) in readings.items():
+        room_number, meter_type = index[meter_number]
+        usage = None
+        if meter_number in previous:
+            usage = reading - previous[meter_number]
+            if usage < 0:
+                errors.append({'line': line_no, 'message': f'表号 {meter_number} 的读数小于上期读数'})
+                continue
+            room_usage.setdefault(room_number, {})[meter_type] = usage
+        new_rows.append({
+            'room_number': room_number, 'meter_type': meter_type, 'meter_number': meter_number,
+            'period': period, 'reading': reading, 'usage': usage, 'read_on': read_on,
+            'created_at': datetime.now()
+        })
+
+    if not new_rows:
+        db.session.rollback()
+        return {'imported': 0, 'rentals_updated': 0, 'bills_updated': 0, 'unmatched': unmatched, 'errors': errors}
+
+    db.session.execute(
+        delete(ReadingsModel).where(ReadingsModel.period == period,
+                                    ReadingsModel.meter_number.in_([row['meter_number'] for row in new_rows]))
+    )
+    db.session.execute(insert(ReadingsModel), new_rows)
+
+    rentals_updated, bills_updated = _apply_usage(floor, room_usage, period) if room_usage else (0, 0)
+    db.session.commit()
+    return {'imported': len(new_rows), 'rentals_updated': rentals_updated, 'bills_updated': bills_updated,
+            'unmatched': unmatched, 'errors': errors}
+
+
+def _apply_usage(floor, room_usage, period):
+    """按本期用量批量更新水电费，返回 (更新的租房记录数, 更新的账单数)
+
+    当前账期更新在租记录的水电费并同步该账期的账单；以前的账期只更新该账期的账单，
+    租房记录保存的是当前账期的数据，不受影响。单价按房间在账期内的适用单价计算（见 rates.RateResolver）。
+    """
+    if period != current_period():
+        return 0, _apply_usage_to_bills(floor, room_usage, period)
+
+    RentalModel = FLOOR_MODELS[floor]['rental']
+    BillsModel = FLOOR_MODELS[floor]['bills']
+    period_rentals = db.session.execute(
+        select(RentalModel.id, RentalModel.room_number, RentalModel.monthly_rent, RentalModel.payment_status,
+               RentalModel.water_usage, RentalModel.electricity_usage)
+        .where(RentalModel.room_number.in_(list(room_usage)),
+               or_(RentalModel.check_out_date.is_(None), RentalModel.check_out_date >= period))
+    ).all()
+    if not period_rentals:
+        return 0, 0
+
+    now = datetime.now()
+    rental_params = {}
+    for rental in period_rentals:
+        usage = room_usage[rental.room_number]
+        water_usage = usage.get('water', _money(rental.water_usage))
+        electricity_usage = usage.get('electricity', _money(rental.electricity_usage))
+        water_rate, electricity_rate = rate_resolver.resolve(floor, rental.room_number, period)
+        water_fee = _money(water_usage * water_rate)
+        electricity_fee = _money(electricity_usage * electricity_rate)
+        rental_params[rental.id] = {
+            'id': rental.id,
+            'water_usage': water_usage,
+            'electricity_usage': electricity_usage,
+            'water_fee': water_fee,
+            'electricity_fee': electricity_fee,
+            'utilities_fee': water_fee + electricity_fee,
+            'total_due': _money(rental.monthly_rent) + water_fee + electricity_fee,
+            'payment_status': rental.payment_status,
+            'updated_at': now
+        }
+
+    # 账单的已缴金额不变，应缴金额增加后已结清的账单改为部分缴费，租房记录缴费状态随之更新
+    bills = db.session.execute(
+        select(BillsModel.id, BillsModel.rental_id, BillsModel.rent, BillsModel.amount_paid)
+        .where(BillsModel.rental_id.in_(list(rental_params)), BillsModel.period == period)
+    ).all()
+    bill_params = []
+    for bill in bills:
+        params = rental_params[bill.rental_id]
+        amount_due = _money(bill.rent) + params['utilities_fee']
+        status = bill_status(amount_due, _money(bill.amount_paid))
+        params['payment_status'] = 1 if status == BILL_PAID else 2
+        bill_params.append({
+            'id': bill.id,
+            'water_fee': params['water_fee'],
+            'electricity_fee': params['electricity_fee'],
+            'amount_due': amount_due,
+            'status': status,
+            'updated_at': now
+        })
+
+    db.session.execute(update(RentalModel), list(rental_params.values()))
+    if bill_params:
+        db.session.execute(update(BillsModel), bill_params)
+    return len(rental_params), len(bill_params)
+
+
+def _apply_usage_to_bills(floor, room_usage, period):
+    """按用量批量更新以前账期的账单，返回更新的账单数
+
+    只导入了水表或电表时，另一项费用沿用账单中已有的金额。已缴金额不变，账单状态按新的应缴金额重新计算。
+    """
+    BillsModel = FLOOR_MODELS[floor]['bills']
+    bills = db.session.execute(
+        select(BillsModel.id, BillsModel.room_number, BillsModel.rent, BillsModel.water_fee,
+               BillsModel.electricity_fee, BillsModel.amount_paid)
+        .where(BillsModel.room_number.in_(list(room_usage)), BillsModel.period == period)
+    ).all()
+    if not bills:
+        return 0
+
+    now = datetime.now()
+    bill_params = []
+    for bill in bills:
+        usage = room_usage[bill.room_number]
+        water_rate, electricity_rate = rate_resolver.resolve(floor, bill.room_number, period)
+        water_fee = _money(usage['water'] * water_rate) if 'water' in usage else _money(bill.water_fee)
+        electricity_fee = (_money(usage['electricity'] * electricity_rate) if 'electricity' in usage
+                           else _money(bill.electricity_fee))
+        amount_due = _money(bill.rent) + water_fee + electricity_fee
+        bill_params.append({
+            'id': bill.id,
+            'water_fee': water_fee,
+            'electricity_fee': electricity_fee,
+            'amount_due': amount_due,
+            'status': bill_status(amount_due, _money(bill.amount_paid)),
+            'updated_at': now
+        })
+    db.session.execute(update(BillsModel), bill_params)
+    return len(bill_params)
+
+
+def get_meter_history(floor, room_number, limit=24):
+    """查询房间最近的抄表记录，按账期从新到旧排列"""
+    ReadingsModel = FLOOR_MODELS[floor]['meter_readings']
+    rows = db.session.execute(
+        select(ReadingsModel.meter_type, ReadingsModel.meter_number, ReadingsModel.period,
+               ReadingsModel.reading, ReadingsModel.usage, ReadingsModel.read_on)
+        .where(ReadingsModel.room_number == room_number)
+        .order_by(ReadingsModel.period.desc(), ReadingsModel.meter_type)
+        .limit(limit)
+    ).all()
+    return [{
+        'meter_type': row.meter_type,
+        'meter_number': row.meter_number,
+        'period': row.period.strftime('%Y-%m'),
+        'reading': float(row.reading),
+        'usage': float(row.usage) if row.usage is not None else None,
+        'read_on': row.read_on.strftime('%Y-%m-%d') if row.read_on else ''
+    } for row in rows]
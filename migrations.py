@@ -0,0 +1,219 @@
+from datetime import datetime
+import click
+from sqlalchemy import inspect, select, update, func, literal, case, and_, text, Table, MetaData
+from models import db, SchemaMigration, FLOOR_MODELS, ROOM_LINKED_MODELS, Room, Rental, Bill, MeterReading, \
+    UtilityRate, SearchEntry, BillingRollover
+from billing import BILL_PAID, BILL_UNPAID, current_period
+from search import rebuild_search_index
+
+# 合并前按楼层分表存储的数据表（FLOOR_MODELS 中的键）
+LEGACY_FLOOR_TABLES = ('contacts', 'rental', 'records', 'rooms', 'contracts', 'rental_info')
+
+
+def _create_model_indexes(connection):
+    """为已有数据库补建模型中声明的索引（已存在的索引跳过）"""
+    inspector = inspect(connection)
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        columns = {column['name'] for column in inspector.get_columns(table.name)}
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            # 索引列由后续迁移添加时，索引随该迁移创建
+            if index.name not in existing and all(column.name in columns for column in index.columns):
+                index.create(connection)
+                click.echo(f"  创建索引 {index.name}")
+
+
+def _unify_floor_tables(connection):
+    """将各楼层的旧表（如 rental_old、rental_new）数据复制到按 floor 列区分楼层的合并表
+
+    合并表中已有某楼层数据时跳过该楼层，可重复执行；记录ID由合并表重新分配。
+    旧表保留不删除，核对数据无误后可手动删除。
+    """
+    inspector = inspect(connection)
+    unified_tables = {models[name].__table__ for models in FLOOR_MODELS.values() for name in LEGACY_FLOOR_TABLES}
+    db.metadata.create_all(connection, tables=sorted(unified_tables, key=lambda table: table.name))
+
+    legacy_metadata = MetaData()
+    for name in LEGACY_FLOOR_TABLES:
+        for floor, models in FLOOR_MODELS.items():
+            table = models[name].__table__
+            legacy_name = f'{table.name}_{floor}'
+            if not inspector.has_table(legacy_name):
+                continue
+            existing = connection.execute(
+                select(func.count()).select_from(table).where(table.c.floor == floor)
+            ).scalar()
+            if existing:
+                continue
+
+            legacy = Table(legacy_name, legacy_metadata, autoload_with=connection)
+            columns = [column.name for column in table.columns
+                       if column.name not in ('id', 'floor') and column.name in legacy.c]
+            connection.execute(table.insert().from_select(
+                ['floor'] + columns,
+                select(literal(floor), *[legacy.c[column] for column in columns]).order_by(legacy.c.id)
+            ))
+            copied = connection.execute(
+                select(func.count()).select_from(table).where(table.c.floor == floor)
+            ).scalar()
+            click.echo(f"  {legacy_name} -> {table.name}: {copied} 条")
+
+
+def _create_bills(connection):
+    """创建账单表，并为还没有当前账期账单的租房记录补建账单
+
+    已缴费的租房记录生成已结清账单，其余生成未缴费账单；可重复执行。
+    """
+    Bill.__table__.create(connection, checkfirst=True)
+    period = current_period()
+    now = datetime.now()
+    is_paid = Rental.payment_status == 1
+    missing = ~select(Bill.id).where(and_(Bill.rental_id == Rental.id, Bill.period == period)).exists()
+    result = connection.execute(Bill.__table__.insert().from_select(
+        ['floor', 'rental_id', 'room_number', 'tenant_name', 'period', 'rent', 'water_fee',
+         'electricity_fee', 'amount_due', 'amount_paid', 'status', 'paid_at', 'created_at', 'updated_at'],
+        select(
+            Rental.floor, Rental.id, Rental.room_number, Rental.tenant_name, literal(period),
+            func.coalesce(Rental.monthly_rent, 0), func.coalesce(Rental.water_fee, 0),
+            func.coalesce(Rental.electricity_fee, 0), func.coalesce(Rental.total_due, 0),
+            case((is_paid, func.coalesce(Rental.total_due, 0)), else_=0),
+            case((is_paid, BILL_PAID), (func.coalesce(Rental.total_due, 0) <= 0, BILL_PAID), else_=BILL_UNPAID),
+            case((is_paid, Rental.updated_at), else_=None),
+            literal(now), literal(now)
+        ).where(missing).order_by(Rental.id)
+    ))
+    click.echo(f"  补建 {period:%Y-%m} 账期账单: {result.rowcount} 条")
+
+
+def _create_meter_readings(connection):
+    """创建抄表记录表"""
+    MeterReading.__table__.create(connection, checkfirst=True)
+
+
+def _create_utility_rates(connection):
+    """创建水电费单价表"""
+    UtilityRate.__table__.create(connection, checkfirst=True)
+
+
+def _create_search_index(connection):
+    """创建全局搜索索引表（含 pg_trgm 索引或 FTS5 影子表）并建立索引"""
+    SearchEntry.__table__.create(connection, checkfirst=True)
+    count = rebuild_search_index(connection)
+    click.echo(f"  建立搜索索引: {count} 条")
+
+
+def _add_room_foreign_keys(connection):
+    """为联系人、租房记录、缴费记录、合同、租户信息添加 room_id 外键，按楼层和房号回填并建索引
+
+    找不到对应房间的数据 room_id 保持为空，迁移输出其条数以便核对。
+    """
+    inspector = inspect(connection)
+    rooms = Room.__table__
+    for model, room_column in ROOM_LINKED_MODELS:
+        table = model.__table__
+        if 'room_id' not in {column['name'] for column in inspector.get_columns(table.name)}:
+            connection.execute(text(
+                f'ALTER TABLE {table.name} ADD COLUMN room_id INTEGER REFERENCES rooms(id) ON DELETE SET NULL'
+            ))
+
+        room_id = select(rooms.c.id).where(
+            rooms.c.floor == table.c.floor, rooms.c.room_number == table.c[room_column]
+        ).order_by(rooms.c.id).limit(1).scalar_subquery()
+        linked = connection.execute(
+            update(table).where(table.c.room_id.is_(None)).values(room_id=room_id)
+        ).rowcount
+        orphans = connection.execute(
+            select(func.count()).select_from(table).where(table.c.room_id.is_(None))
+        ).scalar()
+
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing and 'room_id' in index.columns:
+                index.create(connection)
+        click.echo(f"  {table.name}: 关联房间 {linked - orphans} 条，未找到房间 {orphans} 条")
+
+
+def _create_billing_rollovers(connection):
+    """创建月初结转记录表，已有账单的楼层、账期（不晚于当前账期）视为已结转并补建结转记录"""
+    BillingRollover.__table__.create(connection, checkfirst=True)
+    rollovers = BillingRollover.__table__
+    recorded = select(rollovers.c.id).where(
+        rollovers.c.floor == Bill.floor, rollovers.c.period == Bill.period
+    ).exists()
+    result = connection.execute(rollovers.insert().from_select(
+        ['floor', 'period', 'rental_count', 'created_at'],
+        select(Bill.floor, Bill.period, func.count(), func.min(Bill.created_at))
+        .where(Bill.period <= current_period(), ~recorded)
+        .group_by(Bill.floor, Bill.period)
+        .order_by(Bill.floor, Bill.period)
+    ))
+    click.echo(f"  补建结转记录: {result.rowcount} 条")
+
+
+# 迁移版本列表：(版本号, 说明, 执行函数)，执行函数接收数据库连接且须可重复执行
+MIGRATIONS = [
+    (1, '为状态、日期、电话、合同编号等高频筛选列添加索引', _create_model_indexes),
+    (2, '五楼、六楼数据表合并为按 floor 列区分楼层的同一张表', _unify_floor_tables),
+    (3, '新增按月账单表，根据租房记录补建当前账期账单', _create_bills),
+    (4, '新增水电表抄表记录表', _create_meter_readings),
+    (5, '新增水电费单价表', _create_utility_rates),
+    (6, '新增租户、房间、电话的全局搜索索引', _create_search_index),
+    (7, '联系人、租房记录、缴费记录、合同、租户信息按 room_id 外键关联房间', _add_room_foreign_keys),
+    (8, '搜索索引新增短关键词前缀匹配索引', _create_model_indexes),
+    (9, '新增月初结转记录表，按已有账单补建结转记录', _create_billing_rollovers),
+]
+
+
+def applied_versions():
+    """查询已执行的迁移版本"""
+    return {row.version for row in SchemaMigration.query.all()}
+
+
+def pending_versions():
+    """查询未执行的迁移版本"""
+    SchemaMigration.__table__.create(db.engine, checkfirst=True)
+    done = applied_versions()
+    return [version for version, _, _ in MIGRATIONS if version not in done]
+
+
+def run_migrations(target=None):
+    """按版本顺序执行未执行的迁移，每个版本在独立事务中执行"""
+    SchemaMigration.__table__.create(db.engine, checkfirst=True)
+    done = applied_versions()
+    applied = []
+    for version, description, migrate in MIGRATIONS:
+        if version in done or (target is not None and version > target):
+            continue
+        click.echo(f"执行迁移 {version}: {description}")
+        with db.engine.begin() as connection:
+            migrate(connection)
+            connection.execute(SchemaMigration.__table__.insert().values(
+                version=version, description=description, applied_at=datetime.utcnow()
+            ))
+        applied.append(version)
+    return applied
+
+
+def register_migration_commands(app):
+    """注册数据库迁移命令：flask migrate"""
+
+    @app.cli.command('migrate')
+    @click.option('--status', is_flag=True, help='只显示迁移执行情况')
+    @click.option('--target', type=int, default=None, help='执行到指定版本')
+    def migrate_command(status, target):
+        """执行数据库迁移"""
+        if status:
+            SchemaMigration.__table__.create(db.engine, checkfirst=True)
+            done = applied_versions()
+            for version, description, _ in MIGRATIONS:
+                mark = '已执行' if version in done else '未执行'
+                click.echo(f"{version:>4}  [{mark}]  {description}")
+            return
+
+        applied = run_migrations(target)
+        if applied:
+            click.echo(f"迁移完成，共执行 {len(applied)} 个版本")
+        else:
+            click.echo("数据库已是最新版本")
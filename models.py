@@ -1,37 +1,77 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
 from werkzeug.security import generate_password_hash, check_password_hash
 
 db = SQLAlchemy()
 
 
-class ContactsOld(db.Model):
-    __tablename__ = 'contacts_old'
+def find_room_ids(connection, keys):
+    """按 (楼层, 房号) 批量查找房间ID（一次查询），返回 {(楼层, 房号): 房间ID}，找不到的房间不在结果中"""
+    keys = {(floor, room_number) for floor, room_number in keys if room_number}
+    if not keys:
+        return {}
+    rooms = Room.__table__
+    rows = connection.execute(
+        select(rooms.c.id, rooms.c.floor, rooms.c.room_number)
+        .where(rooms.c.floor.in_({floor for floor, _ in keys}),
+               rooms.c.room_number.in_({room_number for _, room_number in keys}))
+        .order_by(rooms.c.id.desc())
+    ).all()
+    # 同楼层房号重复时取ID最小的房间
+    return {(row.floor, row.room_number): row.id for row in rows if (row.floor, row.room_number) in keys}
+
+
+class Contact(db.Model):
+    """联系人（各楼层共用一张表，按 floor 列区分楼层）"""
+    __tablename__ = 'contacts'
+    __table_args__ = (
+        db.Index('idx_contacts_floor_room', 'floor', 'roomId'),
+        db.Index('idx_contacts_floor_phone', 'floor', 'phone'),
+        db.Index('idx_contacts_room_id', 'room_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True, comment='主键ID')
+    floor = db.Column(db.String(10), nullable=False, comment='楼层：old=五楼, new=六楼')
     name = db.Column(db.String(50), nullable=False, comment='姓名')
     roomId = db.Column(db.String(20), nullable=False, comment='房间ID')
+    room_id = db.Column(db.Integer, db.ForeignKey('rooms.id', ondelete='SET NULL'), nullable=True,
+                        comment='房间表主键')
     phone = db.Column(db.String(20), nullable=False, comment='电话')
     id_card = db.Column(db.String(18), nullable=False, comment='身份证号')
     created_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, comment='创建时间')
 
+    __mapper_args__ = {'polymorphic_on': floor}
 
-class ContactsNew(db.Model):
-    __tablename__ = 'contacts_new'
 
-    id = db.Column(db.Integer, primary_key=True, autoincrement=True, comment='主键ID')
-    name = db.Column(db.String(50), nullable=False, comment='姓名')
-    roomId = db.Column(db.String(20), nullable=False, comment='房间ID')
-    phone = db.Column(db.String(20), nullable=False, comment='电话')
-    id_card = db.Column(db.String(18), nullable=False, comment='身份证号')
-    created_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, comment='创建时间')
+class ContactsOld(Contact):
+    """五楼联系人"""
+    __mapper_args__ = {'polymorphic_identity': 'old'}
+
 
+class ContactsNew(Contact):
+    """六楼联系人"""
+    __mapper_args__ = {'polymorphic_identity': 'new'}
 
-class RentalOld(db.Model):
-    __tablename__ = 'rental_old'
+
+class Rental(db.Model):
+    """租房管理记录（各楼层共用一张表，按 floor 列区分楼层）"""
+    __tablename__ = 'rental'
+    __table_args__ = (
+        db.Index('idx_rental_floor_room', 'floor', 'room_number'),
+        db.Index('idx_rental_floor_created', 'floor', 'created_at'),
+        db.Index('idx_rental_room_id', 'room_id'),
+        # 未缴费租房记录的部分索引（首页统计和待办事项）
+        db.Index('idx_rental_floor_unpaid', 'floor', 'room_number',
+                 postgresql_where=db.text('payment_status = 2'), sqlite_where=db.text('payment_status = 2')),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True, comment='主键ID')
+    floor = db.Column(db.String(10), nullable=False, comment='楼层：old=五楼, new=六楼')
     room_number = db.Column(db.String(50), nullable=False, comment='房号')
+    room_id = db.Column(db.Integer, db.ForeignKey('rooms.id', ondelete='SET NULL'), nullable=True,
+                        comment='房间表主键')
     tenant_name = db.Column(db.String(50), nullable=False, comment='租客姓名')
     deposit = db.Column(db.Numeric(10, 2), nullable=False, default=0.00, comment='押金')
     monthly_rent = db.Column(db.Numeric(10, 2), nullable=False, default=0.00, comment='月租金')
@@ -50,57 +90,62 @@ class RentalOld(db.Model):
     created_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, comment='创建时间')
     updated_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow, comment='更新时间')
 
+    __mapper_args__ = {'polymorphic_on': floor}
 
-class RentalNew(db.Model):
-    __tablename__ = 'rental_new'
 
-    id = db.Column(db.Integer, primary_key=True, autoincrement=True, comment='主键ID')
-    room_number = db.Column(db.String(50), nullable=False, comment='房号')
-    tenant_name = db.Column(db.String(50), nullable=False, comment='租客姓名')
-    deposit = db.Column(db.Numeric(10, 2), nullable=False, default=0.00, comment='押金')
-    monthly_rent = db.Column(db.Numeric(10, 2), nullable=False, default=0.00, comment='月租金')
-    water_fee = db.Column(db.Numeric(10, 2), nullable=True, default=0.00, comment='水费')
-    electricity_fee = db.Column(db.Numeric(10, 2), nullable=True, default=0.00, comment='电费')
-    water_usage = db.Column(db.Numeric(10, 2), nullable=True, default=0.00, comment='用水量(方)')
-    electricity_usage = db.Column(db.Numeric(10, 2), nullable=True, default=0.00, comment='用电量(度)')
-    utilities_fee = db.Column(db.Numeric(10, 2), nullable=True, default=0.00, comment='水电费')
-    total_due = db.Column(db.Numeric(10, 2), nullable=True, default=0.00, comment='应缴费')
-    payment_status = db.Column(db.SmallInteger, nullable=False, default=1, comment='租赁状态：1=已缴费, 2=未缴费')
-    check_in_date = db.Column(db.Date, nullable=True, comment='入住时间')
-    check_out_date = db.Column(db.Date, nullable=True, comment='退房时间')
-    contract_start_date = db.Column(db.Date, nullable=True, comment='合同开始时间')
-    contract_end_date = db.Column(db.Date, nullable=True, comment='合同结束时间')
-    remarks = db.Column(db.Text, nullable=True, comment='备注')
-    created_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, comment='创建时间')
-    updated_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow, comment='更新时间')
+class RentalOld(Rental):
+    """五楼租房管理记录"""
+    __mapper_args__ = {'polymorphic_identity': 'old'}
 
 
-class RentalRecordsOld(db.Model):
-    __tablename__ = 'rental_records_old'
+class RentalNew(Rental):
+    """六楼租房管理记录"""
+    __mapper_args__ = {'polymorphic_identity': 'new'}
+
+
+class RentalRecord(db.Model):
+    """缴费记录（各楼层共用一张表，按 floor 列区分楼层）"""
+    __tablename__ = 'rental_records'
+    __table_args__ = (
+        db.Index('idx_rental_records_floor_room', 'floor', 'room_number'),
+        db.Index('idx_rental_records_floor_payment_date', 'floor', 'payment_date'),
+        db.Index('idx_rental_records_floor_created', 'floor', 'created_at'),
+        db.Index('idx_rental_records_room_id', 'room_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True, comment='主键ID')
+    floor = db.Column(db.String(10), nullable=False, comment='楼层：old=五楼, new=六楼')
     room_number = db.Column(db.String(50), nullable=False, comment='房号')
+    room_id = db.Column(db.Integer, db.ForeignKey('rooms.id', ondelete='SET NULL'), nullable=True,
+                        comment='房间表主键')
     tenant_name = db.Column(db.String(50), nullable=False, comment='租客姓名')
     total_rent = db.Column(db.Numeric(10, 2), nullable=False, default=0.00, comment='总租金')
     payment_date = db.Column(db.Date, nullable=True, comment='缴费日期')
     created_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, comment='创建时间')
 
+    __mapper_args__ = {'polymorphic_on': floor}
 
-class RentalRecordsNew(db.Model):
-    __tablename__ = 'rental_records_new'
 
-    id = db.Column(db.Integer, primary_key=True, autoincrement=True, comment='主键ID')
-    room_number = db.Column(db.String(50), nullable=False, comment='房号')
-    tenant_name = db.Column(db.String(50), nullable=False, comment='租客姓名')
-    total_rent = db.Column(db.Numeric(10, 2), nullable=False, default=0.00, comment='总租金')
-    payment_date = db.Column(db.Date, nullable=True, comment='缴费日期')
-    created_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, comment='创建时间')
+class RentalRecordsOld(RentalRecord):
+    """五楼缴费记录"""
+    __mapper_args__ = {'polymorphic_identity': 'old'}
+
 
+class RentalRecordsNew(RentalRecord):
+    """六楼缴费记录"""
+    __mapper_args__ = {'polymorphic_identity': 'new'}
 
-class RoomsNew(db.Model):
-    __tablename__ = 'rooms_new'
+
+class Room(db.Model):
+    """房间（各楼层共用一张表，按 floor 列区分楼层）"""
+    __tablename__ = 'rooms'
+    __table_args__ = (
+        db.Index('idx_rooms_floor_room', 'floor', 'room_number'),
+        db.Index('idx_rooms_floor_status', 'floor', 'room_status'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True, comment='主键ID')
+    floor = db.Column(db.String(10), nullable=False, comment='楼层：old=五楼, new=六楼')
     room_number = db.Column(db.String(50), nullable=False, comment='房号')
     room_type = db.Column(db.String(50), nullable=False, comment='房型')
     deposit = db.Column(db.Numeric(10, 2), nullable=False, default=0.00, comment='押金')
@@ -111,28 +156,36 @@ class RoomsNew(db.Model):
     created_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, comment='创建时间')
     updated_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow, comment='更新时间')
 
+    __mapper_args__ = {'polymorphic_on': floor}
 
-class RoomsOld(db.Model):
-    __tablename__ = 'rooms_old'
 
-    id = db.Column(db.Integer, primary_key=True, autoincrement=True, comment='主键ID')
-    room_number = db.Column(db.String(50), nullable=False, comment='房号')
-    room_type = db.Column(db.String(50), nullable=False, comment='房型')
-    deposit = db.Column(db.Numeric(10, 2), nullable=False, default=0.00, comment='押金')
-    base_rent = db.Column(db.Numeric(10, 2), nullable=False, default=0.00, comment='基础租金')
-    room_status = db.Column(db.SmallInteger, nullable=False, default=1, comment='房间状态：1=空闲, 2=已出租, 3=维修中, 4=停用')
-    water_meter_number = db.Column(db.String(50), nullable=False, comment='水表编号')
-    electricity_meter_number = db.Column(db.String(50), nullable=False, comment='电表编号')
-    created_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, comment='创建时间')
-    updated_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow, comment='更新时间')
+class RoomsOld(Room):
+    """五楼房间"""
+    __mapper_args__ = {'polymorphic_identity': 'old'}
+
 
+class RoomsNew(Room):
+    """六楼房间"""
+    __mapper_args__ = {'polymorphic_identity': 'new'}
 
-class ContractsNew(db.Model):
-    __tablename__ = 'contracts_new'
+
+class Contract(db.Model):
+    """合同（各楼层共用一张表，按 floor 列区分楼层）"""
+    __tablename__ = 'contracts'
+    __table_args__ = (
+        db.Index('idx_contracts_floor_room', 'floor', 'room_number'),
+        db.Index('idx_contracts_floor_number', 'floor', 'contract_number'),
+        db.Index('idx_contracts_room_id', 'room_id'),
+        # 有效合同按到期日期查询（合同到期提醒）
+        db.Index('idx_contracts_floor_status_end', 'floor', 'contract_status', 'contract_end_date'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True, comment='主键ID')
+    floor = db.Column(db.String(10), nullable=False, comment='楼层：old=五楼, new=六楼')
     contract_number = db.Column(db.String(50), nullable=False, comment='合同编号')
     room_number = db.Column(db.String(50), nullable=False, comment='房号')
+    room_id = db.Column(db.Integer, db.ForeignKey('rooms.id', ondelete='SET NULL'), nullable=True,
+                        comment='房间表主键')
     tenant_name = db.Column(db.String(50), nullable=False, comment='租客姓名')
     tenant_phone = db.Column(db.String(20), nullable=False, comment='租客电话')
     tenant_id_card = db.Column(db.String(18), nullable=False, comment='租客身份证号')
@@ -155,80 +208,278 @@ class ContractsNew(db.Model):
     created_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, comment='创建时间')
     updated_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, comment='更新时间')
 
+    __mapper_args__ = {'polymorphic_on': floor}
 
-class Admin(db.Model):
-    __tablename__ = 'admin'
 
-    id = db.Column(db.Integer, primary_key=True, autoincrement=True, comment='主键ID')
-    admin_name = db.Column(db.String(50), nullable=False, unique=True, comment='管理员用户名')
-    password = db.Column(db.String(255), nullable=False, comment='密码哈希')
-    last_login = db.Column(db.DateTime, nullable=True, comment='最后登录时间')
+class ContractsOld(Contract):
+    """五楼合同"""
+    __mapper_args__ = {'polymorphic_identity': 'old'}
 
-    def set_password(self, password):
-        """设置密码"""
-        self.password = generate_password_hash(password)
 
-    def check_password(self, password):
-        """检查密码"""
-        return check_password_hash(self.password, password)
+class ContractsNew(Contract):
+    """六楼合同"""
+    __mapper_args__ = {'polymorphic_identity': 'new'}
 
 
-class ContractsOld(db.Model):
-    __tablename__ = 'contracts_old'
+class RentalInfo(db.Model):
+    """租户信息（各楼层共用一张表，按 floor 列区分楼层）"""
+    __tablename__ = 'rental_info'
+    __table_args__ = (
+        db.Index('idx_rental_info_floor_room', 'floor', 'room_number'),
+        db.Index('idx_rental_info_floor_status', 'floor', 'rental_status'),
+        db.Index('idx_rental_info_room_id', 'room_id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True, comment='主键ID')
-    contract_number = db.Column(db.String(50), nullable=False, comment='合同编号')
+    floor = db.Column(db.String(10), nullable=False, comment='楼层：old=五楼, new=六楼')
     room_number = db.Column(db.String(50), nullable=False, comment='房号')
+    room_id = db.Column(db.Integer, db.ForeignKey('rooms.id', ondelete='SET NULL'), nullable=True,
+                        comment='房间表主键')
     tenant_name = db.Column(db.String(50), nullable=False, comment='租客姓名')
-    tenant_phone = db.Column(db.String(20), nullable=False, comment='租客电话')
-    tenant_id_card = db.Column(db.String(18), nullable=False, comment='租客身份证号')
-    landlord_name = db.Column(db.String(50), nullable=False, comment='房东姓名')
-    landlord_phone = db.Column(db.String(20), nullable=False, comment='房东电话')
-    monthly_rent = db.Column(db.Numeric(10, 2), nullable=False, default=0.00, comment='月租金')
+    phone = db.Column(db.String(20), nullable=False, comment='电话')
     deposit = db.Column(db.Numeric(10, 2), nullable=False, default=0.00, comment='押金')
-    contract_start_date = db.Column(db.Date, nullable=True, comment='合同开始时间')
-    contract_end_date = db.Column(db.Date, nullable=True, comment='合同结束时间')
-    contract_duration = db.Column(db.Integer, nullable=False, default=0, comment='合同期限')
-    payment_method = db.Column(db.String(50), nullable=False, comment='缴费方式')
-    rent_due_date = db.Column(db.Date, nullable=True, comment='租金到期日')
-    contract_status = db.Column(db.SmallInteger, nullable=False, default=1, comment='合同状态：1=有效, 2=失效')
-    utilities_included = db.Column(db.SmallInteger, nullable=False, default=1, comment='是否包含水电费：1=包含, 2=不包含')
-    water_rate = db.Column(db.Numeric(6, 2), nullable=False, default=0.00, comment='水费单价')
-    electricity_rate = db.Column(db.Numeric(6, 2), nullable=False, default=0.00, comment='电费单价')
-    contract_terms = db.Column(db.Text, nullable=True, comment='合同条款')
-    special_agreement = db.Column(db.Text, nullable=True, comment='特殊约定')
+    occupant_count = db.Column(db.Integer, nullable=False, default=0, comment='入住人数')
+    check_in_date = db.Column(db.Date, nullable=True, comment='入住时间')
+    rental_status = db.Column(db.SmallInteger, nullable=False, default=1, comment='租赁状态：1=已缴费, 2=未缴费')
     remarks = db.Column(db.Text, nullable=True, comment='备注')
     created_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, comment='创建时间')
     updated_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, comment='更新时间')
 
+    __mapper_args__ = {'polymorphic_on': floor}
+
+
+class RentalInfoOld(RentalInfo):
+    """五楼租户信息"""
+    __mapper_args__ = {'polymorphic_identity': 'old'}
+
+
+class RentalInfoNew(RentalInfo):
+    """六楼租户信息"""
+    __mapper_args__ = {'polymorphic_identity': 'new'}
 
-class RentalInfoOld(db.Model):
-    __tablename__ = 'rental_info_old'
+
+class Bill(db.Model):
+    """月度账单：每个租房记录每个账期一行（各楼层共用一张表，按 floor 列区分楼层）"""
+    __tablename__ = 'bills'
+    __table_args__ = (
+        db.UniqueConstraint('rental_id', 'period', name='uq_bills_rental_period'),
+        db.Index('idx_bills_floor_period_status', 'floor', 'period', 'status'),
+        # 欠费账单的部分索引（按房间汇总欠费、跨月欠费查询）
+        db.Index('idx_bills_floor_arrears', 'floor', 'room_number', 'period',
+                 postgresql_where=db.text('status != 1'), sqlite_where=db.text('status != 1')),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True, comment='主键ID')
+    floor = db.Column(db.String(10), nullable=False, comment='楼层：old=五楼, new=六楼')
+    rental_id = db.Column(db.Integer, nullable=False, comment='租房管理记录ID')
     room_number = db.Column(db.String(50), nullable=False, comment='房号')
     tenant_name = db.Column(db.String(50), nullable=False, comment='租客姓名')
-    phone = db.Column(db.String(20), nullable=False, comment='电话')
-    deposit = db.Column(db.Numeric(10, 2), nullable=False, default=0.00, comment='押金')
-    occupant_count = db.Column(db.Integer, nullable=False, default=0, comment='入住人数')
-    check_in_date = db.Column(db.Date, nullable=True, comment='入住时间')
-    rental_status = db.Column(db.SmallInteger, nullable=False, default=1, comment='租赁状态：1=已缴费, 2=未缴费')
-    remarks = db.Column(db.Text, nullable=True, comment='备注')
+    period = db.Column(db.Date, nullable=False, comment='账期（当月1日）')
+    rent = db.Column(db.Numeric(10, 2), nullable=False, default=0.00, comment='租金')
+    water_fee = db.Column(db.Numeric(10, 2), nullable=False, default=0.00, comment='水费')
+    electricity_fee = db.Column(db.Numeric(10, 2), nullable=False, default=0.00, comment='电费')
+    amount_due = db.Column(db.Numeric(10, 2), nullable=False, default=0.00, comment='应缴金额')
+    amount_paid = db.Column(db.Numeric(10, 2), nullable=False, default=0.00, comment='已缴金额')
+    status = db.Column(db.SmallInteger, nullable=False, default=2, comment='账单状态：1=已结清, 2=未缴费, 3=部分缴费')
+    paid_at = db.Column(db.DateTime, nullable=True, comment='最近缴费时间')
     created_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, comment='创建时间')
-    updated_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, comment='更新时间')
+    updated_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow, comment='更新时间')
+
+    __mapper_args__ = {'polymorphic_on': floor}
+
+
+class BillsOld(Bill):
+    """五楼月度账单"""
+    __mapper_args__ = {'polymorphic_identity': 'old'}
+
 
+class BillsNew(Bill):
+    """六楼月度账单"""
+    __mapper_args__ = {'polymorphic_identity': 'new'}
 
-class RentalInfoNew(db.Model):
-    __tablename__ = 'rental_info_new'
+
+class MeterReading(db.Model):
+    """水电表抄表记录：每块表每个账期一行（各楼层共用一张表，按 floor 列区分楼层）"""
+    __tablename__ = 'meter_readings'
+    __table_args__ = (
+        db.UniqueConstraint('floor', 'meter_number', 'period', name='uq_meter_readings_meter_period'),
+        db.Index('idx_meter_readings_floor_room_period', 'floor', 'room_number', 'period'),
+    )
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True, comment='主键ID')
+    floor = db.Column(db.String(10), nullable=False, comment='楼层：old=五楼, new=六楼')
     room_number = db.Column(db.String(50), nullable=False, comment='房号')
-    tenant_name = db.Column(db.String(50), nullable=False, comment='租客姓名')
-    phone = db.Column(db.String(20), nullable=False, comment='电话')
-    deposit = db.Column(db.Numeric(10, 2), nullable=False, default=0.00, comment='押金')
-    occupant_count = db.Column(db.Integer, nullable=False, default=0, comment='入住人数')
-    check_in_date = db.Column(db.Date, nullable=True, comment='入住时间')
-    rental_status = db.Column(db.SmallInteger, nullable=False, default=1, comment='租赁状态：1=已缴费, 2=未缴费')
-    remarks = db.Column(db.Text, nullable=True, comment='备注')
+    meter_type = db.Column(db.String(20), nullable=False, comment='表类型：water=水表, electricity=电表')
+    meter_number = db.Column(db.String(50), nullable=False, comment='表号')
+    period = db.Column(db.Date, nullable=False, comment='账期（当月1日）')
+    reading = db.Column(db.Numeric(12, 2), nullable=False, comment='本期读数')
+    usage = db.Column(db.Numeric(12, 2), nullable=True, comment='本期用量（与上期读数之差，首次抄表为空）')
+    read_on = db.Column(db.Date, nullable=True, comment='抄表日期')
     created_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, comment='创建时间')
-    updated_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, comment='更新时间')
+
+    __mapper_args__ = {'polymorphic_on': floor}
+
+
+class MeterReadingsOld(MeterReading):
+    """五楼抄表记录"""
+    __mapper_args__ = {'polymorphic_identity': 'old'}
+
+
+class MeterReadingsNew(MeterReading):
+    """六楼抄表记录"""
+    __mapper_args__ = {'polymorphic_identity': 'new'}
+
+
+class UtilityRate(db.Model):
+    """水电费单价表：floor 为空表示全局单价，按生效日期取最近一条"""
+    __tablename__ = 'utility_rates'
+    __table_args__ = (
+        db.Index('idx_utility_rates_floor_effective', 'floor', 'effective_from'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True, comment='主键ID')
+    floor = db.Column(db.String(10), nullable=True, comment='楼层：old=五楼, new=六楼，为空表示全部楼层')
+    water_rate = db.Column(db.Numeric(6, 2), nullable=True, comment='水费单价（元/方），为空表示沿用上一级')
+    electricity_rate = db.Column(db.Numeric(6, 2), nullable=True, comment='电费单价（元/度），为空表示沿用上一级')
+    effective_from = db.Column(db.Date, nullable=False, comment='生效日期')
+    remarks = db.Column(db.String(200), nullable=True, comment='备注')
+    created_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, comment='创建时间')
+
+
+class BillingRollover(db.Model):
+    """月初结转记录：每个楼层每个账期结转完成后写入一行，用于判断账期是否已结转"""
+    __tablename__ = 'billing_rollovers'
+    __table_args__ = (
+        db.UniqueConstraint('floor', 'period', name='uq_billing_rollovers_floor_period'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True, comment='主键ID')
+    floor = db.Column(db.String(10), nullable=False, comment='楼层：old=五楼, new=六楼')
+    period = db.Column(db.Date, nullable=False, comment='账期（当月1日）')
+    rental_count = db.Column(db.Integer, nullable=False, default=0, comment='结转的租房记录数')
+    created_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, comment='结转时间')
+
+
+class SearchEntry(db.Model):
+    """全局搜索索引：租户信息、联系人、合同、房间各一行，由 search.py 维护
+
+    PostgreSQL 上为 search_text、pinyin、initials 建 pg_trgm GIN 索引，SQLite 上另建 FTS5 影子表。
+    少于3个字符的关键词按前缀匹配，使用各列的 B-tree 索引（PostgreSQL 上为 text_pattern_ops）。
+    """
+    __tablename__ = 'search_index'
+    __table_args__ = (
+        db.UniqueConstraint('entity', 'entity_id', name='uq_search_index_entity'),
+        db.Index('idx_search_index_floor_entity', 'floor', 'entity'),
+        *[db.Index(f'idx_search_index_{column}_prefix', column, postgresql_ops={column: 'text_pattern_ops'})
+          for column in ('search_text', 'room_number', 'pinyin', 'initials')],
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True, comment='主键ID')
+    floor = db.Column(db.String(10), nullable=False, comment='楼层：old=五楼, new=六楼')
+    entity = db.Column(db.String(20), nullable=False, comment='数据类型：rental_info、contacts、contracts、rooms')
+    entity_id = db.Column(db.Integer, nullable=False, comment='数据ID')
+    title = db.Column(db.String(100), nullable=False, comment='显示标题')
+    subtitle = db.Column(db.String(200), nullable=True, comment='显示副标题')
+    room_number = db.Column(db.String(50), nullable=True, comment='房号')
+    search_text = db.Column(db.Text, nullable=False, comment='检索文本（小写，含姓名、房号、电话等）')
+    pinyin = db.Column(db.String(200), nullable=True, comment='姓名全拼')
+    initials = db.Column(db.String(50), nullable=True, comment='姓名拼音首字母')
+    updated_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow, comment='更新时间')
+
+
+class Admin(db.Model):
+    __tablename__ = 'admin'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True, comment='主键ID')
+    admin_name = db.Column(db.String(50), nullable=False, unique=True, comment='管理员用户名')
+    password = db.Column(db.String(255), nullable=False, comment='密码哈希')
+    last_login = db.Column(db.DateTime, nullable=True, comment='最后登录时间')
+
+    def set_password(self, password):
+        """设置密码"""
+        self.password = generate_password_hash(password)
+
+    def check_password(self, password):
+        """检查密码"""
+        return check_password_hash(self.password, password)
+
+
+class SchemaMigration(db.Model):
+    __tablename__ = 'schema_migrations'
+
+    version = db.Column(db.Integer, primary_key=True, autoincrement=False, comment='迁移版本号')
+    description = db.Column(db.String(200), nullable=False, comment='迁移说明')
+    applied_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, comment='执行时间')
+
+
+# 楼层与数据表的对应关系：'old' 表示五楼，'new' 表示六楼
+FLOOR_MODELS = {
+    'old': {
+        'contacts': ContactsOld,
+        'rental': RentalOld,
+        'records': RentalRecordsOld,
+        'rooms': RoomsOld,
+        'contracts': ContractsOld,
+        'rental_info': RentalInfoOld,
+        'bills': BillsOld,
+        'meter_readings': MeterReadingsOld,
+    },
+    'new': {
+        'contacts': ContactsNew,
+        'rental': RentalNew,
+        'records': RentalRecordsNew,
+        'rooms': RoomsNew,
+        'contracts': ContractsNew,
+        'rental_info': RentalInfoNew,
+        'bills': BillsNew,
+        'meter_readings': MeterReadingsNew,
+    },
+}
+
+
+# 关联房间的数据表及其房号列
+ROOM_LINKED_MODELS = ((Contact, 'roomId'), (Rental, 'room_number'), (RentalRecord, 'room_number'),
+                      (Contract, 'room_number'), (RentalInfo, 'room_number'))
+
+
+def _room_links(session):
+    """本次 flush 中需要关联房间的对象：未指定 room_id 的新增对象和修改了房号的对象"""
+    for obj in session.new | session.dirty:
+        for model, room_column in ROOM_LINKED_MODELS:
+            if isinstance(obj, model):
+                if obj in session.new:
+                    if obj.room_id is None:
+                        yield obj, room_column
+                elif db.inspect(obj).attrs[room_column].history.has_changes():
+                    yield obj, room_column
+                break
+
+
+@event.listens_for(Session, 'before_flush')
+def _link_rooms(session, flush_context, instances):
+    """新增或修改房号的数据在写入前关联房间，整个 flush 只查询一次房间表
+
+    批量 INSERT（Core 语句）不经过这里，调用方需自行填写 room_id（可用 find_room_ids 一次查出）。
+    """
+    links = list(_room_links(session))
+    if not links:
+        return
+    with session.no_autoflush:
+        room_ids = find_room_ids(session.connection(), [
+            (obj.floor, getattr(obj, room_column)) for obj, room_column in links
+        ])
+    for obj, room_column in links:
+        obj.room_id = room_ids.get((obj.floor, getattr(obj, room_column)))
+
+
+@event.listens_for(Room, 'after_insert', propagate=True)
+def _adopt_room_rows(mapper, connection, target):
+    """新建房间时关联同楼层、同房号且尚未关联房间的数据"""
+    for model, room_column in ROOM_LINKED_MODELS:
+        table = model.__table__
+        connection.execute(
+            update(table)
+            .where(table.c.room_id.is_(None), table.c.floor == target.floor,
+                   table.c[room_column] == target.room_number)
+            .values(room_id=target.id)
+        )
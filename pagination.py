@@ -0,0 +1,355 @@
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from flask import request, url_for
+from sqlalchemy import and_, or_, select, func
+from models import db, FLOOR_MODELS
+from periods import in_month, parse_month
+from search import _escape_like
+
+
+class ListConfig:
+    """列表页配置：数据表、允许排序的列、允许筛选的参数及默认排序
+
+    filters 的格式为 {查询参数名: (列名, 操作)}，操作可选：
+    'eq' 等于，'prefix' 前缀匹配，'contains' 包含，'gte' 大于等于，'lt' 小于，
+    'month' 落在指定月份内（参数格式 YYYY-MM）。
+    'prefix'、'contains' 的列名可以是元组，任一列匹配即可（用于页面上的综合搜索框）
+    """
+
+    def __init__(self, model, sortable, filters, default_sort='id', default_order='asc'):
+        self.model = model
+        self.sortable = sortable
+        self.filters = filters
+        self.default_sort = default_sort
+        self.default_order = default_order
+
+
+def _build_list_configs():
+    configs = {}
+    for floor, models in FLOOR_MODELS.items():
+        configs[f'rooms_{floor}'] = ListConfig(
+            models['rooms'],
+            sortable=['id', 'room_number', 'room_type', 'base_rent', 'deposit', 'room_status', 'created_at'],
+            filters={
+                'q': (('room_number', 'room_type'), 'contains'),
+                'room_number': ('room_number', 'prefix'),
+                'floor': ('room_number', 'prefix'),
+                'room_type': ('room_type', 'eq'),
+                'room_status': ('room_status', 'eq'),
+            }
+        )
+        configs[f'rental_{floor}'] = ListConfig(
+            models['rental'],
+            sortable=['id', 'room_number', 'tenant_name', 'total_due', 'payment_status', 'created_at'],
+            filters={
+                'room_number': ('room_number', 'prefix'),
+                'tenant_name': ('tenant_name', 'contains'),
+                'payment_status': ('payment_status', 'eq'),
+                'created_from': ('created_at', 'gte'),
+                'created_to': ('created_at', 'lt'),
+            },
+            default_sort='created_at' if floor == 'old' else 'id',
+            default_order='desc' if floor == 'old' else 'asc'
+        )
+        configs[f'rental_info_{floor}'] = ListConfig(
+            models['rental_info'],
+            sortable=['id', 'room_number', 'tenant_name', 'check_in_date', 'rental_status', 'created_at'],
+            filters={
+                'q': (('room_number', 'tenant_name', 'phone'), 'contains'),
+                'room_number': ('room_number', 'prefix'),
+                'tenant_name': ('tenant_name', 'contains'),
+                'phone': ('phone', 'prefix'),
+                'rental_status': ('rental_status', 'eq'),
+            }
+        )
+        configs[f'contracts_{floor}'] = ListConfig(
+            models['contracts'],
+            sortable=['id', 'contract_number', 'room_number', 'tenant_name', 'contract_start_date',
+                      'contract_end_date', 'contract_status', 'created_at'],
+            filters={
+                'q': (('contract_number', 'tenant_name'), 'contains'),
+                'contract_number': ('contract_number', 'prefix'),
+                'room_number': ('room_number', 'eq'),
+                'tenant_name': ('tenant_name', 'contains'),
+                'contract_status': ('contract_status', 'eq'),
+                'end_from': ('contract_end_date', 'gte'),
+                'end_to': ('contract_end_date', 'lt'),
+            }
+        )
+        configs[f'rental_records_{floor}'] = ListConfig(
+            models['records'],
+            sortable=['id', 'room_number', 'tenant_name', 'total_rent', 'payment_date', 'created_at'],
+            filters={
+                'room_number': ('room_number', 'contains'),
+                'tenant_name': ('tenant_name', 'contains'),
+                'payment_date': ('payment_date', 'eq'),
+                'month': ('payment_date', 'month'),
+                'date_from': ('payment_date', 'gte'),
+                'date_to': ('payment_date', 'lt'),
+            }
+        )
+    return configs
+
+
+LIST_CONFIGS = _build_list_configs()
+
+
+class KeysetPage:
+    """键集分页结果"""
+
+    def __init__(self, items, limit, sort, order, filters, total,
+                 next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.limit = limit
+        self.sort = sort
+        self.order = order
+        self.filters = filters
+        self.total = total
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+    def to_dict(self):
+        return {
+            'limit': self.limit,
+            'sort': self.sort,
+            'order': self.order,
+            'filters': self.filters,
+            'total': self.total,
+            'next_cursor': self.next_cursor,
+            'prev_cursor': self.prev_cursor,
+            'has_next': self.has_next,
+            'has_prev': self.has_prev
+        }
+
+
+def _python_type(column):
+    try:
+        return column.type.python_type
+    except NotImplementedError:
+        return str
+
+
+def _parse_value(column, raw):
+    """将查询参数或游标中的值转换为列对应的 Python 类型"""
+    if raw is None:
+        return None
+    python_type = _python_type(column)
+    if python_type is datetime:
+        return datetime.fromisoformat(raw)
+    if python_type is date:
+        return date.fromisoformat(raw[:10])
+    if python_type is Decimal:
+        return Decimal(str(raw))
+    if python_type is int:
+        return int(raw)
+    return str(raw)
+
+
+def _encode_cursor(value, row_id):
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    elif isinstance(value, Decimal):
+        value = str(value)
+    payload = json.dumps([value, row_id], ensure_ascii=False, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def _decode_cursor(column, cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    return _parse_value(column, value), int(row_id)
+
+
+def _seek_condition(column, id_column, value, row_id, ascending, forward):
+    """构造键集分页的定位条件
+
+    排序规则为 (列, id) 同向排序，空值排在最后。forward 为 True 时取游标之后的记录，
+    否则取游标之前的记录。
+    """
+    after = ascending == forward
+    id_cmp = (id_column > row_id) if after else (id_column < row_id)
+
+    if value is None:
+        # 游标位于空值区间（空值排在最后）
+        if forward:
+            return and_(column.is_(None), id_cmp)
+        return or_(column.isnot(None), and_(column.is_(None), id_cmp))
+
+    col_cmp = (column > value) if after else (column < value)
+    condition = or_(col_cmp, and_(column == value, id_cmp))
+    if forward and column.nullable:
+        condition = or_(condition, column.is_(None))
+    return condition
+
+
+def _order_by(column, id_column, ascending, nulls_last):
+    clauses = []
+    if column.nullable:
+        # (列 IS NULL) 排序保证空值位置在各数据库上一致
+        clauses.append(column.is_(None).asc() if nulls_last else column.is_(None).desc())
+    if column is not id_column:
+        clauses.append(column.asc() if ascending else column.desc())
+    clauses.append(id_column.asc() if ascending else id_column.desc())
+    return clauses
+
+
+def build_filter_conditions(config, args):
+    """根据请求参数生成筛选条件，返回 (条件列表, 实际生效的筛选参数)"""
+    model = config.model
+    conditions = []
+    applied = {}
+    for param, (column_name, op) in config.filters.items():
+        raw = (args.get(param) or '').strip()
+        if not raw:
+            continue
+        if op in ('prefix', 'contains'):
+            # 转义用户输入中的 % 和 _，按字面匹配
+            pattern = _escape_like(raw) + '%'
+            if op == 'contains':
+                pattern = '%' + pattern
+            column_names = column_name if isinstance(column_name, tuple) else (column_name,)
+            conditions.append(or_(*[getattr(model, name).like(pattern, escape='\\')
+                                    for name in column_names]))
+            applied[param] = raw
+            continue
+        column = getattr(model, column_name)
+        if op == 'month':
+            try:
+                conditions.append(in_month(column, *parse_month(raw)))
+            except ValueError:
+                continue
+        else:
+            try:
+                value = _parse_value(column, raw)
+            except (ValueError, ArithmeticError):
+                continue
+            if op == 'eq':
+                conditions.append(column == value)
+            elif op == 'gte':
+                conditions.append(column >= value)
+            elif op == 'lt':
+                conditions.append(column < value)
+        applied[param] = raw
+    return conditions, applied
+
+
+def paginate_list(name, args, extra_conditions=None, default_limit=50, max_limit=200, with_total=True):
+    """对列表页进行服务端排序、筛选和键集分页
+
+    Args:
+        name (str): LIST_CONFIGS 中的列表名称，如 'rooms_old'
+        args: 请求参数（request.args），支持 sort、order、limit、after、before、total 及各筛选参数
+        extra_conditions (list): 调用方附加的筛选条件
+        with_total (bool): 是否统计总条数；为 False 时 total 为 None，不执行 COUNT
+    """
+    config = LIST_CONFIGS[name]
+    model = config.model
+    id_column = model.id
+
+    sort = args.get('sort') or config.default_sort
+    if sort not in config.sortable:
+        sort = config.default_sort
+    order = args.get('order') or config.default_order
+    if order not in ('asc', 'desc'):
+        order = config.default_order
+    ascending = order == 'asc'
+    sort_column = getattr(model, sort)
+
+    try:
+        limit = int(args.get('limit', default_limit))
+    except (TypeError, ValueError):
+        limit = default_limit
+    limit = max(1, min(limit, max_limit))
+
+    conditions, applied = build_filter_conditions(config, args)
+    conditions.extend(extra_conditions or [])
+
+    after = args.get('after')
+    before = args.get('before')
+    forward = not before
+    cursor = None
+    try:
+        if before:
+            cursor = _decode_cursor(sort_column, before)
+        elif after:
+            cursor = _decode_cursor(sort_column, after)
+    except (ValueError, TypeError, ArithmeticError):
+        cursor = None
+
+    query = model.query.filter(*conditions)
+    if cursor is not None:
+        query = query.filter(_seek_condition(sort_column, id_column, cursor[0], cursor[1], ascending, forward))
+    if forward:
+        query = query.order_by(*_order_by(sort_column, id_column, ascending, nulls_last=True))
+    else:
+        query = query.order_by(*_order_by(sort_column, id_column, not ascending, nulls_last=False))
+
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if not forward:
+        rows.reverse()
+
+    next_cursor = prev_cursor = None
+    if rows:
+        first, last = rows[0], rows[-1]
+        if (has_more if forward else cursor is not None):
+            next_cursor = _encode_cursor(getattr(last, sort), last.id)
+        if (cursor is not None if forward else has_more):
+            prev_cursor = _encode_cursor(getattr(first, sort), first.id)
+
+    total = None
+    if with_total:
+        # 翻页时沿用首页统计的总数（翻页链接带 total 参数），只在首页或缺少该参数时执行 COUNT
+        if cursor is not None:
+            total = _parse_total(args.get('total'))
+        if total is None:
+            total = db.session.execute(
+                select(func.count()).select_from(model).where(*conditions)
+            ).scalar()
+
+    return KeysetPage(rows, limit, sort, order, applied, total,
+                      next_cursor=next_cursor, prev_cursor=prev_cursor)
+
+
+def _parse_total(raw):
+    try:
+        total = int(raw)
+    except (TypeError, ValueError):
+        return None
+    return total if total >= 0 else None
+
+
+def serialize_row(row):
+    """将 ORM 对象转换为可 JSON 序列化的字典"""
+    data = {}
+    for column in row.__table__.columns:
+        value = getattr(row, column.key)
+        if isinstance(value, Decimal):
+            value = float(value)
+        elif isinstance(value, datetime):
+            value = value.strftime('%Y-%m-%d %H:%M:%S')
+        elif isinstance(value, date):
+            value = value.strftime('%Y-%m-%d')
+        data[column.key] = value
+    return data
+
+
+def page_url(**cursor):
+    """生成当前列表页的翻页链接，保留排序和筛选参数，替换 after/before 游标及缓存的 total"""
+    args = request.args.to_dict()
+    args.pop('after', None)
+    args.pop('before', None)
+    args.pop('total', None)
+    args.update({key: value for key, value in cursor.items() if value})
+    return url_for(request.endpoint, **(request.view_args or {}), **args)
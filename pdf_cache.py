@@ -0,0 +1,74 @@
+import threading
+from collections import OrderedDict
+
+
+class PdfCache:
+    """已生成合同PDF的进程内 LRU 缓存
+
+    缓存键为 (合同表名, 合同ID)，每项保存内容哈希和PDF数据；哈希不一致时视为未命中。
+    按条目数和总字节数两个上限淘汰最久未使用的项。
+    """
+
+    def __init__(self, max_entries=256, max_bytes=32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, fingerprint):
+        """返回内容哈希一致的缓存PDF数据，未命中返回 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == fingerprint:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def get_or_render(self, key, fingerprint, render):
+        """命中缓存直接返回PDF数据，否则调用 render() 生成并缓存"""
+        data = self.get(key, fingerprint)
+        if data is not None:
+            return data
+
+        data = render()
+        self.put(key, fingerprint, data)
+        return data
+
+    def put(self, key, fingerprint, data):
+        """写入缓存并按上限淘汰"""
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old:
+                self._size -= len(old[1])
+            if len(data) > self.max_bytes:
+                return
+            self._entries[key] = (fingerprint, data)
+            self._size += len(data)
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def invalidate(self, table_name, contract_id):
+        """合同修改或删除后清除对应的缓存项"""
+        with self._lock:
+            old = self._entries.pop((table_name, contract_id), None)
+            if old:
+                self._size -= len(old[1])
+
+    def info(self):
+        """返回缓存命中统计"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'bytes': self._size
+            }
+
+
+pdf_cache = PdfCache()
@@ -0,0 +1,42 @@
+from datetime import date, datetime
+from sqlalchemy import and_
+
+
+def month_range(year, month):
+    """返回指定年月的半开区间 [当月1日, 次月1日)，用于可走索引的日期范围查询
+
+    Args:
+        year (int): 年份
+        month (int): 月份，1-12
+    """
+    start = date(year, month, 1)
+    if month == 12:
+        end = date(year + 1, 1, 1)
+    else:
+        end = date(year, month + 1, 1)
+    return start, end
+
+
+def month_datetime_range(year, month):
+    """返回指定年月的半开区间，边界为 datetime，用于 DateTime 类型的列"""
+    start, end = month_range(year, month)
+    return datetime.combine(start, datetime.min.time()), datetime.combine(end, datetime.min.time())
+
+
+def parse_month(value):
+    """解析 'YYYY-MM' 格式的月份字符串，返回 (year, month)"""
+    year, month = value.strip().split('-')[:2]
+    year, month = int(year), int(month)
+    if not 1 <= month <= 12:
+        raise ValueError(f'无效的月份: {value}')
+    return year, month
+
+
+def in_month(column, year, month):
+    """生成 column 落在指定月份内的筛选条件（column >= 月初 AND column < 次月初）"""
+    python_type = getattr(column.type, 'python_type', date)
+    if python_type is datetime:
+        start, end = month_datetime_range(year, month)
+    else:
+        start, end = month_range(year, month)
+    return and_(column >= start, column < end)
@@ -0,0 +1,167 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from flask import g, has_request_context, request, jsonify
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 语句形状：合并空白，IN 列表等连续占位符合并为一个
+_WHITESPACE = re.compile(r'\s+')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*(?:\?|%s|%\(\w+\)s)(?:\s*,\s*(?:\?|%s|%\(\w+\)s))*\s*\)')
+
+
+def statement_shape(statement):
+    """去掉参数差异后的语句形状，用于识别同一请求内重复执行的语句"""
+    return _PLACEHOLDER_LIST.sub('(?)', _WHITESPACE.sub(' ', statement).strip())
+
+
+def _call_site():
+    """返回执行语句的项目代码位置（跳过 SQLAlchemy、Flask 等第三方库和本模块）"""
+    for frame in reversed(traceback.extract_stack()[:-2]):
+        filename = os.path.abspath(frame.filename)
+        if (filename.startswith(PROJECT_DIR) and filename != os.path.abspath(__file__)
+                and 'site-packages' not in filename):
+            return f'{os.path.relpath(filename, PROJECT_DIR)}:{frame.lineno} in {frame.name}'
+    return '-'
+
+
+class QueryProfiler:
+    """慢查询和 N+1 查询检测
+
+    执行时间超过阈值的语句记为慢查询；同一请求内同一形状的语句执行次数达到阈值时记为 N+1 查询。
+    记录请求路由、项目代码中的调用位置和执行计划（PostgreSQL 为 EXPLAIN，SQLite 为 EXPLAIN QUERY PLAN），
+    写入滚动日志文件，最近的记录保存在内存中供 /api/query_profiler 查看。
+    执行计划在请求结束后用单独的数据库连接获取，不影响请求本身的事务和耗时统计。
+    """
+
+    def __init__(self, slow_ms=200, repeat_threshold=10, max_recent=200):
+        self.slow_ms = slow_ms
+        self.repeat_threshold = repeat_threshold
+        self.recent = deque(maxlen=max_recent)
+        self.db = None
+        self.logger = logging.getLogger('query_profiler')
+        self._lock = threading.Lock()
+
+    def init_app(self, app, db):
+        """注册 SQL 执行事件、请求结束钩子和查看接口（db 用于获取执行计划）"""
+        if not app.config.get('QUERY_PROFILER_ENABLED', True):
+            return
+        self.slow_ms = app.config.get('SLOW_QUERY_MS', self.slow_ms)
+        self.repeat_threshold = app.config.get('N_PLUS_ONE_THRESHOLD', self.repeat_threshold)
+        self.db = db
+        self._init_log(app.config.get('QUERY_PROFILER_LOG'))
+
+        event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+        app.teardown_request(self._flush)
+        app.add_url_rule('/api/query_profiler', 'api_query_profiler', self.view, methods=['GET', 'DELETE'])
+
+    def _init_log(self, path):
+        if not path or self.logger.handlers:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            handler = RotatingFileHandler(path, maxBytes=5 * 1024 * 1024, backupCount=3, encoding='utf-8')
+        except OSError:
+            # 只读文件系统（如 Vercel）上只保留内存记录
+            return
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        self.logger.addHandler(handler)
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context():
+            conn.info.setdefault('profiler_query_started', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get('profiler_query_started')
+        if not started or not has_request_context():
+            return
+        elapsed_ms = (time.perf_counter() - started.pop()) * 1000
+        if executemany:
+            return
+
+        findings = g.setdefault('profiler_findings', [])
+        if elapsed_ms >= self.slow_ms:
+            findings.append(self._finding('slow', statement, parameters, elapsed_ms))
+
+        shapes = g.setdefault('profiler_shapes', Counter())
+        shape = statement_shape(statement)
+        shapes[shape] += 1
+        if shapes[shape] == self.repeat_threshold:
+            findings.append(self._finding('n_plus_one', statement, parameters, elapsed_ms, shape=shape))
+
+    @staticmethod
+    def _finding(kind, statement, parameters, elapsed_ms, shape=None):
+        return {
+            'kind': kind,
+            'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'route': f'{request.method} {request.path}',
+            'endpoint': request.endpoint,
+            'call_site': _call_site(),
+            'duration_ms': round(elapsed_ms, 2),
+            'statement': shape or statement,
+            '_sql': statement,
+            '_parameters': parameters,
+        }
+
+    def _flush(self, exc=None):
+        """请求结束后补充执行计划并写入日志"""
+        findings = g.pop('profiler_findings', None)
+        shapes = g.pop('profiler_shapes', None)
+        if not findings:
+            return
+        for finding in findings:
+            if finding['kind'] == 'n_plus_one':
+                finding['count'] = shapes[finding['statement']]
+            finding['plan'] = self._explain(finding.pop('_sql'), finding.pop('_parameters'))
+            with self._lock:
+                self.recent.append(finding)
+            self.logger.info(json.dumps(finding, ensure_ascii=False, default=str))
+
+    def _explain(self, statement, parameters):
+        """获取 SELECT 语句的执行计划；其它语句或获取失败时返回说明文字"""
+        if not statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            return '（非查询语句，未获取执行计划）'
+        engine = self.db.engine
+        prefix = 'EXPLAIN QUERY PLAN ' if engine.dialect.name == 'sqlite' else 'EXPLAIN '
+        connection = engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(prefix + statement, parameters or ())
+            rows = cursor.fetchall()
+            cursor.close()
+            connection.rollback()
+        except Exception as e:
+            return f'（获取执行计划失败: {e}）'
+        finally:
+            connection.close()
+        return '\n'.join(' '.join(str(value) for value in row) for row in rows)
+
+    def view(self):
+        """查看（GET）或清空（DELETE）最近记录的慢查询和 N+1 查询"""
+        with self._lock:
+            if request.method == 'DELETE':
+                self.recent.clear()
+                return jsonify({'success': True, 'message': '已清空'})
+            records = list(reversed(self.recent))
+        return jsonify({
+            'success': True,
+            'slow_ms': self.slow_ms,
+            'repeat_threshold': self.repeat_threshold,
+            'records': records
+        })
+
+
+query_profiler = QueryProfiler()
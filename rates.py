@@ -0,0 +1,129 @@
+import threading
+import time
+from bisect import bisect_right
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import select, or_
+from models import db, FLOOR_MODELS, UtilityRate
+
+
+class RateResolver:
+    """水电费单价解析：合同单价 > 楼层单价 > 全局单价 > 默认单价
+
+    合同单价取在该日期有效的合同（单价为0视为未设置）；楼层、全局单价取生效日期不晚于该日期的最近一条。
+    每个楼层的合同单价和单价表在首次使用时一次查询载入内存，之后按房间解析不再访问数据库；
+    缓存项在 TTL 到期后失效，合同或单价表修改时由接口主动清除。
+    """
+
+    def __init__(self, ttl=300, default_water=Decimal('3.5'), default_electricity=Decimal('1.2')):
+        self.ttl = ttl
+        self.default_rates = (default_water, default_electricity)
+        self._floors = {}
+        self._lock = threading.Lock()
+
+    def _load(self, floor):
+        ContractsModel = FLOOR_MODELS[floor]['contracts']
+        contracts = {}
+        rows = db.session.execute(
+            select(ContractsModel.room_number, ContractsModel.contract_start_date, ContractsModel.contract_end_date,
+                   ContractsModel.water_rate, ContractsModel.electricity_rate)
+            .where(ContractsModel.contract_status == 1)
+            .order_by(ContractsModel.contract_start_date.desc())
+        ).all()
+        for row in rows:
+            contracts.setdefault(row.room_number, []).append(
+                (row.contract_start_date, row.contract_end_date, row.water_rate or None, row.electricity_rate or None)
+            )
+
+        tables = {floor: [], None: []}
+        rows = db.session.execute(
+            select(UtilityRate.floor, UtilityRate.effective_from, UtilityRate.water_rate, UtilityRate.electricity_rate)
+            .where(or_(UtilityRate.floor == floor, UtilityRate.floor.is_(None)))
+            .order_by(UtilityRate.effective_from, UtilityRate.id)
+        ).all()
+        for row in rows:
+            tables[row.floor].append((row.effective_from, row.water_rate, row.electricity_rate))
+        return contracts, tables[floor], tables[None]
+
+    def _snapshot(self, floor):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._floors.get(floor)
+            if entry and entry[0] > now:
+                return entry[1]
+
+        snapshot = self._load(floor)
+        with self._lock:
+            self._floors[floor] = (time.monotonic() + self.ttl, snapshot)
+        return snapshot
+
+    @staticmethod
+    def _from_table(table, on, index):
+        """单价表中生效日期不晚于 on 的最近一条非空单价"""
+        position = bisect_right([row[0] for row in table], on)
+        for row in reversed(table[:position]):
+            if row[index] is not None:
+                return row[index]
+        return None
+
+    def resolve(self, floor, room_number, on=None):
+        """解析房间在指定日期（默认今天）的水电费单价
+
+        Returns:
+            tuple: (水费单价, 电费单价)，均为 Decimal
+        """
+        on = on or datetime.now().date()
+        contracts, floor_table, global_table = self._snapshot(floor)
+
+        contract_rates = (None, None)
+        for start, end, water, electricity in contracts.get(room_number, ()):
+            if (start is None or start <= on) and (end is None or end >= on):
+                contract_rates = (water, electricity)
+                break
+
+        rates = []
+        for index in (0, 1):
+            rate = contract_rates[index]
+            if rate is None:
+                rate = self._from_table(floor_table, on, index + 1)
+            if rate is None:
+                rate = self._from_table(global_table, on, index + 1)
+            if rate is None:
+                rate = self.default_rates[index]
+            rates.append(Decimal(str(rate)))
+        return tuple(rates)
+
+    def invalidate(self, floor=None):
+        """清除指定楼层的缓存，floor 为空时清除全部"""
+        with self._lock:
+            if floor is None:
+                self._floors.clear()
+            else:
+                self._floors.pop(floor, None)
+
+
+rate_resolver = RateResolver()
+
+
+def utility_fees(floor, room_number, data, on=None):
+    """按房间单价计算水电费和用量
+
+    提交了用量（water_usage / electricity_usage）时按单价计算费用，否则按提交的费用反推用量。
+
+    Returns:
+        dict: water_usage、electricity_usage、water_fee、electricity_fee（float）
+    """
+    water_rate, electricity_rate = rate_resolver.resolve(floor, room_number, on)
+    result = {}
+    for kind, rate in (('water', water_rate), ('electricity', electricity_rate)):
+        rate = float(rate)
+        usage = data.get(f'{kind}_usage')
+        if usage not in (None, ''):
+            usage = float(usage)
+            fee = round(usage * rate, 2)
+        else:
+            fee = float(data.get(f'{kind}_fee') or 0)
+            usage = fee / rate if fee > 0 and rate > 0 else 0
+        result[f'{kind}_usage'] = usage
+        result[f'{kind}_fee'] = fee
+    return result
@@ -0,0 +1,84 @@
+import csv
+import io
+from tempfile import SpooledTemporaryFile
+from sqlalchemy import select
+from models import db
+
+EXPORT_HEADERS = ['序号', '房间号', '租客姓名', '缴费金额', '缴费日期', '记录时间']
+
+# 每次从数据库游标取出的行数，同时也是 CSV 输出的分块大小
+EXPORT_BATCH_SIZE = 1000
+
+
+def _record_rows(model, conditions):
+    """按缴费日期顺序逐批读取缴费记录（PostgreSQL 上使用服务端游标），生成导出行"""
+    result = db.session.execute(
+        select(model.room_number, model.tenant_name, model.total_rent, model.payment_date, model.created_at)
+        .where(*conditions)
+        .order_by(model.payment_date, model.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    for index, row in enumerate(result, start=1):
+        yield [
+            index,
+            row.room_number,
+            row.tenant_name,
+            float(row.total_rent) if row.total_rent is not None else 0,
+            row.payment_date.strftime('%Y-%m-%d') if row.payment_date else '未设置',
+            row.created_at.strftime('%Y-%m-%d %H:%M:%S') if row.created_at else '未知',
+        ]
+
+
+def stream_records_csv(model, conditions):
+    """以 CSV 格式分块输出缴费记录，内存中只保留当前批次
+
+    首块只包含 BOM 和表头，响应在查询数据库之前即可开始发送。
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_HEADERS)
+    yield ('\ufeff' + buffer.getvalue()).encode('utf-8')
+
+    buffer.seek(0)
+    buffer.truncate()
+    for count, row in enumerate(_record_rows(model, conditions), start=1):
+        writer.writerow(row)
+        if count % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def xlsx_available():
+    """是否安装了 XLSX 导出所需的 openpyxl（可选依赖）"""
+    try:
+        import openpyxl  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def stream_records_xlsx(model, conditions, chunk_size=64 * 1024):
+    """以 XLSX 格式输出缴费记录
+
+    使用 openpyxl 的只写模式逐行写入，工作表数据由 openpyxl 写入临时文件而不是保存在内存中；
+    XLSX 是 ZIP 格式，需在全部写完后才能输出，生成后按块读取发送。
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('缴费记录')
+    sheet.append(EXPORT_HEADERS)
+    for row in _record_rows(model, conditions):
+        sheet.append(row)
+
+    with SpooledTemporaryFile(max_size=8 * 1024 * 1024) as output:
+        workbook.save(output)
+        output.seek(0)
+        while True:
+            chunk = output.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
@@ -0,0 +1,298 @@
+import time
+from datetime import datetime
+import click
+from sqlalchemy import select, update, insert, delete, func, literal, case, and_, or_
+from models import db, FLOOR_MODELS, BillingRollover
+from billing import BILL_PAID, BILL_UNPAID, current_period, ensure_current_bills, settle_open_bills, \
+    apply_rental_payment, sync_rental_bill
+from periods import month_range, parse_month
+
+# 标记缴费时需要同步更新 rental_info 表缴费状态的楼层（与单条标记接口保持一致）
+SYNC_RENTAL_INFO_FLOORS = {'new'}
+
+FLOOR_NAMES = {'old': '五楼', 'new': '六楼'}
+
+
+def mark_rentals_paid(floor, rental_ids):
+    """批量标记租房记录为已缴费
+
+    一次查询取出待处理记录，一条 UPDATE 更新缴费状态，结清全部未结清账单（包括以前账期的欠费，
+    避免标记为已缴费后仍有欠费）并批量插入缴费记录，缴费金额为本次结清的金额，全部在同一事务中提交。
+    已缴费的记录跳过，不会重复生成缴费记录。
+
+    Args:
+        floor (str): 楼层，'old' 或 'new'
+        rental_ids (list): 租房记录ID列表
+
+    Returns:
+        dict: {租房记录ID: 'paid' | 'already_paid' | 'not_found'}
+    """
+    models = FLOOR_MODELS[floor]
+    rental_model = models['rental']
+    records_model = models['records']
+
+    rows = db.session.execute(
+        select(rental_model.id, rental_model.room_number, rental_model.room_id, rental_model.tenant_name,
+               rental_model.monthly_rent, rental_model.water_fee, rental_model.electricity_fee,
+               rental_model.total_due, rental_model.payment_status)
+        .where(rental_model.id.in_(rental_ids))
+        .with_for_update()
+    ).all()
+    found = {row.id: row for row in rows}
+    unpaid = [row for row in rows if row.payment_status != 1]
+
+    results = {}
+    for rental_id in rental_ids:
+        row = found.get(rental_id)
+        if row is None:
+            results[rental_id] = 'not_found'
+        elif row.payment_status == 1:
+            results[rental_id] = 'already_paid'
+        else:
+            results[rental_id] = 'paid'
+
+    if not unpaid:
+        return results
+
+    now = datetime.now()
+    db.session.execute(
+        update(rental_model)
+        .where(rental_model.id.in_([row.id for row in unpaid]))
+        .values(payment_status=1, updated_at=now)
+    )
+    # 生成缺少的当前账期账单后结清全部欠费账单
+    ensure_current_bills(floor, unpaid)
+    settled = settle_open_bills(floor, [row.id for row in unpaid], paid_at=now)
+    db.session.execute(insert(records_model), [
+        {
+            'room_number': row.room_number,
+            'room_id': row.room_id,
+            'tenant_name': row.tenant_name,
+            'total_rent': settled.get(row.id, row.total_due),  # 结清的欠费金额，没有账单时为应缴费总额
+            'payment_date': now.date(),
+            'created_at': now
+        }
+        for row in unpaid
+    ])
+    if floor in SYNC_RENTAL_INFO_FLOORS:
+        info_model = models['rental_info']
+        db.session.execute(
+            update(info_model)
+            .where(info_model.room_number.in_({row.room_number for row in unpaid}))
+            .values(rental_status=1, updated_at=now)
+        )
+    db.session.commit()
+    return results
+
+
+def get_current_rental(floor, room_number, rental_id=None):
+    """房间当前的租房记录（缴费冲抵的对象），没有时返回 None
+
+    指定 rental_id 时取该记录（须属于该房间），否则取未退房的记录中ID最大的一条，都已退房时取ID最大的一条。
+    """
+    rental_model = FLOOR_MODELS[floor]['rental']
+    query = select(rental_model.id, rental_model.room_number, rental_model.room_id, rental_model.tenant_name,
+                   rental_model.monthly_rent, rental_model.water_fee, rental_model.electricity_fee,
+                   rental_model.utilities_fee, rental_model.total_due, rental_model.payment_status) \
+        .where(rental_model.room_number == room_number)
+    if rental_id is not None:
+        query = query.where(rental_model.id == rental_id)
+    return db.session.execute(
+        query.order_by(rental_model.check_out_date.is_not(None), rental_model.id.desc()).limit(1)
+    ).first()
+
+
+def record_room_payment(floor, room_number, tenant_name, amount, payment_date, rental_id=None):
+    """登记房间缴费：按账期从早到晚冲抵当前租房记录的欠费账单并写入缴费记录，在同一事务中提交
+
+    欠费全部结清后租房记录改为已缴费。缴费金额超过欠费时抛出 ValueError，不写入任何数据。
+
+    Args:
+        rental_id (int): 冲抵的租房记录，默认为房间当前的租房记录
+
+    Returns:
+        Decimal: 冲抵后剩余的欠费金额；没有欠费账单时返回 None
+    """
+    models = FLOOR_MODELS[floor]
+    rental_model = models['rental']
+    now = datetime.now()
+
+    rental = get_current_rental(floor, room_number, rental_id)
+    if rental is None:
+        db.session.rollback()
+        return None
+    if rental.payment_status == 2:
+        ensure_current_bills(floor, [rental])
+
+    try:
+        outstanding = apply_rental_payment(floor, rental.id, amount, paid_at=now)
+    except ValueError:
+        db.session.rollback()
+        raise
+    if outstanding is None:
+        db.session.rollback()
+        return None
+
+    db.session.execute(insert(models['records']), [{
+        'room_number': room_number,
+        'room_id': rental.room_id,
+        'tenant_name': tenant_name,
+        'total_rent': amount,
+        'payment_date': payment_date,
+        'created_at': now
+    }])
+    if outstanding <= 0:
+        db.session.execute(
+            update(rental_model)
+            .where(rental_model.id == rental.id)
+            .values(payment_status=1, updated_at=now)
+        )
+        if floor in SYNC_RENTAL_INFO_FLOORS:
+            info_model = models['rental_info']
+            db.session.execute(
+                update(info_model)
+                .where(info_model.room_number == room_number)
+                .values(rental_status=1, updated_at=now)
+            )
+    db.session.commit()
+    return outstanding
+
+
+def delete_payment_records(floor, record_ids):
+    """按ID列表批量删除缴费记录（一条 DELETE 语句），返回删除的条数"""
+    records_model = FLOOR_MODELS[floor]['records']
+    result = db.session.execute(
+        delete(records_model).where(records_model.id.in_(record_ids))
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+def roll_over_rentals(floor, period=None, dry_run=False, carry_utilities=False):
+    """月初结转：为楼层所有在租的租房记录开出新账期的账单
+
+    在同一事务中用一条 UPDATE 将租房记录重置为未缴费并重新计算应缴总额，再用一条
+    INSERT ... SELECT 生成账单，最后写入结转记录（billing_rollovers）。已有结转记录的账期跳过，
+    同一账期重复执行不会重复结转。结转前已生成该账期账单的记录（如月初结转前登记的缴费）不再重复生成，
+    其账单按重置后的应缴金额更新，已缴金额保留。
+    账期不是当前账期时（补开往期账单）只生成缺少的账单，不修改租房记录的缴费状态和应缴总额。
+
+    Args:
+        floor (str): 楼层，'old' 或 'new'
+        period (date): 账期（当月1日），默认当前账期
+        dry_run (bool): 只统计将要结转的记录数，不写入数据库
+        carry_utilities (bool): 沿用上月水电费；默认清零，待抄表后再录入
+
+    Returns:
+        int: 结转（或将要结转）的租房记录数，账期已结转时为 0
+    """
+    models = FLOOR_MODELS[floor]
+    rental_model = models['rental']
+    bills_model = models['bills']
+    period = period or current_period()
+    _, period_end = month_range(period.year, period.month)
+
+    rolled_over = db.session.execute(
+        select(BillingRollover.id).where(BillingRollover.floor == floor, BillingRollover.period == period)
+    ).first()
+    if rolled_over:
+        db.session.rollback()
+        return 0
+
+    # 在租：账期结束前已入住（或未填写入住日期），且账期开始前未退房
+    active = and_(
+        or_(rental_model.check_in_date.is_(None), rental_model.check_in_date < period_end),
+        or_(rental_model.check_out_date.is_(None), rental_model.check_out_date >= period),
+    )
+    has_bill = select(bills_model.id).where(bills_model.rental_id == rental_model.id,
+                                            bills_model.period == period).exists()
+    count = db.session.execute(select(func.count()).select_from(rental_model).where(active)).scalar()
+    if dry_run:
+        db.session.rollback()
+        return count
+
+    # 账单金额：月租加水电费（沿用上月或清零待抄表）
+    rent = func.coalesce(rental_model.monthly_rent, 0)
+    if carry_utilities:
+        water_fee = func.coalesce(rental_model.water_fee, 0)
+        electricity_fee = func.coalesce(rental_model.electricity_fee, 0)
+        amount_due = rent + func.coalesce(rental_model.utilities_fee, 0)
+    else:
+        water_fee = electricity_fee = literal(0)
+        amount_due = rent
+
+    now = datetime.now()
+    # 只有当前账期的结转会重置租房记录
+    if period == current_period() and count:
+        if floor in SYNC_RENTAL_INFO_FLOORS:
+            info_model = models['rental_info']
+            db.session.execute(
+                update(info_model)
+                .where(info_model.room_number.in_(select(rental_model.room_number).where(active)))
+                .values(rental_status=2, updated_at=now),
+                execution_options={'synchronize_session': False}
+            )
+
+        if carry_utilities:
+            values = {'total_due': rental_model.monthly_rent + func.coalesce(rental_model.utilities_fee, 0)}
+        else:
+            values = {'water_fee': 0, 'electricity_fee': 0, 'water_usage': 0, 'electricity_usage': 0,
+                      'utilities_fee': 0, 'total_due': rental_model.monthly_rent}
+        db.session.execute(
+            update(rental_model).where(active).values(payment_status=2, updated_at=now, **values),
+            execution_options={'synchronize_session': False}
+        )
+
+        # 结转前已生成的账单按重置后的金额更新，缴费状态随账单（须在生成新账单前查询）
+        early = db.session.execute(
+            select(rental_model).where(active, has_bill).execution_options(populate_existing=True)
+        ).scalars().all()
+        for rental in early:
+            sync_rental_bill(floor, rental, period)
+
+    bills_table = bills_model.__table__
+    db.session.execute(bills_table.insert().from_select(
+        ['floor', 'rental_id', 'room_number', 'tenant_name', 'period', 'rent', 'water_fee',
+         'electricity_fee', 'amount_due', 'amount_paid', 'status', 'created_at', 'updated_at'],
+        select(
+            literal(floor), rental_model.id, rental_model.room_number, rental_model.tenant_name,
+            literal(period), rent, water_fee, electricity_fee, amount_due, literal(0),
+            case((amount_due <= 0, BILL_PAID), else_=BILL_UNPAID), literal(now), literal(now)
+        ).where(active, ~has_bill).order_by(rental_model.id)
+    ))
+    db.session.add(BillingRollover(floor=floor, period=period, rental_count=count, created_at=now))
+    db.session.commit()
+    return count
+
+
+def register_billing_commands(app):
+    """注册账单相关命令：flask rollover"""
+
+    @app.cli.command('rollover')
+    @click.option('--floor', type=click.Choice(['old', 'new', 'all']), default='all', help='结转的楼层')
+    @click.option('--period', default=None, help='账期，格式 YYYY-MM，默认当月')
+    @click.option('--dry-run', is_flag=True, help='只统计将要结转的记录数，不写入数据库')
+    @click.option('--carry-utilities', is_flag=True, help='沿用上月水电费（默认清零，待抄表后录入）')
+    def rollover_command(floor, period, dry_run, carry_utilities):
+        """月初结转：为在租的租房记录生成新账期账单并重置缴费状态"""
+        if period:
+            try:
+                year, month = parse_month(period)
+            except ValueError:
+                raise click.BadParameter('账期格式应为 YYYY-MM', param_hint='--period')
+            period, _ = month_range(year, month)
+            if period > current_period():
+                raise click.BadParameter('不能结转还没有开始的账期', param_hint='--period')
+        else:
+            period = current_period()
+
+        floors = list(FLOOR_MODELS) if floor == 'all' else [floor]
+        prefix = '[试运行] ' if dry_run else ''
+        total_started = time.perf_counter()
+        for name in floors:
+            started = time.perf_counter()
+            count = roll_over_rentals(name, period, dry_run=dry_run, carry_utilities=carry_utilities)
+            elapsed = (time.perf_counter() - started) * 1000
+            action = '将结转' if dry_run else '已结转'
+            click.echo(f"{prefix}{FLOOR_NAMES[name]} {period:%Y-%m}: {action} {count} 条租房记录，耗时 {elapsed:.1f} ms")
+        click.echo(f"{prefix}完成，总耗时 {(time.perf_counter() - total_started) * 1000:.1f} ms")
@@ -13,34 +13,45 @@ CREATE TABLE admin (
     last_login TIMESTAMP NULL
 );
 
--- 联系人表（旧 - 五楼）
-DROP TABLE IF EXISTS contacts_old CASCADE;
-CREATE TABLE contacts_old (
+-- 房间管理表（五楼、六楼共用，floor 列区分楼层：old=五楼, new=六楼）
+DROP TABLE IF EXISTS rooms CASCADE;
+CREATE TABLE rooms (
     id SERIAL PRIMARY KEY,
-    name VARCHAR(50) NOT NULL,
-    roomId VARCHAR(20) NOT NULL,
-    phone VARCHAR(20) NOT NULL,
-    id_card VARCHAR(18) NOT NULL UNIQUE,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    floor VARCHAR(10) NOT NULL,
+    room_number VARCHAR(50) NOT NULL,
+    room_type VARCHAR(50) NOT NULL DEFAULT '单间',
+    deposit DECIMAL(10, 2) NOT NULL DEFAULT 0.00,
+    base_rent DECIMAL(10, 2) NOT NULL DEFAULT 0.00,
+    room_status SMALLINT NOT NULL DEFAULT 1, -- 1=空闲, 2=已出租, 3=维修中, 4=停用
+    water_meter_number VARCHAR(50),
+    electricity_meter_number VARCHAR(50),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (floor, room_number)
 );
 
--- 联系人表（新 - 六楼）
-DROP TABLE IF EXISTS contacts_new CASCADE;
-CREATE TABLE contacts_new (
+-- 联系人表（五楼、六楼共用，floor 列区分楼层：old=五楼, new=六楼）
+DROP TABLE IF EXISTS contacts CASCADE;
+CREATE TABLE contacts (
     id SERIAL PRIMARY KEY,
+    floor VARCHAR(10) NOT NULL,
     name VARCHAR(50) NOT NULL,
     roomId VARCHAR(20) NOT NULL,
+    room_id INTEGER REFERENCES rooms(id) ON DELETE SET NULL,
     phone VARCHAR(20) NOT NULL,
-    id_card VARCHAR(18) NOT NULL UNIQUE,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    id_card VARCHAR(18) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (floor, id_card)
 );
 
--- 合同表（旧 - 五楼）
-DROP TABLE IF EXISTS contracts_old CASCADE;
-CREATE TABLE contracts_old (
+-- 合同表（五楼、六楼共用，floor 列区分楼层：old=五楼, new=六楼）
+DROP TABLE IF EXISTS contracts CASCADE;
+CREATE TABLE contracts (
     id SERIAL PRIMARY KEY,
-    contract_number VARCHAR(50) NOT NULL UNIQUE,
+    floor VARCHAR(10) NOT NULL,
+    contract_number VARCHAR(50) NOT NULL,
     room_number VARCHAR(50) NOT NULL,
+    room_id INTEGER REFERENCES rooms(id) ON DELETE SET NULL,
     tenant_name VARCHAR(50) NOT NULL,
     tenant_phone VARCHAR(20) NOT NULL,
     tenant_id_card VARCHAR(18) NOT NULL,
@@ -61,43 +72,17 @@ CREATE TABLE contracts_old (
     special_agreement TEXT,
     remarks TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
-
--- 合同表（新 - 六楼）
-DROP TABLE IF EXISTS contracts_new CASCADE;
-CREATE TABLE contracts_new (
-    id SERIAL PRIMARY KEY,
-    contract_number VARCHAR(50) NOT NULL UNIQUE,
-    room_number VARCHAR(50) NOT NULL,
-    tenant_name VARCHAR(50) NOT NULL,
-    tenant_phone VARCHAR(20) NOT NULL,
-    tenant_id_card VARCHAR(18) NOT NULL,
-    landlord_name VARCHAR(50) NOT NULL DEFAULT '房东',
-    landlord_phone VARCHAR(20),
-    monthly_rent DECIMAL(10, 2) NOT NULL DEFAULT 0.00,
-    deposit DECIMAL(10, 2) NOT NULL DEFAULT 0.00,
-    contract_start_date DATE,
-    contract_end_date DATE,
-    contract_duration INTEGER NOT NULL DEFAULT 0,
-    payment_method VARCHAR(50) NOT NULL DEFAULT '月付',
-    rent_due_date INTEGER NOT NULL DEFAULT 1,
-    contract_status SMALLINT NOT NULL DEFAULT 1,
-    utilities_included SMALLINT NOT NULL DEFAULT 0,
-    water_rate DECIMAL(6, 2) DEFAULT 3.50,
-    electricity_rate DECIMAL(6, 2) DEFAULT 0.60,
-    contract_terms TEXT,
-    special_agreement TEXT,
-    remarks TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (floor, contract_number)
 );
 
--- 租房信息表（旧 - 五楼）
-DROP TABLE IF EXISTS rental_info_old CASCADE;
-CREATE TABLE rental_info_old (
+-- 租房信息表（五楼、六楼共用，floor 列区分楼层：old=五楼, new=六楼）
+DROP TABLE IF EXISTS rental_info CASCADE;
+CREATE TABLE rental_info (
     id SERIAL PRIMARY KEY,
+    floor VARCHAR(10) NOT NULL,
     room_number VARCHAR(50) NOT NULL,
+    room_id INTEGER REFERENCES rooms(id) ON DELETE SET NULL,
     tenant_name VARCHAR(50) NOT NULL,
     phone VARCHAR(20) NOT NULL,
     deposit DECIMAL(10, 2) NOT NULL DEFAULT 0.00,
@@ -109,27 +94,13 @@ CREATE TABLE rental_info_old (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
--- 租房信息表（新 - 六楼）
-DROP TABLE IF EXISTS rental_info_new CASCADE;
-CREATE TABLE rental_info_new (
-    id SERIAL PRIMARY KEY,
-    room_number VARCHAR(50) NOT NULL,
-    tenant_name VARCHAR(50) NOT NULL,
-    phone VARCHAR(20) NOT NULL,
-    deposit DECIMAL(10, 2) NOT NULL DEFAULT 0.00,
-    occupant_count INTEGER NOT NULL DEFAULT 1,
-    check_in_date DATE,
-    rental_status SMALLINT NOT NULL DEFAULT 1,
-    remarks TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
-
--- 租房管理表（旧 - 五楼）
-DROP TABLE IF EXISTS rental_old CASCADE;
-CREATE TABLE rental_old (
+-- 租房管理表（五楼、六楼共用，floor 列区分楼层：old=五楼, new=六楼）
+DROP TABLE IF EXISTS rental CASCADE;
+CREATE TABLE rental (
     id SERIAL PRIMARY KEY,
+    floor VARCHAR(10) NOT NULL,
     room_number VARCHAR(50) NOT NULL,
+    room_id INTEGER REFERENCES rooms(id) ON DELETE SET NULL,
     tenant_name VARCHAR(50) NOT NULL,
     deposit DECIMAL(10, 2) NOT NULL DEFAULT 0.00,
     monthly_rent DECIMAL(10, 2) NOT NULL DEFAULT 0.00,
@@ -149,91 +120,129 @@ CREATE TABLE rental_old (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
--- 租房管理表（新 - 六楼）
-DROP TABLE IF EXISTS rental_new CASCADE;
-CREATE TABLE rental_new (
-    id SERIAL PRIMARY KEY,
-    room_number VARCHAR(50) NOT NULL,
-    tenant_name VARCHAR(50) NOT NULL,
-    deposit DECIMAL(10, 2) NOT NULL DEFAULT 0.00,
-    monthly_rent DECIMAL(10, 2) NOT NULL DEFAULT 0.00,
-    water_fee DECIMAL(10, 2) DEFAULT 0.00,
-    electricity_fee DECIMAL(10, 2) DEFAULT 0.00,
-    water_usage DECIMAL(10, 2) DEFAULT 0.00,
-    electricity_usage DECIMAL(10, 2) DEFAULT 0.00,
-    utilities_fee DECIMAL(10, 2) DEFAULT 0.00,
-    total_due DECIMAL(10, 2) DEFAULT 0.00,
-    payment_status SMALLINT NOT NULL DEFAULT 1,
-    check_in_date DATE,
-    check_out_date DATE,
-    contract_start_date DATE,
-    contract_end_date DATE,
-    remarks TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
-
--- 缴费记录表（旧 - 五楼）
-DROP TABLE IF EXISTS rental_records_old CASCADE;
-CREATE TABLE rental_records_old (
+-- 缴费记录表（五楼、六楼共用，floor 列区分楼层：old=五楼, new=六楼）
+DROP TABLE IF EXISTS rental_records CASCADE;
+CREATE TABLE rental_records (
     id SERIAL PRIMARY KEY,
+    floor VARCHAR(10) NOT NULL,
     room_number VARCHAR(50) NOT NULL,
+    room_id INTEGER REFERENCES rooms(id) ON DELETE SET NULL,
     tenant_name VARCHAR(50) NOT NULL,
     total_rent DECIMAL(10, 2) NOT NULL DEFAULT 0.00,
     payment_date DATE,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
--- 缴费记录表（新 - 六楼）
-DROP TABLE IF EXISTS rental_records_new CASCADE;
-CREATE TABLE rental_records_new (
+-- 月度账单表（每个租房记录每个账期一条，period 为账期当月1日；五楼、六楼共用，floor 列区分楼层）
+DROP TABLE IF EXISTS bills CASCADE;
+CREATE TABLE bills (
     id SERIAL PRIMARY KEY,
+    floor VARCHAR(10) NOT NULL,
+    rental_id INTEGER NOT NULL,
     room_number VARCHAR(50) NOT NULL,
     tenant_name VARCHAR(50) NOT NULL,
-    total_rent DECIMAL(10, 2) NOT NULL DEFAULT 0.00,
-    payment_date DATE,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    period DATE NOT NULL,
+    rent DECIMAL(10, 2) NOT NULL DEFAULT 0.00,
+    water_fee DECIMAL(10, 2) NOT NULL DEFAULT 0.00,
+    electricity_fee DECIMAL(10, 2) NOT NULL DEFAULT 0.00,
+    amount_due DECIMAL(10, 2) NOT NULL DEFAULT 0.00,
+    amount_paid DECIMAL(10, 2) NOT NULL DEFAULT 0.00,
+    status SMALLINT NOT NULL DEFAULT 2, -- 1=已结清, 2=未缴费, 3=部分缴费
+    paid_at TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_bills_rental_period UNIQUE (rental_id, period)
 );
 
--- 房间管理表（旧 - 五楼）
-DROP TABLE IF EXISTS rooms_old CASCADE;
-CREATE TABLE rooms_old (
+-- 月初结转记录表（每个楼层每个账期结转完成后一条，用于判断账期是否已结转）
+DROP TABLE IF EXISTS billing_rollovers CASCADE;
+CREATE TABLE billing_rollovers (
     id SERIAL PRIMARY KEY,
-    room_number VARCHAR(50) NOT NULL UNIQUE,
-    room_type VARCHAR(50) NOT NULL DEFAULT '单间',
-    deposit DECIMAL(10, 2) NOT NULL DEFAULT 0.00,
-    base_rent DECIMAL(10, 2) NOT NULL DEFAULT 0.00,
-    room_status SMALLINT NOT NULL DEFAULT 1, -- 1=空闲, 2=已出租, 3=维修中, 4=停用
-    water_meter_number VARCHAR(50),
-    electricity_meter_number VARCHAR(50),
+    floor VARCHAR(10) NOT NULL,
+    period DATE NOT NULL,
+    rental_count INTEGER NOT NULL DEFAULT 0,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    CONSTRAINT uq_billing_rollovers_floor_period UNIQUE (floor, period)
 );
 
--- 房间管理表（新 - 六楼）
-DROP TABLE IF EXISTS rooms_new CASCADE;
-CREATE TABLE rooms_new (
+-- 水电表抄表记录表（每块表每个账期一条；五楼、六楼共用，floor 列区分楼层）
+DROP TABLE IF EXISTS meter_readings CASCADE;
+CREATE TABLE meter_readings (
     id SERIAL PRIMARY KEY,
-    room_number VARCHAR(50) NOT NULL UNIQUE,
-    room_type VARCHAR(50) NOT NULL DEFAULT '单间',
-    deposit DECIMAL(10, 2) NOT NULL DEFAULT 0.00,
-    base_rent DECIMAL(10, 2) NOT NULL DEFAULT 0.00,
-    room_status SMALLINT NOT NULL DEFAULT 1,
-    water_meter_number VARCHAR(50),
-    electricity_meter_number VARCHAR(50),
+    floor VARCHAR(10) NOT NULL,
+    room_number VARCHAR(50) NOT NULL,
+    meter_type VARCHAR(20) NOT NULL, -- water=水表, electricity=电表
+    meter_number VARCHAR(50) NOT NULL,
+    period DATE NOT NULL,
+    reading DECIMAL(12, 2) NOT NULL,
+    usage DECIMAL(12, 2),
+    read_on DATE,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    CONSTRAINT uq_meter_readings_meter_period UNIQUE (floor, meter_number, period)
+);
+
+-- 水电费单价表（floor 为空表示全部楼层；按生效日期取最近一条，合同单价优先）
+DROP TABLE IF EXISTS utility_rates CASCADE;
+CREATE TABLE utility_rates (
+    id SERIAL PRIMARY KEY,
+    floor VARCHAR(10),
+    water_rate DECIMAL(6, 2),
+    electricity_rate DECIMAL(6, 2),
+    effective_from DATE NOT NULL,
+    remarks VARCHAR(200),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 全局搜索索引表（由 search.py 维护，flask search-reindex 重建）
+CREATE TABLE search_index (
+    id SERIAL PRIMARY KEY,
+    floor VARCHAR(10) NOT NULL,
+    entity VARCHAR(20) NOT NULL,
+    entity_id INTEGER NOT NULL,
+    title VARCHAR(100) NOT NULL,
+    subtitle VARCHAR(200),
+    room_number VARCHAR(50),
+    search_text TEXT NOT NULL,
+    pinyin VARCHAR(200),
+    initials VARCHAR(50),
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_search_index_entity UNIQUE (entity, entity_id)
 );
 
 -- 创建索引
-CREATE INDEX idx_contacts_old_room ON contacts_old(roomId);
-CREATE INDEX idx_contacts_new_room ON contacts_new(roomId);
-CREATE INDEX idx_rental_old_room ON rental_old(room_number);
-CREATE INDEX idx_rental_new_room ON rental_new(room_number);
-CREATE INDEX idx_contracts_old_room ON contracts_old(room_number);
-CREATE INDEX idx_contracts_new_room ON contracts_new(room_number);
-CREATE INDEX idx_rental_records_old_room ON rental_records_old(room_number);
-CREATE INDEX idx_rental_records_new_room ON rental_records_new(room_number);
+CREATE INDEX idx_contacts_floor_room ON contacts(floor, roomId);
+CREATE INDEX idx_contacts_floor_phone ON contacts(floor, phone);
+CREATE INDEX idx_rental_floor_room ON rental(floor, room_number);
+CREATE INDEX idx_rental_floor_created ON rental(floor, created_at);
+CREATE INDEX idx_rental_floor_unpaid ON rental(floor, room_number) WHERE payment_status = 2;
+CREATE INDEX idx_rental_records_floor_room ON rental_records(floor, room_number);
+CREATE INDEX idx_rental_records_floor_payment_date ON rental_records(floor, payment_date);
+CREATE INDEX idx_rental_records_floor_created ON rental_records(floor, created_at);
+CREATE INDEX idx_rooms_floor_room ON rooms(floor, room_number);
+CREATE INDEX idx_rooms_floor_status ON rooms(floor, room_status);
+CREATE INDEX idx_contracts_floor_room ON contracts(floor, room_number);
+CREATE INDEX idx_contracts_floor_number ON contracts(floor, contract_number);
+CREATE INDEX idx_contracts_floor_status_end ON contracts(floor, contract_status, contract_end_date);
+CREATE INDEX idx_rental_info_floor_room ON rental_info(floor, room_number);
+CREATE INDEX idx_rental_info_floor_status ON rental_info(floor, rental_status);
+CREATE INDEX idx_bills_floor_period_status ON bills(floor, period, status);
+CREATE INDEX idx_bills_floor_arrears ON bills(floor, room_number, period) WHERE status != 1;
+CREATE INDEX idx_meter_readings_floor_room_period ON meter_readings(floor, room_number, period);
+CREATE INDEX idx_utility_rates_floor_effective ON utility_rates(floor, effective_from);
+CREATE INDEX idx_contacts_room_id ON contacts(room_id);
+CREATE INDEX idx_rental_room_id ON rental(room_id);
+CREATE INDEX idx_rental_records_room_id ON rental_records(room_id);
+CREATE INDEX idx_contracts_room_id ON contracts(room_id);
+CREATE INDEX idx_rental_info_room_id ON rental_info(room_id);
+CREATE INDEX idx_search_index_floor_entity ON search_index(floor, entity);
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX idx_search_index_search_text_trgm ON search_index USING gin (search_text gin_trgm_ops);
+CREATE INDEX idx_search_index_pinyin_trgm ON search_index USING gin (pinyin gin_trgm_ops);
+CREATE INDEX idx_search_index_initials_trgm ON search_index USING gin (initials gin_trgm_ops);
+CREATE INDEX idx_search_index_search_text_prefix ON search_index(search_text text_pattern_ops);
+CREATE INDEX idx_search_index_room_number_prefix ON search_index(room_number text_pattern_ops);
+CREATE INDEX idx_search_index_pinyin_prefix ON search_index(pinyin text_pattern_ops);
+CREATE INDEX idx_search_index_initials_prefix ON search_index(initials text_pattern_ops);
 
 -- 插入默认管理员账户（密码：admin123）
 INSERT INTO admin (admin_name, password) VALUES 
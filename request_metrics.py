@@ -0,0 +1,167 @@
+import threading
+import time
+from flask import g, has_request_context, request, Response
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# 直方图分桶上限
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+def _label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{name}="{_label_value(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    """Prometheus 直方图（按标签分组的累计分桶计数、总和与次数）"""
+
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = tuple(buckets) + (float('inf'),)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted((labels, [list(data[0]), data[1], data[2]]) for labels, data in self._series.items())
+        for labels, (counts, total, count) in series:
+            for bound, bucket_count in zip(self.buckets, counts):
+                le = f'le="{_number(bound)}"'
+                lines.append(f'{self.name}_bucket{_labels(self.label_names, labels, le)} {bucket_count}')
+            lines.append(f'{self.name}_sum{_labels(self.label_names, labels)} {_number(total)}')
+            lines.append(f'{self.name}_count{_labels(self.label_names, labels)} {count}')
+        return lines
+
+
+class Counter:
+    """Prometheus 计数器"""
+
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            lines.append(f'{self.name}{_labels(self.label_names, labels)} {value}')
+        return lines
+
+
+class RequestMetrics:
+    """按接口统计请求耗时、SQL 语句数、数据库耗时和响应大小
+
+    每个请求的数据写入 Prometheus 格式的直方图（/metrics），并通过 Server-Timing 响应头返回，
+    可在浏览器开发者工具中直接查看。指标保存在进程内，多进程部署时每个进程分别统计。
+    流式响应（导出、下载）的耗时为开始发送响应前的耗时，响应大小未知时不计入大小直方图。
+    """
+
+    def __init__(self):
+        self.requests = Counter('http_requests_total', '请求次数', ('endpoint', 'method', 'status'))
+        self.duration = Histogram('http_request_duration_seconds', '请求处理耗时（秒）',
+                                  ('endpoint', 'method'), DURATION_BUCKETS)
+        self.db_queries = Histogram('http_request_db_queries', '每个请求执行的 SQL 语句数',
+                                    ('endpoint', 'method'), QUERY_COUNT_BUCKETS)
+        self.db_duration = Histogram('http_request_db_duration_seconds', '每个请求的数据库耗时（秒）',
+                                     ('endpoint', 'method'), DURATION_BUCKETS)
+        self.response_size = Histogram('http_response_size_bytes', '响应大小（字节）',
+                                       ('endpoint', 'method'), SIZE_BUCKETS)
+
+    def init_app(self, app, path='/metrics'):
+        """注册请求钩子、SQL 执行事件和指标接口"""
+        if not app.config.get('METRICS_ENABLED', True):
+            return
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+        app.add_url_rule(path, 'metrics', self.metrics_view)
+
+    @staticmethod
+    def _start():
+        g.metrics_started = time.perf_counter()
+        g.metrics_queries = 0
+        g.metrics_db_time = 0.0
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context():
+            conn.info.setdefault('metrics_query_started', []).append(time.perf_counter())
+
+    @staticmethod
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get('metrics_query_started')
+        if not started or not has_request_context() or 'metrics_started' not in g:
+            return
+        g.metrics_queries += 1
+        g.metrics_db_time += time.perf_counter() - started.pop()
+
+    def _finish(self, response):
+        if 'metrics_started' not in g or request.endpoint == 'metrics':
+            return response
+        elapsed = time.perf_counter() - g.metrics_started
+        labels = (request.endpoint or 'unmatched', request.method)
+
+        self.requests.inc(labels + (str(response.status_code),))
+        self.duration.observe(labels, elapsed)
+        self.db_queries.observe(labels, g.metrics_queries)
+        self.db_duration.observe(labels, g.metrics_db_time)
+        size = response.calculate_content_length()
+        if size is not None:
+            self.response_size.observe(labels, size)
+
+        response.headers.add(
+            'Server-Timing',
+            f'app;dur={elapsed * 1000:.1f}, db;dur={g.metrics_db_time * 1000:.1f};desc="{g.metrics_queries} queries"'
+        )
+        return response
+
+    def render(self):
+        """生成 Prometheus 文本格式的全部指标"""
+        lines = []
+        for metric in (self.requests, self.duration, self.db_queries, self.db_duration, self.response_size):
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def metrics_view(self):
+        return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+
+request_metrics = RequestMetrics()
@@ -0,0 +1,266 @@
+import logging
+import sqlite3
+from datetime import datetime
+import click
+from sqlalchemy import DDL, event, select, delete, insert, func, or_, and_, text
+from sqlalchemy.orm import Session
+from models import db, FLOOR_MODELS, SearchEntry, Contact, Contract, RentalInfo, Room
+
+logger = logging.getLogger(__name__)
+
+try:
+    from pypinyin import lazy_pinyin, Style
+except ImportError:  # 未安装 pypinyin 时不支持拼音检索
+    lazy_pinyin = None
+    logger.warning('未安装 pypinyin，搜索索引不生成姓名拼音，拼音和首字母检索不可用（pip install pypinyin）')
+
+# 参与搜索的数据类型（FLOOR_MODELS 中的键）及排序时的优先级
+SEARCH_ENTITIES = {'rental_info': 4, 'contacts': 3, 'contracts': 2, 'rooms': 1}
+ENTITY_LABELS = {'rental_info': '租户', 'contacts': '联系人', 'contracts': '合同', 'rooms': '房间'}
+_BASE_MODELS = {RentalInfo: 'rental_info', Contact: 'contacts', Contract: 'contracts', Room: 'rooms'}
+
+# 三元组索引要求关键词至少3个字符，更短的关键词（两字姓名、姓氏、首字母等）按前缀匹配
+TRIGRAM_MIN_LENGTH = 3
+
+# PostgreSQL：pg_trgm GIN 索引，支持 LIKE '%关键词%' 和相似度排序
+event.listen(SearchEntry.__table__, 'after_create',
+             DDL('CREATE EXTENSION IF NOT EXISTS pg_trgm').execute_if(dialect='postgresql'))
+for column in ('search_text', 'pinyin', 'initials'):
+    event.listen(SearchEntry.__table__, 'after_create', DDL(
+        f'CREATE INDEX IF NOT EXISTS idx_search_index_{column}_trgm ON search_index USING gin ({column} gin_trgm_ops)'
+    ).execute_if(dialect='postgresql'))
+
+
+def _sqlite_fts_supported(ddl, target, bind, **kw):
+    """SQLite 3.34 起支持 FTS5 三元组分词"""
+    return bind.dialect.name == 'sqlite' and sqlite3.sqlite_version_info >= (3, 34)
+
+
+# SQLite：以 search_index 为外部内容的 FTS5 影子表，由触发器保持同步
+for statement in (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_index_fts USING fts5("
+    "search_text, pinyin, initials, content='search_index', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS search_index_ai AFTER INSERT ON search_index BEGIN "
+    "INSERT INTO search_index_fts(rowid, search_text, pinyin, initials) "
+    "VALUES (new.id, new.search_text, new.pinyin, new.initials); END",
+    "CREATE TRIGGER IF NOT EXISTS search_index_ad AFTER DELETE ON search_index BEGIN "
+    "INSERT INTO search_index_fts(search_index_fts, rowid, search_text, pinyin, initials) "
+    "VALUES ('delete', old.id, old.search_text, old.pinyin, old.initials); END",
+    "CREATE TRIGGER IF NOT EXISTS search_index_au AFTER UPDATE ON search_index BEGIN "
+    "INSERT INTO search_index_fts(search_index_fts, rowid, search_text, pinyin, initials) "
+    "VALUES ('delete', old.id, old.search_text, old.pinyin, old.initials); "
+    "INSERT INTO search_index_fts(rowid, search_text, pinyin, initials) "
+    "VALUES (new.id, new.search_text, new.pinyin, new.initials); END",
+):
+    event.listen(SearchEntry.__table__, 'after_create', DDL(statement).execute_if(callable_=_sqlite_fts_supported))
+
+
+def pinyin_keys(name):
+    """返回姓名的 (全拼, 首字母)，如 张三 -> ('zhangsan', 'zs')；未安装 pypinyin 时返回空字符串"""
+    if not name or lazy_pinyin is None:
+        return '', ''
+    full = ''.join(lazy_pinyin(name)).lower()
+    initials = ''.join(lazy_pinyin(name, style=Style.FIRST_LETTER)).lower()
+    return full, initials
+
+
+def _document(entity, row):
+    """生成数据行的索引内容"""
+    if entity == 'rental_info':
+        name, room, terms = row.tenant_name, row.room_number, [row.phone]
+        subtitle = f'房间 {room}，电话 {row.phone}'
+    elif entity == 'contacts':
+        name, room, terms = row.name, row.roomId, [row.phone]
+        subtitle = f'房间 {room}，电话 {row.phone}'
+    elif entity == 'contracts':
+        name, room, terms = row.tenant_name, row.room_number, [row.tenant_phone, row.contract_number]
+        subtitle = f'合同 {row.contract_number}，房间 {room}'
+    else:
+        name, room, terms = None, row.room_number, [row.room_type, row.water_meter_number, row.electricity_meter_number]
+        subtitle = row.room_type
+
+    pinyin, initials = pinyin_keys(name)
+    words = [value for value in [name, room, *terms] if value]
+    return {
+        'floor': row.floor,
+        'entity': entity,
+        'entity_id': row.id,
+        'title': name or f'{room} 房间',
+        'subtitle': subtitle,
+        'room_number': room,
+        'search_text': ' '.join(str(value).strip().lower() for value in words),
+        'pinyin': pinyin,
+        'initials': initials,
+        'updated_at': datetime.now()
+    }
+
+
+def rebuild_search_index(connection):
+    """重建全部搜索索引，返回索引条数"""
+    connection.execute(delete(SearchEntry.__table__))
+    documents = []
+    for floor, models in FLOOR_MODELS.items():
+        for entity in SEARCH_ENTITIES:
+            table = models[entity].__table__
+            rows = connection.execute(select(table).where(table.c.floor == floor)).all()
+            documents.extend(_document(entity, row) for row in rows)
+    if documents:
+        connection.execute(insert(SearchEntry.__table__), documents)
+    return len(documents)
+
+
+def _entity_of(obj):
+    for model, entity in _BASE_MODELS.items():
+        if isinstance(obj, model):
+            return entity
+    return None
+
+
+@event.listens_for(Session, 'after_flush')
+def _sync_search_index(session, flush_context):
+    """租户信息、联系人、合同、房间增删改后，在同一事务中更新对应的索引行"""
+    changed = [(_entity_of(obj), obj) for obj in session.new | session.dirty if _entity_of(obj)]
+    deleted = [(_entity_of(obj), obj) for obj in session.deleted if _entity_of(obj)]
+    if not changed and not deleted:
+        return
+
+    table = SearchEntry.__table__
+    connection = session.connection()
+    connection.execute(delete(table).where(or_(*[
+        and_(table.c.entity == entity, table.c.entity_id == obj.id) for entity, obj in changed + deleted
+    ])))
+    if changed:
+        connection.execute(insert(table), [_document(entity, obj) for entity, obj in changed])
+
+
+def _escape_like(term):
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+# 各数据库引擎是否已建 FTS5 影子表，每个引擎只查询一次 sqlite_master
+_fts_engines = {}
+
+
+def _uses_fts():
+    """SQLite 上已建 FTS5 影子表时走全文索引"""
+    engine = db.engine
+    if engine not in _fts_engines:
+        _fts_engines[engine] = engine.dialect.name == 'sqlite' and bool(db.session.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index_fts'"
+        )).first())
+    return _fts_engines[engine]
+
+
+def _prefix_condition(column, term):
+    """列值以关键词开头：SQLite 上用范围条件走 B-tree 索引，PostgreSQL 上用 LIKE 走 text_pattern_ops 索引"""
+    if db.engine.dialect.name == 'sqlite':
+        return and_(column >= term, column < term[:-1] + chr(ord(term[-1]) + 1))
+    return column.like(f'{_escape_like(term)}%', escape='\\')
+
+
+def _match_condition(term):
+    """关键词匹配条件
+
+    至少3个字符时：检索文本包含关键词（SQLite 走 FTS5 三元组索引，PostgreSQL 走 pg_trgm 索引），
+    或姓名全拼、首字母以关键词开头。
+    少于3个字符时三元组索引无法使用，只按前缀匹配：检索文本（以姓名开头，房间为房号）、房号、
+    姓名全拼或首字母以关键词开头，例如“张”“张三”“zs”“50”；姓名中间的字（如用“三”搜“张三”）匹配不到。
+    """
+    if len(term) < TRIGRAM_MIN_LENGTH:
+        return or_(*[_prefix_condition(column, term) for column in (
+            SearchEntry.search_text, SearchEntry.room_number, SearchEntry.pinyin, SearchEntry.initials
+        )])
+    if _uses_fts():
+        fts_ids = text('SELECT rowid FROM search_index_fts WHERE search_index_fts MATCH :query').bindparams(
+            query='"' + term.replace('"', '""') + '"'
+        ).columns(rowid=db.Integer)
+        return SearchEntry.id.in_(select(fts_ids.subquery().c.rowid))
+    escaped = _escape_like(term)
+    return or_(
+        SearchEntry.search_text.like(f'%{escaped}%', escape='\\'),
+        _prefix_condition(SearchEntry.pinyin, term),
+        _prefix_condition(SearchEntry.initials, term),
+    )
+
+
+def contains_condition(columns, term):
+    """任一列包含关键词（LIKE '%关键词%'），用于索引只能前缀匹配的短关键词"""
+    escaped = _escape_like(term)
+    return or_(*[column.like(f'%{escaped}%', escape='\\') for column in columns])
+
+
+def match_ids(term, floor, entity):
+    """返回指定楼层、数据类型中匹配关键词的数据ID"""
+    term = (term or '').strip().lower()
+    return db.session.execute(
+        select(SearchEntry.entity_id).where(
+            SearchEntry.floor == floor, SearchEntry.entity == entity, _match_condition(term)
+        )
+    ).scalars().all()
+
+
+def _score(entry, term):
+    """相关度：完全匹配 > 前缀匹配 > 拼音首字母 > 全拼 > 包含"""
+    words = entry.search_text.split()
+    if term in words or term == entry.title.lower():
+        score = 100
+    elif any(word.startswith(term) for word in words):
+        score = 80
+    elif entry.initials and entry.initials == term:
+        score = 75
+    elif entry.initials and entry.initials.startswith(term):
+        score = 60
+    elif entry.pinyin and entry.pinyin.startswith(term):
+        score = 55
+    else:
+        score = 40
+    return score + SEARCH_ENTITIES.get(entry.entity, 0)
+
+
+def search(term, floor=None, entities=None, limit=20):
+    """跨租户信息、联系人、合同、房间的统一搜索，按相关度排序
+
+    Args:
+        term (str): 关键词，可以是姓名、房号、电话、合同编号、表号或姓名拼音/首字母
+        floor (str): 限定楼层，为空时搜索全部楼层
+        entities (list): 限定数据类型，为空时搜索全部类型
+        limit (int): 最多返回条数
+    """
+    term = (term or '').strip().lower()
+    if not term:
+        return []
+
+    query = select(SearchEntry).where(_match_condition(term))
+    if floor:
+        query = query.where(SearchEntry.floor == floor)
+    if entities:
+        query = query.where(SearchEntry.entity.in_(entities))
+    if db.engine.dialect.name == 'postgresql':
+        query = query.order_by(func.similarity(SearchEntry.search_text, term).desc())
+    entries = db.session.execute(query.limit(limit * 5)).scalars().all()
+
+    ranked = sorted(entries, key=lambda entry: (-_score(entry, term), len(entry.search_text), entry.id))[:limit]
+    return [{
+        'entity': entry.entity,
+        'entity_label': ENTITY_LABELS[entry.entity],
+        'id': entry.entity_id,
+        'floor': entry.floor,
+        'title': entry.title,
+        'subtitle': entry.subtitle or '',
+        'room_number': entry.room_number,
+        'score': _score(entry, term),
+        'url': f'/{entry.entity}_{entry.floor}'
+    } for entry in ranked]
+
+
+def register_search_commands(app):
+    """注册搜索索引命令：flask search-reindex"""
+
+    @app.cli.command('search-reindex')
+    def search_reindex_command():
+        """重建全局搜索索引"""
+        with db.engine.begin() as connection:
+            count = rebuild_search_index(connection)
+        click.echo(f"搜索索引重建完成，共 {count} 条")
+        if lazy_pinyin is None:
+            click.echo("注意：未安装 pypinyin，索引中没有姓名拼音，安装后需重新执行 flask search-reindex")
@@ -0,0 +1,156 @@
+from flask import abort
+from sqlalchemy import select
+from models import db
+
+# 状态显示文本
+PAYMENT_STATUS_TEXT = {1: '已缴费', 2: '未缴费'}
+ROOM_STATUS_TEXT = {1: '空闲', 2: '已出租', 3: '维修中', 4: '停用'}
+CONTRACT_STATUS_TEXT = {1: '有效', 2: '失效'}
+UTILITIES_INCLUDED_TEXT = {1: '包含', 2: '不包含'}
+
+
+class Field:
+    """输出字段
+
+    name 为输出的键名，source 为来源列名（默认与 name 相同），关联查询时用 '别名.列名' 引用关联的数据表。
+    值为空时输出 default。
+    """
+    default = None
+
+    def __init__(self, name, source=None, default=None):
+        self.name = name
+        self.source = source or name
+        if default is not None:
+            self.default = default
+
+    def column(self, models):
+        alias, _, attr = self.source.rpartition('.')
+        return getattr(models[alias], attr)
+
+    def format(self, value):
+        return self.default if value is None else value
+
+
+class Text(Field):
+    """文本，空值输出空字符串"""
+    default = ''
+
+
+class Money(Field):
+    """金额、用量等 Decimal 列，输出 float，空值输出 0"""
+    default = 0
+
+    def format(self, value):
+        return float(value) if value else self.default
+
+
+class Date(Field):
+    """日期，输出 YYYY-MM-DD，空值输出空字符串"""
+    default = ''
+
+    def format(self, value):
+        if value is None:
+            return self.default
+        return value.strftime('%Y-%m-%d') if hasattr(value, 'strftime') else str(value)
+
+
+class DateTime(Field):
+    """时间，输出 YYYY-MM-DD HH:MM:SS，空值输出 '-'"""
+    default = '-'
+
+    def format(self, value):
+        if value is None:
+            return self.default
+        return value.strftime('%Y-%m-%d %H:%M:%S') if hasattr(value, 'strftime') else str(value)
+
+
+class Label(Field):
+    """状态码对应的显示文本"""
+    default = '未知'
+
+    def __init__(self, name, source, labels, default=None):
+        super().__init__(name, source, default)
+        self.labels = labels
+
+    def format(self, value):
+        return self.labels.get(value, self.default)
+
+
+class Serializer:
+    """按接口声明输出字段，只查询这些字段对应的列
+
+    查询结果为行元组，不构造 ORM 对象、不进入 session 的 identity map，逐行按字段类型转换为可 JSON 序列化的字典。
+    """
+
+    def __init__(self, *fields):
+        self.fields = fields
+
+    def select(self, model, **joined):
+        """生成只包含输出字段的查询，joined 为关联查询中 '别名.列名' 引用的数据表"""
+        models = {'': model, **joined}
+        return select(*[field.column(models).label(field.name) for field in self.fields])
+
+    def dump(self, row):
+        return {field.name: field.format(value) for field, value in zip(self.fields, row)}
+
+    def all(self, statement):
+        return [self.dump(row) for row in db.session.execute(statement)]
+
+    def get_or_404(self, model, row_id):
+        row = db.session.execute(self.select(model).where(model.id == row_id)).first()
+        if row is None:
+            abort(404)
+        return self.dump(row)
+
+
+ROOM_DETAIL = Serializer(
+    Field('id'), Field('room_number'), Field('room_type'), Money('base_rent'), Money('deposit'),
+    Field('status', 'room_status'), Label('status_text', 'room_status', ROOM_STATUS_TEXT),
+    Field('water_meter_number'), Field('electricity_meter_number'), DateTime('created_at'), DateTime('updated_at')
+)
+
+AVAILABLE_ROOMS = Serializer(
+    Field('id'), Field('room_number'), Field('room_type'), Money('base_rent')
+)
+
+# 已出租房间：房间表关联租房信息表（别名 info）
+RENTED_ROOMS = Serializer(
+    Field('id'), Field('room_number'), Field('room_type'), Money('base_rent'), Money('deposit'),
+    Text('tenant_name', 'info.tenant_name'), Text('tenant_phone', 'info.phone'),
+    Money('rental_deposit', 'info.deposit'), Date('check_in_date', 'info.check_in_date')
+)
+
+CONTACT_DETAIL = Serializer(
+    Field('id'), Field('name'), Field('roomId'), Field('phone'), Field('id_card'), DateTime('created_at')
+)
+
+_RENTAL_INFO_FIELDS = (
+    Field('id'), Field('room_number'), Field('tenant_name'), Field('phone'), Money('deposit'),
+    Field('occupant_count'), Date('check_in_date'), Field('rental_status'),
+    Label('rental_status_text', 'rental_status', PAYMENT_STATUS_TEXT), Text('remarks')
+)
+RENTAL_INFO_LIST = Serializer(*_RENTAL_INFO_FIELDS)
+RENTAL_INFO_DETAIL = Serializer(*_RENTAL_INFO_FIELDS, DateTime('created_at'), DateTime('updated_at'))
+
+_RENTAL_FIELDS = (
+    Field('id'), Field('room_number'), Field('tenant_name'), Money('deposit'), Money('monthly_rent'),
+    Money('water_fee'), Money('electricity_fee'), Money('water_usage'), Money('electricity_usage'),
+    Money('utilities_fee'), Money('total_due'), Field('payment_status'),
+    Label('payment_status_text', 'payment_status', PAYMENT_STATUS_TEXT)
+)
+RENTAL_OLD_DETAIL = Serializer(*_RENTAL_FIELDS, Text('remarks'), DateTime('created_at'), DateTime('updated_at'))
+RENTAL_NEW_DETAIL = Serializer(
+    *_RENTAL_FIELDS, Date('check_in_date'), Date('check_out_date'), Date('contract_start_date'),
+    Date('contract_end_date'), Text('remarks'), DateTime('created_at'), DateTime('updated_at')
+)
+
+CONTRACT_DETAIL = Serializer(
+    Field('id'), Field('contract_number'), Field('room_number'), Field('tenant_name'), Field('tenant_phone'),
+    Field('tenant_id_card'), Field('landlord_name'), Field('landlord_phone'), Money('monthly_rent'),
+    Money('deposit'), Date('contract_start_date'), Date('contract_end_date'), Field('contract_duration'),
+    Field('payment_method'), Date('rent_due_date'), Field('contract_status'),
+    Label('contract_status_text', 'contract_status', CONTRACT_STATUS_TEXT), Field('utilities_included'),
+    Label('utilities_included_text', 'utilities_included', UTILITIES_INCLUDED_TEXT), Money('water_rate'),
+    Money('electricity_rate'), Text('contract_terms'), Text('special_agreement'), Text('remarks'),
+    DateTime('created_at'), DateTime('updated_at')
+)
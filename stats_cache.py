@@ -0,0 +1,84 @@
+import threading
+import time
+from functools import wraps
+from flask import request
+
+
+class StatsCache:
+    """按楼层缓存首页统计数据的进程内缓存
+
+    缓存项在 TTL 到期后失效；租房、房间、合同等数据发生变更时由写操作接口主动清除。
+    每个楼层有一个版本号，清除时加一；计算期间版本号发生变化（计算结果可能是写入前的数据）时不写入缓存。
+    """
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._generations = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _current_generation(self, key):
+        return self._generation, self._generations.get(key, 0)
+
+    def get_or_compute(self, key, compute):
+        """命中缓存直接返回，否则调用 compute() 计算并写入缓存"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._current_generation(key)
+
+        value = compute()
+        with self._lock:
+            if self._current_generation(key) == generation:
+                self._entries[key] = (time.monotonic() + self.ttl, value)
+        return value
+
+    def invalidate(self, key=None):
+        """清除指定楼层的缓存，key 为空时清除全部"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._generation += 1
+            else:
+                self._entries.pop(key, None)
+                self._generations[key] = self._generations.get(key, 0) + 1
+
+    def info(self):
+        """返回缓存命中统计"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0,
+                'entries': len(self._entries),
+                'ttl': self.ttl
+            }
+
+
+stats_cache = StatsCache()
+
+
+def invalidates_stats(*floors):
+    """写操作接口装饰器：请求处理完成后清除对应楼层的统计缓存
+
+    未指定楼层时清除路由参数 floor 对应的楼层。GET 请求不会修改数据，因此不触发清除。
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            try:
+                return f(*args, **kwargs)
+            finally:
+                if request.method != 'GET':
+                    for floor in floors or (kwargs.get('floor'),):
+                        stats_cache.invalidate(floor)
+        return decorated_function
+    return decorator